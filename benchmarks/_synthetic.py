@@ -0,0 +1,60 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from pit8c.models import DirectionEnum, Trade
+
+
+class DailyRatesProvider:
+    """Serves NBP-like rates (4 decimals) that change every day."""
+
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        _ = years
+        _ = currencies
+
+    def get_rate(self, d: date, currency: str, *, use_previous_day: bool = True) -> Decimal:
+        _ = use_previous_day
+        return Decimal(38000 + d.toordinal() % 5000 + (700 if currency == "EUR" else 0)) / 10000
+
+
+def generate_trade_history(
+    n_trades: int, n_isins: int = 200, n_reports: int = 5, seed: int = 8, sell_ratio: float = 0.4
+) -> list[list[Trade]]:
+    """
+    Generate a chronological, always-matchable trade history split into `n_reports` consecutive reports
+    (like annual broker reports), each in chronological order.
+    """
+    rng = random.Random(seed)
+    holdings = [0] * n_isins
+    start = datetime(2015, 1, 2, 10, 0)
+    step = timedelta(minutes=max(1, (365 * 24 * 60 * n_reports) // max(n_trades, 1)))
+    per_report = max(1, -(-n_trades // n_reports))
+
+    reports: list[list[Trade]] = [[] for _ in range(n_reports)]
+    for i in range(n_trades):
+        idx = rng.randrange(n_isins)
+        if holdings[idx] > 0 and rng.random() < sell_ratio:
+            direction = DirectionEnum.sell
+            quantity = rng.randint(1, holdings[idx])
+            holdings[idx] -= quantity
+        else:
+            direction = DirectionEnum.buy
+            quantity = rng.randint(1, 50)
+            holdings[idx] += quantity
+
+        price = Decimal(rng.randint(500, 50_000)) / 100
+        reports[min(i // per_report, n_reports - 1)].append(
+            Trade(
+                isin=f"US{idx:010d}",
+                ticker=f"T{idx}",
+                currency="USD" if idx % 3 else "EUR",
+                direction=direction,
+                date=start + step * i,
+                quantity=Decimal(quantity),
+                amount=price * quantity,
+                commission_value=Decimal("1.25"),
+                commission_currency="EUR",
+                trade_num=i,
+            )
+        )
+    return reports
@@ -0,0 +1,135 @@
+"""
+Compare the declarative Freedom24 adapter (compiled from `FREEDOM24_SPEC`) with a frozen copy of the hand-written
+Freedom24 parsing loop it replaced, on rows read as dicts and as streamed row tuples. All must build equal trades.
+
+Run with: python -m benchmarks.bench_adapters [n_rows]
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from decimal import Decimal
+from itertools import chain
+from typing import Any
+
+from pit8c.brokers.freedom24 import Freedom24Adapter
+from pit8c.brokers.utils import parse_commission, parse_date
+from pit8c.models import DirectionEnum, Trade
+
+from benchmarks._synthetic import generate_trade_history
+
+_HEADERS = ("ISIN", "Ticker", "Direction", "Currency", "Trade date", "Settlement date", "Quantity", "Amount", "Price")
+_HEADERS += ("Commission", "Trade#")
+
+
+def _hand_written_parse_trades(raw_data: list[dict[str, Any]]) -> list[Trade]:
+    """The hand-written `Freedom24Adapter.parse_trades` loop, kept unchanged as the reference."""
+    trades: list[Trade] = []
+
+    for row in raw_data:
+        # Extract raw fields
+        isin_raw = (row.get("ISIN") or "").strip()
+        ticker_raw = (row.get("Ticker") or "").strip()
+        direction_label = (row.get("Direction") or "").lower().strip()  # "buy"/"sell"
+        if "buy" in direction_label:
+            direction = DirectionEnum.buy
+        elif "sell" in direction_label:
+            direction = DirectionEnum.sell
+        else:
+            # Be tolerant to unrelated XLSX files in a directory input (e.g. tool output XLSX).
+            continue
+
+        currency_raw = (row.get("Currency") or "").strip()
+
+        # For PIT-8C the relevant date is the transaction (trade) date; settlement date can be T+2.
+        dt = parse_date(row.get("Trade date") or row.get("Settlement date"))  # returns datetime or None
+
+        # Quantity, Amount, Price, etc. might be float or None
+        qty_val = row.get("Quantity", 0)
+        amt_val = row.get("Amount", 0)
+        price_val = row.get("Price", 0)
+
+        # Commission (e.g. "2.28EUR" -> (Decimal('2.28'), 'EUR'))
+        comm_str = str(row.get("Commission") or row.get("Fee") or "")
+        comm_value, comm_curr = parse_commission(comm_str)
+
+        # Trade number
+        trade_num = 0
+        if "Trade#" in row:
+            try:
+                trade_num = int(row["Trade#"])
+            except (ValueError, TypeError):
+                trade_num = 0
+
+        if dt is None:
+            continue
+
+        trade_obj = Trade(
+            isin=isin_raw,
+            ticker=ticker_raw,
+            currency=currency_raw,
+            direction=direction,
+            date=dt,
+            quantity=Decimal(str(qty_val)),
+            amount=Decimal(str(amt_val)),
+            commission_value=comm_value,
+            commission_currency=comm_curr,
+            price=Decimal(str(price_val)) if price_val else None,
+            trade_num=trade_num,
+        )
+
+        trades.append(trade_obj)
+
+    return trades
+
+
+def _best_of(fn: Callable[[], object], repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _report_rows(n_rows: int) -> list[tuple[Any, ...]]:
+    """Freedom24-like rows as read from XLSX: strings for dates and commissions, floats for amounts."""
+    return [
+        (
+            t.isin,
+            t.ticker,
+            "Buy" if t.direction == "buy" else "Sell",
+            t.currency,
+            t.date.strftime("%Y-%m-%d %H:%M:%S"),
+            t.date.strftime("%Y-%m-%d"),
+            int(t.quantity),
+            float(t.amount),
+            float(t.amount / t.quantity),
+            f"{t.commission_value}{t.commission_currency}",
+            t.trade_num,
+        )
+        for t in chain.from_iterable(generate_trade_history(n_rows))
+    ]
+
+
+def main(n_rows: int = 100_000) -> None:
+    rows = _report_rows(n_rows)
+    dict_rows = [dict(zip(_HEADERS, row, strict=True)) for row in rows]
+    adapter = Freedom24Adapter()
+
+    expected = _hand_written_parse_trades(dict_rows)
+    assert adapter.parse_trades(dict_rows) == expected, "declarative adapter differs on dict rows"
+    assert adapter.parse_rows(_HEADERS, rows) == expected, "declarative adapter differs on row tuples"
+
+    hand_written = _best_of(lambda: _hand_written_parse_trades(dict_rows))
+    from_dicts = _best_of(lambda: adapter.parse_trades(dict_rows))
+    from_tuples = _best_of(lambda: adapter.parse_rows(_HEADERS, rows))
+
+    print(f"rows: {n_rows}, equal trades: {len(expected)}")
+    print(f"hand-written (dict rows):  {hand_written * 1000:10.1f} ms")
+    print(f"declarative (dict rows):   {from_dicts * 1000:10.1f} ms ({hand_written / from_dicts:.2f}x)")
+    print(f"declarative (row tuples):  {from_tuples * 1000:10.1f} ms ({hand_written / from_tuples:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
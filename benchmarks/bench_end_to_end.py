@@ -0,0 +1,67 @@
+"""
+End-to-end load test of `Pit8c.process_reports_path` without network access: synthetic Freedom24 reports
+(see `benchmarks.synthetic_reports`) with NBP rates served by the local stand-in (see `benchmarks.nbp_stand_in`).
+Prints the duration of every pipeline stage, the archive requests made and the totals.
+
+Run with: python -m benchmarks.bench_end_to_end [n_trades] [--stream]
+"""
+
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from pit8c import Pit8c
+from pit8c.exchange.provider import NbpExchangeRatesProvider
+from pit8c.io.xlsx import XlsxReader
+from pit8c.tracing import Span
+
+from benchmarks.nbp_stand_in import NbpStandInServer
+from benchmarks.synthetic_reports import generate_freedom24_reports
+
+_YEARS = range(2021, 2026)
+
+
+class _StageDurations:
+    def __init__(self) -> None:
+        self.durations: dict[str, float] = defaultdict(float)
+
+    def on_start(self, span: Span) -> None:
+        _ = span
+
+    def on_end(self, span: Span) -> None:
+        self.durations[span.name] += span.duration or 0.0
+
+
+def main(n_trades: int = 100_000, stream: bool = False) -> None:
+    with tempfile.TemporaryDirectory(prefix="pit8c-bench-e2e-") as tmp_dir, NbpStandInServer(first_year=2015) as nbp:
+        reports_dir = Path(tmp_dir) / "reports"
+        started = time.perf_counter()
+        generate_freedom24_reports(reports_dir, n_trades, _YEARS)
+        generated = time.perf_counter() - started
+
+        stages = _StageDurations()
+        pit8c = Pit8c(
+            broker="freedom24",
+            exchange_provider=NbpExchangeRatesProvider(archive_url=nbp.archive_url),
+            output_dir=Path(tmp_dir) / "out",
+            xlsx_reader=XlsxReader.stream if stream else XlsxReader.openpyxl,
+            tracer=stages,
+        )
+        started = time.perf_counter()
+        result = pit8c.process_reports_path(reports_path=reports_dir, tax_year=_YEARS[-1])
+        elapsed = time.perf_counter() - started
+
+    print(f"trades: {len(result.trades)} in {len(result.input_reports)} reports (generated in {generated:.1f} s)")
+    print(f"closed positions in {_YEARS[-1]}: {len(result.closed_positions)}")
+    print(f"NBP archive requests: {nbp.requests}")
+    for name, duration in stages.durations.items():
+        if name.startswith(("pit8c.", "nbp.")) and name != "pit8c.process_reports_path":
+            print(f"  {name:<28} {duration * 1000:10.1f} ms")
+    print(f"total: {elapsed * 1000:.1f} ms")
+    print(f"income: {result.totals.income_pln} PLN, costs: {result.totals.costs_pln} PLN")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2] if arg.isdigit()), stream="--stream" in sys.argv)
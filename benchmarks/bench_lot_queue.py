@@ -0,0 +1,147 @@
+"""
+FIFO matching on savings-plan style histories: a few ISINs with tens of thousands of small buy lots each,
+sold in pieces that mostly close a lot only partially.
+
+Compares the lot queue of `iter_matched_positions` (slotted records behind a head index, updated in place) with
+the previous core (a deque of dict records, re-queued with appendleft after every partial match).
+
+Run with: python -m benchmarks.bench_lot_queue [n_trades]
+"""
+
+import gc
+import random
+import sys
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from pit8c.models import ClosedPosition, DirectionEnum, Trade
+from pit8c.positions.trades_matcher import iter_matched_positions, sort_trades_for_matching
+
+
+def _best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best time of `repeat` runs with the garbage collector paused (like timeit), as both matchers allocate alike."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def generate_savings_plan_history(n_trades: int, n_isins: int = 4, seed: int = 41) -> list[Trade]:
+    """Daily fractional buys per ISIN; every tenth trade sells a fraction (0.1-3 lots) of the position."""
+    rng = random.Random(seed)
+    holdings = [Decimal(0)] * n_isins
+    start = datetime(2015, 1, 2, 10, 0)
+    trades = []
+    for i in range(n_trades):
+        idx = i % n_isins
+        lot = Decimal(rng.randint(50, 500)) / 1000
+        if i % 10 == 9 and holdings[idx] > 1:
+            direction = DirectionEnum.sell
+            quantity = min(holdings[idx], lot * Decimal(rng.randint(1, 30)) / 10)
+            holdings[idx] -= quantity
+        else:
+            direction = DirectionEnum.buy
+            quantity = lot
+            holdings[idx] += quantity
+        trades.append(
+            Trade(
+                isin=f"IE{idx:010d}",
+                ticker=f"ETF{idx}",
+                currency="EUR",
+                direction=direction,
+                date=start + timedelta(hours=i),
+                quantity=quantity,
+                amount=quantity * Decimal(rng.randint(8000, 12000)) / 100,
+                commission_value=Decimal("0.10"),
+                trade_num=i,
+            )
+        )
+    return trades
+
+
+def _deque_of_dicts_matcher(trades: Iterable[Trade]) -> Iterator[ClosedPosition]:
+    """The previous matcher core, kept as the baseline."""
+    open_positions: dict[tuple[str, str], deque[dict[str, Any]]] = {}
+    for trade in trades:
+        key = (trade.isin, trade.currency)
+        if trade.direction == DirectionEnum.buy:
+            open_positions.setdefault(key, deque()).append(
+                {
+                    "remaining_qty": trade.quantity,
+                    "buy_date": trade.date,
+                    "remaining_buy_amount": trade.amount,
+                    "remaining_buy_commission": trade.commission_value,
+                    "buy_comm_currency": trade.commission_currency or trade.currency,
+                    "ticker": trade.ticker,
+                    "currency": trade.currency,
+                }
+            )
+            continue
+
+        remaining_sell_qty = trade.quantity
+        remaining_sell_amount = trade.amount
+        remaining_sell_commission = trade.commission_value
+        fifo_queue = open_positions[key]
+        while remaining_sell_qty > 0:
+            current_buy = fifo_queue.popleft()
+            available_buy_qty = current_buy["remaining_qty"]
+            closed_lot = min(remaining_sell_qty, available_buy_qty)
+            buy_portion = closed_lot / available_buy_qty
+            sell_portion = closed_lot / remaining_sell_qty
+            buy_amount_portion = current_buy["remaining_buy_amount"] * buy_portion
+            buy_comm_portion = current_buy["remaining_buy_commission"] * buy_portion
+            sell_amount_portion = remaining_sell_amount * sell_portion
+            sell_comm_portion = remaining_sell_commission * sell_portion
+            yield ClosedPosition(
+                isin=trade.isin,
+                ticker=current_buy["ticker"],
+                currency=trade.currency,
+                buy_date=current_buy["buy_date"],
+                quantity=closed_lot,
+                buy_amount=buy_amount_portion,
+                sell_date=trade.date,
+                sell_amount=sell_amount_portion,
+                buy_commission=buy_comm_portion,
+                sell_commission=sell_comm_portion,
+                buy_commission_currency=current_buy["buy_comm_currency"],
+                sell_commission_currency=trade.commission_currency or trade.currency,
+            )
+            current_buy["remaining_qty"] = available_buy_qty - closed_lot
+            current_buy["remaining_buy_amount"] -= buy_amount_portion
+            current_buy["remaining_buy_commission"] -= buy_comm_portion
+            remaining_sell_qty -= closed_lot
+            remaining_sell_amount -= sell_amount_portion
+            remaining_sell_commission -= sell_comm_portion
+            if current_buy["remaining_qty"] > 0:
+                fifo_queue.appendleft(current_buy)
+
+
+def main(n_trades: int = 200_000) -> None:
+    trades = sort_trades_for_matching(generate_savings_plan_history(n_trades))
+
+    expected = list(_deque_of_dicts_matcher(trades))
+    # Same closures down to the Decimal representation (exponents), not only equal values.
+    actual = list(iter_matched_positions(trades))
+    assert [cp.model_dump_json() for cp in actual] == [cp.model_dump_json() for cp in expected]
+
+    baseline = _best_of(lambda: list(_deque_of_dicts_matcher(trades)))
+    lot_queue = _best_of(lambda: list(iter_matched_positions(trades)))
+
+    print(f"trades: {n_trades}, closed positions: {len(expected)}")
+    print(f"deque of dicts: {baseline * 1000:10.1f} ms")
+    print(f"lot queue:      {lot_queue * 1000:10.1f} ms ({baseline / lot_queue:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
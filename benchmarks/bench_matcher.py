@@ -0,0 +1,40 @@
+"""
+Compare FIFO matching of a global sort over the concatenated history against a k-way merge
+of per-report chronological streams.
+
+Run with: python -m benchmarks.bench_matcher [n_trades]
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from itertools import chain
+
+from pit8c.positions.trades_matcher import match_trade_streams_fifo, match_trades_fifo, sort_trades_chronologically
+
+from benchmarks._synthetic import generate_trade_history
+
+
+def _best_of(fn: Callable[[], object], repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(n_trades: int = 200_000) -> None:
+    reports = generate_trade_history(n_trades)
+    trades = list(chain.from_iterable(reports))
+
+    global_sort = _best_of(lambda: match_trades_fifo(trades))
+    kway_merge = _best_of(lambda: list(match_trade_streams_fifo([sort_trades_chronologically(r) for r in reports])))
+
+    print(f"trades: {n_trades}, reports: {len(reports)}")
+    print(f"global sort + match: {global_sort * 1000:10.1f} ms")
+    print(f"k-way merge + match: {kway_merge * 1000:10.1f} ms ({global_sort / kway_merge:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
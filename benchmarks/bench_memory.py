@@ -0,0 +1,69 @@
+"""
+Per-stage memory of processing large synthetic Freedom24 reports (see `benchmarks.synthetic_reports`) with
+`Pit8c.process_reports_path`, from reading and parsing the XLSX files to the totals, with a ceiling on the peak
+memory of the whole run.
+
+Run with: python -m benchmarks.bench_memory [n_trades] [ceiling_mib] [--streaming] [--stream-reader]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pit8c import Pit8c
+from pit8c.io.xlsx import XlsxReader
+
+from benchmarks._synthetic import DailyRatesProvider
+from benchmarks.synthetic_reports import generate_freedom24_reports
+
+# Peak memory allowed for processing reports with 1M trades in total, reading and parsing included.
+DEFAULT_CEILING_MIB = 3072
+
+_YEARS = range(2021, 2026)
+_MIB = 1024 * 1024
+
+
+def main(
+    n_trades: int = 1_000_000,
+    ceiling_mib: int = DEFAULT_CEILING_MIB,
+    streaming: bool = False,
+    stream_reader: bool = False,
+) -> None:
+    with tempfile.TemporaryDirectory(prefix="pit8c-bench-memory-") as tmp_dir:
+        reports_dir = Path(tmp_dir) / "reports"
+        reports = generate_freedom24_reports(reports_dir, n_trades, _YEARS)
+        reports_mib = sum(report.stat().st_size for report in reports) / _MIB
+
+        pit8c = Pit8c(
+            broker="freedom24",
+            exchange_provider=DailyRatesProvider(),
+            write_pdf=False,
+            write_xlsx=False,
+            profile_memory=True,
+            streaming=streaming,
+            xlsx_reader=XlsxReader.stream if stream_reader else XlsxReader.openpyxl,
+        )
+        started = time.perf_counter()
+        result = pit8c.process_reports_path(reports_path=reports_dir, tax_year=_YEARS[-1])
+        elapsed = time.perf_counter() - started
+
+    mode = "streaming" if streaming else f"closed positions in {_YEARS[-1]}: {len(result.closed_positions)}"
+    print(f"trades: {n_trades} in {len(reports)} reports ({reports_mib:.1f} MiB), {mode}, {elapsed:.1f} s")
+    for stage in result.metrics.stage_memory:
+        print(
+            f"{stage.stage:<28}{stage.peak_bytes / _MIB:10.1f} MiB peak{stage.retained_bytes / _MIB:10.1f} MiB retained"
+        )
+
+    run_peak_mib = result.metrics.stage_memory[-1].peak_bytes / _MIB
+    assert run_peak_mib <= ceiling_mib, f"peak {run_peak_mib:.1f} MiB exceeds the {ceiling_mib} MiB ceiling"
+    print(f"run peak {run_peak_mib:.1f} MiB <= ceiling {ceiling_mib} MiB")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    main(
+        *(int(arg) for arg in args[:2]),
+        streaming="--streaming" in sys.argv[1:],
+        stream_reader="--stream-reader" in sys.argv[1:],
+    )
@@ -0,0 +1,204 @@
+"""
+Parsing of NBP table A archives: every currency column of a year parsed once into a per-year table, compared with
+the previous parser, which merged only the requested currencies into a dict per date and parsed the whole archive
+again whenever a new currency of a loaded year was requested.
+
+Archives are synthetic (35 currency columns, one row per business day) and served from a disk cache, so no network
+is involved.
+
+Run with: python -m benchmarks.bench_nbp_parse [n_years]
+"""
+
+import csv
+import gc
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from pit8c.exchange.nbp import NbpExchange
+
+_CURRENCIES = [
+    ("THB", 1), ("USD", 1), ("AUD", 1), ("HKD", 1), ("CAD", 1), ("NZD", 1), ("SGD", 1), ("EUR", 1), ("HUF", 100),
+    ("CHF", 1), ("GBP", 1), ("UAH", 1), ("JPY", 100), ("CZK", 1), ("DKK", 1), ("ISK", 100), ("NOK", 1), ("SEK", 1),
+    ("RON", 1), ("BGN", 1), ("TRY", 1), ("ILS", 1), ("CLP", 100), ("PHP", 1), ("MXN", 1), ("ZAR", 1), ("BRL", 1),
+    ("MYR", 1), ("IDR", 10000), ("INR", 100), ("KRW", 100), ("CNY", 1), ("XDR", 1), ("HRK", 1), ("RUB", 1),
+]  # fmt: skip
+
+# Currencies requested one after another for every year, as trade and later commission currencies show up.
+_REQUESTS = [{"USD"}, {"USD", "EUR"}, {"USD", "EUR", "GBP"}]
+_LOOKUP_CURRENCIES = ["USD", "EUR", "GBP"]
+
+
+def _best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best time of `repeat` runs with the garbage collector paused (like timeit)."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def generate_archive(year: int, seed: int = 44) -> str:
+    """Archive CSV of `year` shaped like NBP's: header, a row per business day and the footer rows."""
+    rng = random.Random(seed + year)
+    lines = [";".join(["data", *(f"{unit}{code}" for code, unit in _CURRENCIES), "nr tabeli", "pełny numer tabeli"])]
+    day = date(year, 1, 2)
+    n = 0
+    while day.year == year:
+        if day.weekday() < 5:
+            n += 1
+            rates = [f"{rng.uniform(0.1, 9.9):.4f}".replace(".", ",") for _ in _CURRENCIES]
+            lines.append(";".join([day.strftime("%Y%m%d"), *rates, str(n), f"{n:03d}/A/NBP/{year}"]))
+        day += timedelta(days=1)
+    lines.append(";".join(["kod ISO", *(code for code, _ in _CURRENCIES)]))
+    lines.append(";".join(["liczba jednostek", *(str(unit) for _, unit in _CURRENCIES)]))
+    return "\n".join(lines) + "\n"
+
+
+class _DictPerDateRates:
+    """The previous parser and lookup, kept as the baseline."""
+
+    def __init__(self, archives: dict[int, str]) -> None:
+        self._archives = archives
+        self._rates: dict[date, dict[str, Decimal]] = {}
+        self._sorted_dates: list[date] = []
+        self._loaded_years: dict[int, set[str]] = {}
+
+    def load_year(self, year: int, currencies: set[str]) -> None:
+        already_loaded = self._loaded_years.get(year, set())
+        missing = currencies - already_loaded
+        if not missing:
+            return
+        header = None
+        currency_indexes: dict[str, tuple[int, int]] = {}
+        for row in csv.reader(io.StringIO(self._archives[year]), delimiter=";"):
+            if header is None:
+                if row and "data" in row[0].lower():
+                    header = row
+                    for i, val in enumerate(header):
+                        code = val.lstrip("0123456789")
+                        if code in missing:
+                            currency_indexes[code] = (i, int(val[: len(val) - len(code)]))
+                continue
+            if not row or not row[0].isdigit() or len(row[0]) != 8:
+                continue
+            file_date = date(int(row[0][0:4]), int(row[0][4:6]), int(row[0][6:8]))
+            rates = self._rates.setdefault(file_date, {})
+            for curr, (idx, unit) in currency_indexes.items():
+                try:
+                    rates[curr] = Decimal(row[idx].strip().replace(",", ".")) / Decimal(unit)
+                except InvalidOperation:
+                    continue
+        self._loaded_years[year] = already_loaded | missing
+        self._sorted_dates = sorted(self._rates)
+
+    def get_rate_for(self, d: date, currency: str) -> Decimal:
+        currency = currency.upper()
+        if currency == "PLN":
+            return Decimal(1)
+        if not self._sorted_dates:
+            raise ValueError("No rates loaded. Call load_year first.")
+        target = d - timedelta(days=1)
+        found = self._find_last_rate_date(target, currency)
+        if (found is None or found.year < target.year) and currency not in self._loaded_years.get(
+            target.year - 1, set()
+        ):
+            raise ValueError(f"{currency} needs the archive of {target.year - 1}")
+        if found is None:
+            raise ValueError(f"No exchange rate found for {currency} prior to {d}")
+        return self._rates[found][currency]
+
+    def _find_last_rate_date(self, target: date, currency: str) -> date | None:
+        idx = bisect_right(self._sorted_dates, target) - 1
+        while idx >= 0:
+            candidate_date = self._sorted_dates[idx]
+            if currency in self._rates[candidate_date]:
+                return candidate_date
+            idx -= 1
+        return None
+
+
+def _write_final_cache(cache_dir: Path, archives: dict[int, str]) -> None:
+    """Store archives as checked after their year ended, so `NbpExchange` reads them from disk without requests."""
+    for year, text in archives.items():
+        (cache_dir / f"archiwum_tab_a_{year}.csv").write_text(text, encoding="utf-8")
+        meta = {"etag": None, "last_modified": None, "checked_at": datetime(year + 1, 1, 2).timestamp()}
+        (cache_dir / f"archiwum_tab_a_{year}.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+def main(n_years: int = 10) -> None:
+    years = list(range(2025 - n_years, 2025))
+    archives = {year: generate_archive(year) for year in years}
+    days = [date(years[0], 1, 10) + timedelta(days=i) for i in range(365 * n_years - 20)]
+
+    with tempfile.TemporaryDirectory(prefix="pit8c-bench-nbp-") as tmp_dir:
+        cache_dir = Path(tmp_dir)
+        _write_final_cache(cache_dir, archives)
+
+        def _tables() -> NbpExchange:
+            exchange = NbpExchange(cache_dir=cache_dir)
+            for currencies in _REQUESTS:
+                for year in years:
+                    exchange.load_year(year, currencies)
+            return exchange
+
+        def _baseline() -> _DictPerDateRates:
+            rates = _DictPerDateRates(archives)
+            for currencies in _REQUESTS:
+                for year in years:
+                    rates.load_year(year, currencies)
+            return rates
+
+        def _lookups(rates: NbpExchange | _DictPerDateRates) -> list[Decimal]:
+            return [rates.get_rate_for(d, c) for d in days for c in _LOOKUP_CURRENCIES]
+
+        tables, baseline = _tables(), _baseline()
+        assert _lookups(tables) == _lookups(baseline)
+
+        def _table_with_usd(year: int) -> Decimal:
+            exchange = NbpExchange(cache_dir=cache_dir)
+            exchange.load_year(year, {"USD"})
+            return exchange.get_rate_for(date(year, 12, 31), "USD")
+
+        table_year = _best_of(lambda: [_table_with_usd(y) for y in years])
+        one_currency = _best_of(lambda: [_DictPerDateRates(archives).load_year(y, {"USD"}) for y in years])
+        all_currencies = {code for code, _ in _CURRENCIES}
+        old_all = _best_of(lambda: [_DictPerDateRates(archives).load_year(y, all_currencies) for y in years])
+        table_run = _best_of(lambda: _lookups(_tables()))
+        baseline_run = _best_of(lambda: _lookups(_baseline()))
+        table_lookups = _best_of(lambda: _lookups(tables))
+        baseline_lookups = _best_of(lambda: _lookups(baseline))
+
+    per_year = 1000 / n_years
+    lookups = len(days) * len(_LOOKUP_CURRENCIES)
+    print(f"years: {n_years}, currency columns: {len(_CURRENCIES)}, lookups: {lookups}")
+    print("one archive (ms per year):")
+    print(f"  previous parser, USD only:             {one_currency * per_year:7.2f}")
+    print(f"  previous parser, all columns:          {old_all * per_year:7.2f}")
+    print(f"  table of all columns, USD converted:   {table_year * per_year:7.2f} (incl. disk read)")
+    print(f"loads of {' -> '.join(str(len(c)) for c in _REQUESTS)} currencies per year, then the lookups:")
+    print(f"  previous (re-parse per new currency):  {baseline_run * 1000:7.1f} ms")
+    print(f"  per-year tables:                       {table_run * 1000:7.1f} ms ({baseline_run / table_run:.2f}x)")
+    print("lookups only (warm):")
+    print(f"  dict per date:                         {baseline_lookups * 1000:7.1f} ms")
+    print(
+        f"  per-year tables:                       {table_lookups * 1000:7.1f} ms ({baseline_lookups / table_lookups:.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
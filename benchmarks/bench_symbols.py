@@ -0,0 +1,108 @@
+"""
+Identifier strings of parsed trades with and without the per-run symbol table (`pit8c.symbols`): memory retained by
+the trades of synthetic Freedom24 reports, FIFO matching over them, and exchange rate filling with one lookup per
+(date, currency) compared with the previous four provider calls per closed position (NBP rates served by the local
+stand-in, so no network is involved).
+
+Run with: python -m benchmarks.bench_symbols [n_trades]
+"""
+
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from pit8c.brokers.freedom24 import Freedom24Adapter
+from pit8c.exchange.provider import ExchangeRatesProvider, NbpExchangeRatesProvider
+from pit8c.exchange.rates import fill_exchange_rates, plan_rate_archives
+from pit8c.io.xlsx import XlsxReader
+from pit8c.models import ClosedPosition, Trade
+from pit8c.pipeline import load_trades_from_reports_path
+from pit8c.positions.trades_matcher import match_trades_fifo
+from pit8c.symbols import use_symbol_table
+
+from benchmarks.nbp_stand_in import NbpStandInServer
+from benchmarks.synthetic_reports import generate_freedom24_reports, parse_years
+
+_MIB = 1024 * 1024
+
+
+def _best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best time of `repeat` runs with the garbage collector paused (like timeit)."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def _load_traced(reports_dir: Path, interned: bool) -> tuple[list[Trade], int]:
+    """Parse the reports and return the trades with the memory they retain."""
+    gc.collect()
+    tracemalloc.start()
+    if interned:
+        with use_symbol_table():
+            _, trades = load_trades_from_reports_path(Freedom24Adapter(), reports_dir, xlsx_reader=XlsxReader.stream)
+    else:
+        _, trades = load_trades_from_reports_path(Freedom24Adapter(), reports_dir, xlsx_reader=XlsxReader.stream)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return trades, retained
+
+
+def _fill_per_call(positions: list[ClosedPosition], provider: ExchangeRatesProvider) -> None:
+    """The previous rate filler: four provider calls per position."""
+    for cp in positions:
+        curr = cp.currency
+        buy_comm_curr = cp.buy_commission_currency or curr
+        sell_comm_curr = cp.sell_commission_currency or curr
+        cp.buy_exchange_rate = provider.get_rate(cp.buy_date.date(), curr)
+        cp.sell_exchange_rate = provider.get_rate(cp.sell_date.date(), curr)
+        cp.buy_commission_exchange_rate = provider.get_rate(cp.buy_date.date(), buy_comm_curr)
+        cp.sell_commission_exchange_rate = provider.get_rate(cp.sell_date.date(), sell_comm_curr)
+
+
+def main(n_trades: int = 100_000) -> None:
+    with tempfile.TemporaryDirectory(prefix="pit8c-bench-symbols-") as tmp_dir:
+        reports_dir = Path(tmp_dir)
+        generate_freedom24_reports(reports_dir, n_trades, parse_years("2021-2025"))
+        plain, plain_bytes = _load_traced(reports_dir, interned=False)
+        interned, interned_bytes = _load_traced(reports_dir, interned=True)
+    assert plain == interned
+
+    match_plain = _best_of(lambda: match_trades_fifo(plain), repeat=3)
+    match_interned = _best_of(lambda: match_trades_fifo(interned), repeat=3)
+
+    positions = match_trades_fifo(interned)
+    with NbpStandInServer(first_year=2020) as server:
+        provider = NbpExchangeRatesProvider(archive_url=server.archive_url)
+        for year, currencies in plan_rate_archives(positions).items():
+            provider.prefetch({year}, currencies)
+        fill_per_call = _best_of(lambda: _fill_per_call(positions, provider))
+        fill_once = _best_of(lambda: fill_exchange_rates(positions, provider=provider))
+
+    identifiers = len({value for t in interned for value in (t.isin, t.ticker, t.currency, t.commission_currency)})
+    print(f"trades: {len(interned)}, distinct identifiers: {identifiers}, closed positions: {len(positions)}")
+    print("parsed trades retained (MiB):")
+    print(f"  new string per cell:         {plain_bytes / _MIB:8.1f}")
+    print(f"  symbol table:                {interned_bytes / _MIB:8.1f} ({1 - interned_bytes / plain_bytes:.0%} less)")
+    print("FIFO matching (ms):")
+    print(f"  new string per cell:         {match_plain * 1000:8.1f}")
+    print(f"  symbol table:                {match_interned * 1000:8.1f} ({match_plain / match_interned:.2f}x)")
+    print("exchange rate filling (ms):")
+    print(f"  four lookups per position:   {fill_per_call * 1000:8.1f}")
+    print(f"  one per (date, currency):    {fill_once * 1000:8.1f} ({fill_per_call / fill_once:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
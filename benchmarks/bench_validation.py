@@ -0,0 +1,97 @@
+"""
+Construction of `Trade` models from parsed report rows: one `Trade(...)` call per row (the previous adapter code),
+one bulk `TypeAdapter(list[Trade])` validation of all rows (`TradeValidation.strict`), `Trade.model_construct` per
+row and the unvalidated direct construction of `TradeValidation.fast`, alone and as part of
+`Freedom24Adapter.parse_trades`.
+
+Run with: python -m benchmarks.bench_validation [n_rows]
+"""
+
+import gc
+import sys
+import time
+from collections.abc import Callable
+from itertools import chain
+from typing import Any
+
+from pit8c.brokers.freedom24 import Freedom24Adapter
+from pit8c.brokers.validation import TradeValidation, build_trades
+from pit8c.models import Trade
+
+from benchmarks._synthetic import generate_trade_history
+
+
+def _best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best time of `repeat` runs with the garbage collector paused (like timeit)."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def _report_rows(n_rows: int) -> list[dict[str, Any]]:
+    """Freedom24-like rows as read from XLSX: strings for dates and commissions, floats for amounts."""
+    return [
+        {
+            "ISIN": t.isin,
+            "Ticker": t.ticker,
+            "Direction": "Buy" if t.direction == "buy" else "Sell",
+            "Currency": t.currency,
+            "Trade date": t.date.strftime("%Y-%m-%d %H:%M:%S"),
+            "Quantity": int(t.quantity),
+            "Amount": float(t.amount),
+            "Price": float(t.amount / t.quantity),
+            "Commission": f"{t.commission_value}{t.commission_currency}",
+            "Trade#": t.trade_num,
+        }
+        for t in chain.from_iterable(generate_trade_history(n_rows))
+    ]
+
+
+def main(n_rows: int = 100_000) -> None:
+    rows = _report_rows(n_rows)
+    fields = [trade.model_dump() for trade in Freedom24Adapter().parse_trades(rows)]
+    row_numbers = list(range(2, len(fields) + 2))
+
+    per_row = [Trade(**f) for f in fields]
+    assert build_trades(fields, row_numbers) == per_row
+    assert build_trades([dict(f) for f in fields], row_numbers, TradeValidation.fast) == per_row
+
+    construct_per_row = _best_of(lambda: [Trade(**f) for f in fields])
+    construct_bulk = _best_of(lambda: build_trades(fields, row_numbers))
+    model_construct = _best_of(lambda: [Trade.model_construct(**f) for f in fields])
+    # Fast mode adopts the field dicts as the trades' state, so every run gets fresh copies (copying is not timed).
+    fast_fields = [[dict(f) for f in fields] for _ in range(5)]
+    construct_fast = _best_of(lambda: build_trades(fast_fields.pop(), row_numbers, TradeValidation.fast))
+
+    strict_adapter, fast_adapter = Freedom24Adapter(), Freedom24Adapter(TradeValidation.fast)
+    parse_strict = _best_of(lambda: strict_adapter.parse_trades(rows))
+    parse_fast = _best_of(lambda: fast_adapter.parse_trades(rows))
+
+    print(f"rows: {len(fields)}")
+    print("building trades from field dicts:")
+    print(f"  Trade(...) per row:              {construct_per_row * 1000:8.1f} ms")
+    print(
+        f"  strict (bulk TypeAdapter):       {construct_bulk * 1000:8.1f} ms ({construct_per_row / construct_bulk:.2f}x)"
+    )
+    print(
+        f"  model_construct per row:         {model_construct * 1000:8.1f} ms ({construct_per_row / model_construct:.2f}x)"
+    )
+    print(
+        f"  fast (direct construction):      {construct_fast * 1000:8.1f} ms ({construct_per_row / construct_fast:.2f}x)"
+    )
+    print("Freedom24Adapter.parse_trades (row parsing included):")
+    print(f"  Trade(...) per row (estimate):   {(parse_strict - construct_bulk + construct_per_row) * 1000:8.1f} ms")
+    print(f"  strict:                          {parse_strict * 1000:8.1f} ms")
+    print(f"  fast:                            {parse_fast * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,63 @@
+"""
+Compare openpyxl (read-only) with the direct zip/XML reader on a synthetic Freedom24-like report.
+
+Run with: python -m benchmarks.bench_xlsx_reader [n_rows]
+"""
+
+import sys
+import tempfile
+import time
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+
+import openpyxl
+from pit8c.brokers.freedom24 import Freedom24Adapter
+from pit8c.io.xlsx import XlsxReader, iter_xlsx_rows
+from pit8c.io.xlsx_stream import iter_xlsx_rows_stream
+from pit8c.pipeline import parse_report
+
+from benchmarks.bench_adapters import _HEADERS, _report_rows
+
+
+def _best_of(fn: Callable[[], object], repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _write_report(path: Path, n_rows: int) -> None:
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Trades")
+    ws.append(_HEADERS)
+    for row in _report_rows(n_rows):
+        ws.append(row)
+    wb.save(path)
+
+
+def main(n_rows: int = 100_000) -> None:
+    adapter = Freedom24Adapter()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "report.xlsx"
+        _write_report(path, n_rows)
+
+        openpyxl_rows = _best_of(lambda: deque(iter_xlsx_rows(path), maxlen=0))
+        stream_rows = _best_of(lambda: deque(iter_xlsx_rows_stream(path), maxlen=0))
+        openpyxl_trades = _best_of(lambda: parse_report(adapter, path))
+        stream_trades = _best_of(lambda: parse_report(adapter, path, xlsx_reader=XlsxReader.stream))
+
+    print(f"rows: {n_rows}")
+    print(f"openpyxl rows:           {openpyxl_rows * 1000:10.1f} ms ({n_rows / openpyxl_rows:,.0f} rows/s)")
+    print(
+        f"stream rows:             {stream_rows * 1000:10.1f} ms ({n_rows / stream_rows:,.0f} rows/s, "
+        f"{openpyxl_rows / stream_rows:.2f}x)"
+    )
+    print(f"openpyxl parse_report:   {openpyxl_trades * 1000:10.1f} ms")
+    print(f"stream parse_report:     {stream_trades * 1000:10.1f} ms ({openpyxl_trades / stream_trades:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
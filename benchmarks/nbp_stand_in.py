@@ -0,0 +1,156 @@
+"""
+Local stand-in for the NBP archive host, serving synthetic table A archives (`archiwum_tab_a_{year}.csv`) in NBP's
+format: a header with unit-prefixed currency columns, one row per business day with comma decimals, and the footer
+rows. Rates follow a seeded random walk per currency, so every run serves the same archives. The archive of the
+current year ends today, and responses carry an ETag honoured with "304 Not Modified" like the real host.
+
+Point the pipeline at it with `NbpExchangeRatesProvider(archive_url=server.archive_url)` to load-test offline.
+
+Run with: python -m benchmarks.nbp_stand_in [--port 8765] [--first-year 2015]
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Self
+
+# (code, unit, starting PLN rate per unit) of the currencies in table A (a representative subset of its ~35 columns).
+CURRENCIES = [
+    ("THB", 1, "0.1150"), ("USD", 1, "3.9000"), ("AUD", 1, "2.7500"), ("HKD", 1, "0.5000"), ("CAD", 1, "2.9000"),
+    ("NZD", 1, "2.5500"), ("SGD", 1, "2.8500"), ("EUR", 1, "4.3000"), ("HUF", 100, "1.1500"), ("CHF", 1, "4.2000"),
+    ("GBP", 1, "5.0000"), ("UAH", 1, "0.1000"), ("JPY", 100, "2.8000"), ("CZK", 1, "0.1750"), ("DKK", 1, "0.5800"),
+    ("ISK", 100, "2.9000"), ("NOK", 1, "0.3900"), ("SEK", 1, "0.3900"), ("RON", 1, "0.8700"), ("BGN", 1, "2.2000"),
+    ("TRY", 1, "0.1300"), ("ILS", 1, "1.0500"), ("CLP", 100, "0.4300"), ("PHP", 1, "0.0700"), ("MXN", 1, "0.2200"),
+    ("ZAR", 1, "0.2100"), ("BRL", 1, "0.7800"), ("MYR", 1, "0.8700"), ("IDR", 10000, "2.6000"), ("INR", 100, "4.7000"),
+    ("KRW", 100, "0.3000"), ("CNY", 1, "0.5500"), ("XDR", 1, "5.2000"),
+]  # fmt: skip
+
+
+@lru_cache(maxsize=64)
+def generate_archive(year: int, seed: int = 45, until: date | None = None) -> str:
+    """Return the table A archive CSV of `year` (up to `until`, inclusive, when the year has not ended)."""
+
+    rng = random.Random(seed * 10_000 + year)
+    rates = [float(start) * (1 + rng.uniform(-0.1, 0.1)) for _, _, start in CURRENCIES]
+    header = ["data", *(f"{unit}{code}" for code, unit, _ in CURRENCIES), "nr tabeli", "pełny numer tabeli"]
+    lines = [";".join(header)]
+    day = date(year, 1, 2)
+    last_day = min(date(year, 12, 31), until or date(year, 12, 31))
+    n = 0
+    while day <= last_day:
+        if day.weekday() < 5:
+            n += 1
+            rates = [rate * (1 + rng.gauss(0, 0.004)) for rate in rates]
+            cells = [f"{rate:.4f}".replace(".", ",") for rate in rates]
+            lines.append(";".join([day.strftime("%Y%m%d"), *cells, str(n), f"{n:03d}/A/NBP/{year}"]))
+        day += timedelta(days=1)
+    lines.append(";".join(["kod ISO", *(code for code, _, _ in CURRENCIES)]))
+    lines.append(";".join(["liczba jednostek", *(str(unit) for _, unit, _ in CURRENCIES)]))
+    return "\n".join(lines) + "\n"
+
+
+class NbpStandInServer:
+    """Serves synthetic archives of `first_year`..the current year on 127.0.0.1 from a background thread."""
+
+    def __init__(self, port: int = 0, first_year: int = 2010, seed: int = 45) -> None:
+        self.first_year = first_year
+        self.seed = seed
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = stand_in.archive_bytes(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    if self.headers.get("If-None-Match") == etag:
+                        stand_in.not_modified += 1
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+                _ = format
+                _ = args
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.archive_url = f"http://127.0.0.1:{self._httpd.server_port}/dane/kursy/Archiwum/archiwum_tab_a_{{year}}.csv"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="nbp-stand-in", daemon=True)
+
+    def archive_bytes(self, path: str) -> bytes | None:
+        """Return the archive served at `path`, or None for unknown paths and years."""
+
+        name = path.rsplit("/", 1)[-1]
+        if not (name.startswith("archiwum_tab_a_") and name.endswith(".csv")):
+            return None
+        try:
+            year = int(name.removeprefix("archiwum_tab_a_").removesuffix(".csv"))
+        except ValueError:
+            return None
+        today = date.today()
+        if not self.first_year <= year <= today.year:
+            return None
+        return generate_archive(year, self.seed, today if year == today.year else None).encode("utf-8")
+
+    def start(self) -> Self:
+        """Start serving in the background."""
+
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop serving and release the port."""
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-year", type=int, default=2010)
+    parser.add_argument("--seed", type=int, default=45)
+    args = parser.parse_args()
+
+    server = NbpStandInServer(port=args.port, first_year=args.first_year, seed=args.seed)
+    print(f"Serving synthetic NBP archives at {server.archive_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped")
+
+
+if __name__ == "__main__":
+    main()
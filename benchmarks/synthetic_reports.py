@@ -0,0 +1,188 @@
+"""
+Generator of synthetic Freedom24 annual reports (one XLSX per year) for load testing.
+
+Reports look like real exports: a summary sheet before the trades sheet, Freedom24 column names, trade and
+settlement (T+2) dates, and fee strings like "2.28EUR". Trading follows realistic distributions: a few popular ISINs
+and a long tail (Zipf-like popularity), instruments quoted in USD, EUR, GBP and HKD (fees of GBP/HKD trades charged
+in EUR), prices drifting in a random walk, orders split into several partial fills with consecutive trade numbers,
+and sells of whole or partial positions. The history is always matchable (never sells more than it holds).
+
+Run with: python -m benchmarks.synthetic_reports OUTPUT_DIR [--trades 100000] [--years 2021-2025] [--isins 300]
+"""
+
+import argparse
+import math
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+import openpyxl
+
+HEADERS = ("ISIN", "Ticker", "Direction", "Currency", "Trade date", "Settlement date", "Quantity", "Price")
+HEADERS += ("Amount", "Commission", "Trade#")
+
+# (currency, ISIN country prefixes, share of instruments, currency of fees).
+_MARKETS = [
+    ("USD", ("US",), 0.62, "USD"),
+    ("EUR", ("IE", "DE", "NL", "FR"), 0.28, "EUR"),
+    ("GBP", ("GB",), 0.07, "EUR"),
+    ("HKD", ("KY", "HK"), 0.03, "EUR"),
+]
+_PARTIAL_FILL_SHARE = 0.2
+_SELL_SHARE = 0.35
+
+
+@dataclass(slots=True)
+class _Instrument:
+    isin: str
+    ticker: str
+    currency: str
+    fee_currency: str
+    price: float
+    held: int = 0
+
+
+def _instruments(n_isins: int, rng: random.Random) -> list[_Instrument]:
+    markets = rng.choices(_MARKETS, weights=[share for _, _, share, _ in _MARKETS], k=n_isins)
+    instruments = []
+    for i, (currency, prefixes, _, fee_currency) in enumerate(markets):
+        instruments.append(
+            _Instrument(
+                isin=f"{rng.choice(prefixes)}{i:09d}{rng.randrange(10)}",
+                ticker=f"{''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))}{i}",
+                currency=currency,
+                fee_currency=fee_currency,
+                price=math.exp(rng.gauss(math.log(80), 1.0)),
+            )
+        )
+    return instruments
+
+
+def _trading_times(year: int, count: int, rng: random.Random) -> list[datetime]:
+    """Sorted random moments within trading hours (15:30-22:00) of business days of `year`."""
+    days = [date(year, 1, 1) + timedelta(days=i) for i in range(366)]
+    days = [d for d in days if d.year == year and d.weekday() < 5]
+    moments = []
+    for _ in range(count):
+        day = rng.choice(days)
+        moments.append(datetime(day.year, day.month, day.day, 15, 30) + timedelta(seconds=rng.randrange(6 * 3600)))
+    return sorted(moments)
+
+
+def _settlement(moment: datetime) -> date:
+    """T+2 business days."""
+    day, left = moment.date(), 2
+    while left:
+        day += timedelta(days=1)
+        if day.weekday() < 5:
+            left -= 1
+    return day
+
+
+def _fee(amount: float, currency: str, fee_currency: str) -> str:
+    """Freedom24-like fee: 0.5% of the amount plus a fixed part, as a string like "2.28EUR"."""
+    fee = Decimal(amount * 0.005 + (1.2 if currency == fee_currency else 2.0)).quantize(Decimal("0.01"))
+    return f"{fee}{fee_currency}"
+
+
+def iter_report_rows(
+    year: int, n_trades: int, instruments: list[_Instrument], rng: random.Random, first_trade_num: int = 1
+) -> Iterator[tuple[Any, ...]]:
+    """Yield `n_trades` report rows of `year` in chronological order, updating held quantities of `instruments`."""
+
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(instruments))]
+    trade_num = first_trade_num
+    moments = _trading_times(year, n_trades, rng)
+    next_moment = datetime.min
+    i = 0
+    while i < len(moments):
+        instrument = rng.choices(instruments, weights=weights)[0]
+        instrument.price *= math.exp(rng.gauss(0, 0.02))
+        if instrument.held > 0 and rng.random() < _SELL_SHARE:
+            direction = "Sell"
+            quantity = instrument.held if rng.random() < 0.3 else rng.randint(1, instrument.held)
+            instrument.held -= quantity
+        else:
+            direction = "Buy"
+            quantity = max(1, int(rng.lognormvariate(2.5, 1.0)))
+            instrument.held += quantity
+
+        fills = rng.randint(2, 5) if quantity >= 5 and rng.random() < _PARTIAL_FILL_SHARE else 1
+        fills = min(fills, quantity, len(moments) - i)
+        cuts = sorted(rng.sample(range(1, quantity), fills - 1)) if fills > 1 else []
+        # Rows stay strictly chronological even when fills of one order run into the next order's moment.
+        moment = max(moments[i], next_moment)
+        next_moment = moment + timedelta(seconds=fills)
+        for n, fill_quantity in enumerate(b - a for a, b in zip([0, *cuts], [*cuts, quantity], strict=True)):
+            fill_moment = moment + timedelta(seconds=n)
+            price = round(instrument.price * (1 + rng.uniform(-0.0005, 0.0005)), 4)
+            amount = round(price * fill_quantity, 2)
+            yield (
+                instrument.isin,
+                instrument.ticker,
+                direction,
+                instrument.currency,
+                fill_moment.strftime("%Y-%m-%d %H:%M:%S"),
+                _settlement(fill_moment).isoformat(),
+                fill_quantity,
+                price,
+                amount,
+                _fee(amount, instrument.currency, instrument.fee_currency),
+                trade_num,
+            )
+            trade_num += 1
+        i += fills
+
+
+def generate_freedom24_reports(
+    output_dir: Path, n_trades: int, years: range, n_isins: int = 300, seed: int = 45
+) -> list[Path]:
+    """Write `freedom24_<year>.xlsx` for each of `years`, with about `n_trades` trade rows in total."""
+
+    rng = random.Random(seed)
+    instruments = _instruments(n_isins, rng)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    trade_num = 1
+    for index, year in enumerate(years):
+        count = n_trades // len(years) + (1 if index < n_trades % len(years) else 0)
+        wb = openpyxl.Workbook(write_only=True)
+        summary = wb.create_sheet("Summary")
+        summary.append(["Account", f"F24-{seed:06d}"])
+        summary.append(["Period", f"{year}-01-01 - {year}-12-31"])
+        trades = wb.create_sheet("Trades")
+        trades.append(HEADERS)
+        for row in iter_report_rows(year, count, instruments, rng, trade_num):
+            trades.append(row)
+            trade_num = row[-1] + 1
+        path = output_dir / f"freedom24_{year}.xlsx"
+        wb.save(path)
+        paths.append(path)
+    return paths
+
+
+def parse_years(value: str) -> range:
+    """Parse "2021-2025" or "2025" into a range of years."""
+    first, _, last = value.partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--trades", type=int, default=100_000, help="Trade rows in total (partial fills included)")
+    parser.add_argument("--years", type=parse_years, default=parse_years("2021-2025"), help="e.g. 2021-2025")
+    parser.add_argument("--isins", type=int, default=300, help="Number of instruments")
+    parser.add_argument("--seed", type=int, default=45)
+    args = parser.parse_args()
+
+    for path in generate_freedom24_reports(args.output_dir, args.trades, args.years, args.isins, args.seed):
+        print(f"Wrote {path} ({path.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,26 @@
 from pit8c.api import Pit8c
 from pit8c.brokers.base import BrokerAdapter, SupportedBroker
-from pit8c.exceptions import Pit8cError
+from pit8c.cache import ResultCache, ResultCacheStats
+from pit8c.exceptions import Pit8cCancelledError, Pit8cError
 from pit8c.models import ClosedPosition, DirectionEnum, Trade
-from pit8c.result import Pit8cArtifacts, Pit8cResult, Pit8cTotals
+from pit8c.progress import CancellationToken
+from pit8c.result import Pit8cArtifacts, Pit8cMetrics, Pit8cResult, Pit8cTotals, StageMemory
 
 __all__ = [
     "BrokerAdapter",
+    "CancellationToken",
     "ClosedPosition",
     "DirectionEnum",
     "Pit8c",
     "Pit8cArtifacts",
+    "Pit8cCancelledError",
     "Pit8cError",
+    "Pit8cMetrics",
     "Pit8cResult",
     "Pit8cTotals",
+    "ResultCache",
+    "ResultCacheStats",
+    "StageMemory",
     "SupportedBroker",
     "Trade",
 ]
@@ -1,21 +1,63 @@
+from collections.abc import Iterable, Iterator, Sequence, Sized
+from contextlib import ExitStack, contextmanager
+from dataclasses import replace
 from decimal import Decimal
+from itertools import chain, islice
 from pathlib import Path
+from typing import Any
 
-from pit8c.brokers.base import BrokerAdapter, SupportedBroker
-from pit8c.brokers.registry import get_broker_adapter
+from pit8c.artifacts import (
+    ArtifactData,
+    ArtifactWriter,
+    ClosedPositionsXlsxArtifactWriter,
+    PdfArtifactWriter,
+    StreamedClosedPositionsXlsxArtifactWriter,
+    write_artifacts,
+)
+from pit8c.brokers.base import BrokerAdapter, SupportedBroker, TradeValidationAdapter
+from pit8c.brokers.registry import available_brokers, get_broker_adapter
+from pit8c.brokers.validation import TradeValidation
+from pit8c.cache import ResultCache, result_cache_key
 from pit8c.exceptions import Pit8cError
-from pit8c.exchange.provider import ExchangeRatesProvider, NbpExchangeRatesProvider
-from pit8c.exchange.rates import fill_exchange_rates
-from pit8c.io.xlsx import write_closed_positions_to_xlsx
+from pit8c.exchange.provider import (
+    ExchangeRatesProvider,
+    FingerprintedExchangeRatesProvider,
+    NbpExchangeRatesProvider,
+)
+from pit8c.exchange.rates import fill_exchange_rates, plan_rate_archives
+from pit8c.io.xlsx import ClosedPositionsXlsxWriter, XlsxReader
+from pit8c.memory import TracemallocProfiler, tracing_memory
+from pit8c.metrics import MetricsCollector, collect_metrics, record_result_cache_lookup
 from pit8c.models import ClosedPosition, Trade
-from pit8c.pipeline import load_trades_from_reports_path, match_trades_and_select_tax_year
-from pit8c.positions.profit_calculator import calculate_profit
+from pit8c.pipeline import (
+    iter_trades_from_reports_path,
+    load_trade_streams_from_reports_path,
+    load_trades_from_reports_path,
+    match_trade_streams_and_select_tax_year,
+    match_trades_and_select_tax_year,
+)
+from pit8c.positions.profit_calculator import calculate_profit, compute_totals
+from pit8c.positions.trades_matcher import iter_matched_positions, sort_trades_for_matching
+from pit8c.progress import STAGE_MATCH, CancellationToken, ProgressCallback, run_control, track_progress
 from pit8c.reports.pit_8c import Pit8cReportGenerator, TemplatePit8cReportGenerator
 from pit8c.result import Pit8cArtifacts, Pit8cResult, Pit8cTotals
+from pit8c.symbols import use_symbol_table
+from pit8c.tracing import MultiTracer, Tracer, span, use_tracer
+
+# Closed positions handled at once in streaming mode.
+STREAM_CHUNK_SIZE = 10_000
+
+_ZERO_PLN = Decimal("0.00")
 
 
 class Pit8c:
-    """High-level PIT-8C pipeline runner usable from code and from the CLI."""
+    """
+    High-level PIT-8C pipeline runner usable from code and from the CLI.
+
+    A runner holds only its configuration (per-run state such as metrics, spans and progress lives in context
+    variables), so one instance can serve concurrent runs as long as its exchange provider is safe to share
+    (see `shared_exchange_provider`).
+    """
 
     def __init__(
         self,
@@ -24,10 +66,59 @@ class Pit8c:
         exchange_provider: ExchangeRatesProvider | None = None,
         report_generator: Pit8cReportGenerator | None = None,
         output_dir: Path | None = None,
+        *,
         write_pdf: bool = True,
         write_xlsx: bool = True,
+        merge_sorted_reports: bool = False,
+        sheet_name: str | None = None,
+        tracer: Tracer | None = None,
+        profile_memory: bool = False,
+        xlsx_reader: XlsxReader | str = XlsxReader.openpyxl,
+        streaming: bool = False,
+        result_cache: ResultCache | None = None,
+        artifact_writers: Sequence[ArtifactWriter] = (),
+        artifact_workers: int | None = None,
+        trade_validation: TradeValidation | str = TradeValidation.strict,
     ) -> None:
-        """Create a configured PIT-8C runner with optional defaults for subsequent runs."""
+        """
+        Create a configured PIT-8C runner with optional defaults for subsequent runs (options after `output_dir` are
+        keyword-only).
+
+        With `merge_sorted_reports=True`, trades of every report are kept in their (verified) chronological order
+        and combined with a k-way merge while matching, instead of globally re-sorting the whole history.
+
+        `sheet_name` selects the trades sheet of every report. When omitted, adapters with header fingerprints
+        get their sheet discovered in multi-sheet workbooks, and the active sheet is read otherwise.
+
+        `tracer` receives spans for pipeline stages, report files, NBP downloads and artifact writes
+        (see `pit8c.tracing`).
+
+        With `profile_memory=True`, peak and retained memory of every stage is measured with tracemalloc
+        and reported in `Pit8cResult.metrics.stage_memory` (this slows processing down considerably).
+
+        `xlsx_reader` selects how reports are read: `"openpyxl"` (default) or `"stream"`, which parses the workbook
+        XML directly (see `pit8c.io.xlsx_stream`) and is considerably faster on large trade sheets.
+
+        With `streaming=True`, trades flow lazily from the reports through matching, exchange rates and profit
+        calculation (in chunks) into the closed positions XLSX and the totals, so memory stays proportional to
+        the open lots. Every report must then be chronological, closed positions are written in sell order and
+        the result carries only totals and artifacts (its trade and position lists are empty).
+
+        `result_cache` stores results of in-memory runs keyed by the trades, tax year, output options and library
+        version, together with a fingerprint of the rates they used (see `pit8c.cache`); a repeated run returns the
+        stored result without matching or writing artifacts again while those rates are unchanged. It needs an
+        exchange provider that can fingerprint its rates (`FingerprintedExchangeRatesProvider`) and is not used in
+        streaming mode.
+
+        Output files (the PDF, the closed positions XLSX and any extra `artifact_writers`) are written concurrently on
+        up to `artifact_workers` threads (one per artifact by default, one at a time with memory profiling) and moved
+        into place only when all of them succeeded (see `pit8c.artifacts`). Extra writers are listed in
+        `Pit8cResult.artifacts.extra_files` and are not supported in streaming mode.
+
+        `trade_validation` selects how adapters supporting it (`TradeValidationAdapter`) build trades from report rows:
+        `"strict"` (default) validates all rows with pydantic in one call and reports invalid rows by number, `"fast"`
+        skips validation for trusted reports (see `pit8c.brokers.validation`).
+        """
 
         self._broker = self._parse_broker(broker) if broker is not None else None
         self._adapter = adapter
@@ -36,24 +127,72 @@ class Pit8c:
         self._output_dir = output_dir
         self._write_pdf = write_pdf
         self._write_xlsx = write_xlsx
+        self._merge_sorted_reports = merge_sorted_reports
+        self._sheet_name = sheet_name
+        self._tracer = tracer
+        self._profile_memory = profile_memory
+        self._xlsx_reader = self._parse_xlsx_reader(xlsx_reader)
+        self._streaming = streaming
+        self._result_cache = result_cache
+        if streaming and artifact_writers:
+            raise Pit8cError("Extra artifact writers are not supported in streaming mode")
+        self._artifact_writers = tuple(artifact_writers)
+        self._artifact_workers = artifact_workers
+        self._trade_validation = self._parse_trade_validation(trade_validation)
 
-    def process_reports_path(self, reports_path: Path, tax_year: int) -> Pit8cResult:
-        """Read broker report XLSX file(s), compute PIT-8C results and optionally write output artifacts."""
-
-        adapter = self._resolve_adapter()
-        input_reports, trades = load_trades_from_reports_path(adapter, reports_path)
+    def process_reports_path(
+        self,
+        reports_path: Path,
+        tax_year: int,
+        output_dir: Path | None = None,
+        *,
+        progress: ProgressCallback | None = None,
+        cancel_token: CancellationToken | None = None,
+    ) -> Pit8cResult:
+        """
+        Read broker report XLSX file(s), compute PIT-8C results and optionally write output artifacts.
 
-        output_dir = self._output_dir or (reports_path.parent if reports_path.is_file() else reports_path)
-        output_stem = reports_path.stem if reports_path.is_file() else reports_path.name
-        output_base = f"{output_stem}_{tax_year}"
+        `progress` is called with `(stage, done, total)` between report files, while matching and between NBP rate
+        downloads; cancelling `cancel_token` (e.g. from another thread) stops the run at the next of these checkpoints
+        with `Pit8cCancelledError` (see `pit8c.progress`).
+        """
 
-        return self._process_trades(
-            trades=trades,
+        with self._run(
+            "pit8c.process_reports_path",
+            progress,
+            cancel_token,
+            reports_path=str(reports_path),
             tax_year=tax_year,
-            input_reports=input_reports,
-            output_dir=output_dir,
-            output_base=output_base,
-        )
+        ) as metrics:
+            adapter = self._resolve_adapter()
+            output_dir = (
+                output_dir or self._output_dir or (reports_path.parent if reports_path.is_file() else reports_path)
+            )
+            output_stem = reports_path.stem if reports_path.is_file() else reports_path.name
+            output_base = f"{output_stem}_{tax_year}"
+
+            if self._streaming:
+                input_reports, trade_stream = iter_trades_from_reports_path(
+                    adapter, reports_path, sheet_name=self._sheet_name, xlsx_reader=self._xlsx_reader
+                )
+                result = self._process_trade_stream(
+                    trade_stream,
+                    tax_year=tax_year,
+                    input_reports=input_reports,
+                    output_dir=output_dir,
+                    output_base=output_base,
+                )
+            else:
+                input_reports, trades, trade_streams = self._load_trades(adapter, reports_path)
+                result = self._process_trades(
+                    trades=trades,
+                    tax_year=tax_year,
+                    input_reports=input_reports,
+                    output_dir=output_dir,
+                    output_base=output_base,
+                    trade_streams=trade_streams,
+                )
+        return replace(result, metrics=metrics.snapshot())
 
     def process_trades(
         self,
@@ -61,24 +200,95 @@ class Pit8c:
         tax_year: int,
         output_base: str = "pit8c",
         output_dir: Path | None = None,
+        *,
+        progress: ProgressCallback | None = None,
+        cancel_token: CancellationToken | None = None,
     ) -> Pit8cResult:
-        """Run PIT-8C pipeline for already parsed trades (no XLSX read), optionally writing artifacts."""
+        """
+        Run PIT-8C pipeline for already parsed trades (no XLSX read), optionally writing artifacts.
+        `progress` and `cancel_token` work as in `process_reports_path`.
+        """
 
         resolved_output_dir = output_dir or self._output_dir
-        return self._process_trades(
-            trades=trades,
-            tax_year=tax_year,
-            input_reports=[],
-            output_dir=resolved_output_dir,
-            output_base=f"{output_base}_{tax_year}",
-        )
+        with self._run("pit8c.process_trades", progress, cancel_token, tax_year=tax_year) as metrics:
+            if self._streaming:
+                result = self._process_trade_stream(
+                    sort_trades_for_matching(trades),
+                    tax_year=tax_year,
+                    input_reports=[],
+                    output_dir=resolved_output_dir,
+                    output_base=f"{output_base}_{tax_year}",
+                )
+            else:
+                result = self._process_trades(
+                    trades=trades,
+                    tax_year=tax_year,
+                    input_reports=[],
+                    output_dir=resolved_output_dir,
+                    output_base=f"{output_base}_{tax_year}",
+                )
+        return replace(result, metrics=metrics.snapshot())
+
+    @contextmanager
+    def _run(
+        self,
+        name: str,
+        progress: ProgressCallback | None = None,
+        cancel_token: CancellationToken | None = None,
+        **attributes: Any,
+    ) -> Iterator[MetricsCollector]:
+        """
+        Install the configured tracer (plus the memory profiler when enabled), a metrics collector, a symbol table
+        (see `pit8c.symbols`) and the progress callback and cancellation token for one pipeline run wrapped in
+        a root span.
+        """
+
+        with ExitStack() as stack:
+            tracer = self._tracer
+            if self._profile_memory:
+                stack.enter_context(tracing_memory())
+                profiler = TracemallocProfiler()
+                tracer = MultiTracer(tracer, profiler) if tracer is not None else profiler
+            if tracer is not None:
+                stack.enter_context(use_tracer(tracer))
+            metrics = stack.enter_context(collect_metrics())
+            stack.enter_context(use_symbol_table())
+            stack.enter_context(run_control(progress, cancel_token))
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            stack.enter_context(span(name, **attributes))
+            yield metrics
+
+    def _load_trades(
+        self, adapter: BrokerAdapter, reports_path: Path
+    ) -> tuple[list[Path], list[Trade], list[list[Trade]] | None]:
+        """Read all reports into memory: input paths, all trades and (when merging) per-report trade streams."""
+
+        trade_streams: list[list[Trade]] | None = None
+        with span("pit8c.load_reports") as load_span:
+            if self._merge_sorted_reports:
+                input_reports, trade_streams = load_trade_streams_from_reports_path(
+                    adapter, reports_path, sheet_name=self._sheet_name, xlsx_reader=self._xlsx_reader
+                )
+                trades = list(chain.from_iterable(trade_streams))
+            else:
+                input_reports, trades = load_trades_from_reports_path(
+                    adapter, reports_path, sheet_name=self._sheet_name, xlsx_reader=self._xlsx_reader
+                )
+            load_span.set_attribute("reports", len(input_reports))
+            load_span.set_attribute("trades", len(trades))
+        return input_reports, trades, trade_streams
 
     def _resolve_adapter(self) -> BrokerAdapter:
         if self._adapter is not None:
-            return self._adapter
-        if self._broker is None:
+            adapter = self._adapter
+        elif self._broker is None:
             raise Pit8cError("Broker adapter is not configured")
-        return get_broker_adapter(self._broker)
+        else:
+            adapter = get_broker_adapter(self._broker)
+        if isinstance(adapter, TradeValidationAdapter):
+            return adapter.with_validation(self._trade_validation)
+        return adapter
 
     def _process_trades(
         self,
@@ -87,43 +297,59 @@ class Pit8c:
         input_reports: list[Path],
         output_dir: Path | None,
         output_base: str,
+        *,
+        trade_streams: list[list[Trade]] | None = None,
     ) -> Pit8cResult:
-        closed_positions = match_trades_and_select_tax_year(trades, tax_year)
+        cache_key: str | None = None
+        if self._result_cache is not None and isinstance(self._exchange_provider, FingerprintedExchangeRatesProvider):
+            with span("pit8c.result_cache") as cache_span:
+                cache_key = self._result_cache_key(trades, tax_year, output_dir, output_base)
+                cached = self._result_cache.get(cache_key, self._rate_fingerprint)
+                cache_span.set_attribute("hit", cached is not None)
+            record_result_cache_lookup(cached is not None)
+            if cached is not None:
+                return replace(cached, input_reports=input_reports)
 
-        fill_exchange_rates(closed_positions, provider=self._exchange_provider)
-        profit_positions, loss_positions = calculate_profit(closed_positions)
-        totals = self._compute_totals(closed_positions)
-        pit8c_text = self._report_generator.render_text(totals)
-
-        pit8c_pdf_path: Path | None = None
-        closed_positions_xlsx_path: Path | None = None
-
-        writable_output_dir: Path | None = None
-        if self._write_pdf or self._write_xlsx:
-            if output_dir is None:
-                raise Pit8cError("output_dir must be provided when output writing is enabled")
-            writable_output_dir = output_dir.resolve()
-            writable_output_dir.mkdir(parents=True, exist_ok=True)
-
-        if self._write_pdf:
-            if writable_output_dir is None:
-                raise Pit8cError("output_dir must be provided when output writing is enabled")
-            pit8c_pdf_path = writable_output_dir / f"{output_base}_pit_8c.pdf"
-            self._report_generator.write_pdf(totals, pit8c_pdf_path)
-
-        if self._write_xlsx:
-            if writable_output_dir is None:
-                raise Pit8cError("output_dir must be provided when output writing is enabled")
-            closed_positions_xlsx_path = writable_output_dir / f"{output_base}_closed_positions.xlsx"
-            write_closed_positions_to_xlsx(profit_positions, loss_positions, closed_positions_xlsx_path)
+        with span("pit8c.match", trades=len(trades)) as match_span:
+            if trade_streams is not None:
+                closed_positions = match_trade_streams_and_select_tax_year(trade_streams, tax_year)
+            else:
+                closed_positions = match_trades_and_select_tax_year(trades, tax_year)
+            match_span.set_attribute("closed_positions", len(closed_positions))
+
+        with span("pit8c.exchange_rates", closed_positions=len(closed_positions)):
+            fill_exchange_rates(closed_positions, provider=self._exchange_provider)
+        with span("pit8c.profit", closed_positions=len(closed_positions)):
+            profit_positions, loss_positions, totals = self._calculate_profit_and_totals(closed_positions)
+        with span("pit8c.render_text"):
+            pit8c_text = self._report_generator.render_text(totals)
+
+        paths: dict[str, Path] = {}
+        writable_output_dir = self._prepare_output_dir(output_dir)
+        if writable_output_dir is not None:
+            writers: list[ArtifactWriter] = []
+            if self._write_pdf:
+                writers.append(PdfArtifactWriter(self._report_generator))
+            if self._write_xlsx:
+                writers.append(ClosedPositionsXlsxArtifactWriter())
+            writers.extend(self._artifact_writers)
+            data = ArtifactData(
+                tax_year=tax_year,
+                totals=totals,
+                closed_positions=closed_positions,
+                profit_positions=profit_positions,
+                loss_positions=loss_positions,
+            )
+            paths = self._write_artifacts(writers, data, writable_output_dir, output_base)
 
         artifacts = Pit8cArtifacts(
             pit8c_text=pit8c_text,
-            pit8c_pdf_path=pit8c_pdf_path,
-            closed_positions_xlsx_path=closed_positions_xlsx_path,
+            pit8c_pdf_path=paths.pop(PdfArtifactWriter.name, None),
+            closed_positions_xlsx_path=paths.pop(ClosedPositionsXlsxArtifactWriter.name, None),
+            extra_files=paths,
         )
 
-        return Pit8cResult(
+        result = Pit8cResult(
             tax_year=tax_year,
             input_reports=input_reports,
             trades=trades,
@@ -133,24 +359,167 @@ class Pit8c:
             totals=totals,
             artifacts=artifacts,
         )
+        if self._result_cache is not None and cache_key is not None:
+            # The archives the closures were priced with (already loaded by `fill_exchange_rates`).
+            rate_archives = plan_rate_archives(closed_positions)
+            fingerprint = self._rate_fingerprint(rate_archives)
+            if fingerprint is not None:
+                self._result_cache.put(cache_key, result, rate_archives, fingerprint)
+        return result
+
+    def _rate_fingerprint(self, rate_archives: dict[int, set[str]]) -> str | None:
+        """Fingerprint the rates of the given archives (year -> currencies), or None when the provider cannot."""
+
+        if not isinstance(self._exchange_provider, FingerprintedExchangeRatesProvider):
+            return None
+        currencies = set().union(*rate_archives.values())
+        return self._exchange_provider.rate_data_fingerprint(set(rate_archives), currencies)
+
+    def _result_cache_key(self, trades: list[Trade], tax_year: int, output_dir: Path | None, output_base: str) -> str:
+        """Return the result cache key of a run (its rates are checked separately, see `pit8c.cache`)."""
+
+        generator = type(self._report_generator)
+        options = {
+            "output_dir": str(output_dir.resolve()) if output_dir is not None else None,
+            "output_base": output_base,
+            "write_pdf": self._write_pdf,
+            "write_xlsx": self._write_xlsx,
+            "merge_sorted_reports": self._merge_sorted_reports,
+            "report_generator": f"{generator.__module__}.{generator.__qualname__}",
+            "artifact_writers": [
+                f"{w.name}:{type(w).__module__}.{type(w).__qualname__}" for w in self._artifact_writers
+            ],
+        }
+        return result_cache_key(trades, tax_year, options)
+
+    def _process_trade_stream(
+        self,
+        trades: Iterable[Trade],
+        tax_year: int,
+        input_reports: list[Path],
+        output_dir: Path | None,
+        output_base: str,
+    ) -> Pit8cResult:
+        """
+        Streaming counterpart of `_process_trades`: closed positions are matched lazily from FIFO-ordered trades and
+        pass through exchange rates, profit calculation and the XLSX writer in chunks; only totals are kept.
+        """
+
+        writable_output_dir = self._prepare_output_dir(output_dir)
+        # Rows are streamed into the workbook as they are computed; it is saved with the other artifacts at the end.
+        writer = ClosedPositionsXlsxWriter() if writable_output_dir is not None and self._write_xlsx else None
+
+        total = len(trades) if isinstance(trades, Sized) else None
+        tracked = track_progress(trades, STAGE_MATCH, total=total)
+        closed_positions = (cp for cp in iter_matched_positions(tracked) if cp.sell_date.year == tax_year)
+
+        income_pln = costs_pln = _ZERO_PLN
+        positions_count = 0
+        with span("pit8c.stream") as stream_span:
+            # Reading, parsing and matching happen lazily while each chunk is collected.
+            while chunk := list(islice(closed_positions, STREAM_CHUNK_SIZE)):
+                with span("pit8c.exchange_rates", closed_positions=len(chunk)):
+                    fill_exchange_rates(chunk, provider=self._exchange_provider)
+                with span("pit8c.profit", closed_positions=len(chunk)):
+                    profit_positions, loss_positions, chunk_totals = self._calculate_profit_and_totals(chunk)
+                if writer is not None:
+                    writer.write(profit_positions, loss_positions)
+                income_pln += chunk_totals.income_pln
+                costs_pln += chunk_totals.costs_pln
+                positions_count += len(chunk)
+            stream_span.set_attribute("closed_positions", positions_count)
+
+        totals = Pit8cTotals(income_pln=income_pln, costs_pln=costs_pln, profit_pln=income_pln - costs_pln)
+        with span("pit8c.render_text"):
+            pit8c_text = self._report_generator.render_text(totals)
+
+        paths: dict[str, Path] = {}
+        if writable_output_dir is not None:
+            writers: list[ArtifactWriter] = []
+            if self._write_pdf:
+                writers.append(PdfArtifactWriter(self._report_generator))
+            if writer is not None:
+                writers.append(StreamedClosedPositionsXlsxArtifactWriter(writer))
+            data = ArtifactData(
+                tax_year=tax_year, totals=totals, closed_positions=[], profit_positions=[], loss_positions=[]
+            )
+            paths = self._write_artifacts(writers, data, writable_output_dir, output_base)
+
+        return Pit8cResult(
+            tax_year=tax_year,
+            input_reports=input_reports,
+            trades=[],
+            closed_positions=[],
+            profit_positions=[],
+            loss_positions=[],
+            totals=totals,
+            artifacts=Pit8cArtifacts(
+                pit8c_text=pit8c_text,
+                pit8c_pdf_path=paths.get(PdfArtifactWriter.name),
+                closed_positions_xlsx_path=paths.get(ClosedPositionsXlsxArtifactWriter.name),
+            ),
+        )
+
+    def _prepare_output_dir(self, output_dir: Path | None) -> Path | None:
+        """Resolve and create the output directory when any artifact is written (None otherwise)."""
+
+        if not (self._write_pdf or self._write_xlsx or self._artifact_writers):
+            return None
+        if output_dir is None:
+            raise Pit8cError("output_dir must be provided when output writing is enabled")
+        writable_output_dir = output_dir.resolve()
+        writable_output_dir.mkdir(parents=True, exist_ok=True)
+        return writable_output_dir
+
+    def _write_artifacts(
+        self, writers: Sequence[ArtifactWriter], data: ArtifactData, output_dir: Path, output_base: str
+    ) -> dict[str, Path]:
+        """Write artifacts on the worker pool (sequentially while profiling memory, which needs nested spans)."""
+
+        max_workers = 1 if self._profile_memory else self._artifact_workers
+        return write_artifacts(writers, data, output_dir, output_base, max_workers=max_workers)
+
+    def _calculate_profit_and_totals(
+        self, closed_positions: list[ClosedPosition]
+    ) -> tuple[list[ClosedPosition], list[ClosedPosition], Pit8cTotals]:
+        """Fill PLN values on closed positions, split them into profit/loss and compute totals."""
+
+        profit_positions, loss_positions = calculate_profit(closed_positions)
+        return profit_positions, loss_positions, self._compute_totals(closed_positions)
 
     @staticmethod
     def _compute_totals(closed_positions: list[ClosedPosition]) -> Pit8cTotals:
         """Compute aggregated income/costs/profit totals in PLN from closed positions."""
 
-        total_income = sum((cp.income_pln for cp in closed_positions), Decimal(0)).quantize(Decimal("0.01"))
-        total_costs = sum((cp.costs_pln for cp in closed_positions), Decimal(0)).quantize(Decimal("0.01"))
-        profit = (total_income - total_costs).quantize(Decimal("0.01"))
-        return Pit8cTotals(income_pln=total_income, costs_pln=total_costs, profit_pln=profit)
+        return compute_totals(closed_positions)
 
     @staticmethod
-    def _parse_broker(value: SupportedBroker | str) -> SupportedBroker:
-        """Parse a SupportedBroker from an enum value or a string."""
+    def _parse_broker(value: SupportedBroker | str) -> SupportedBroker | str:
+        """Parse a broker from an enum value or a string naming a built-in or plugin broker."""
 
         if isinstance(value, SupportedBroker):
             return value
+        brokers = available_brokers()
+        if value not in brokers:
+            raise Pit8cError(f"Unsupported broker '{value}'. Supported brokers: {', '.join(brokers)}")
+        return SupportedBroker(value) if value in {b.value for b in SupportedBroker} else value
+
+    @staticmethod
+    def _parse_xlsx_reader(value: XlsxReader | str) -> XlsxReader:
+        """Parse an XLSX reader from an enum value or its name."""
+
+        try:
+            return XlsxReader(value)
+        except ValueError:
+            readers = ", ".join(r.value for r in XlsxReader)
+            raise Pit8cError(f"Unsupported XLSX reader '{value}'. Supported readers: {readers}") from None
+
+    @staticmethod
+    def _parse_trade_validation(value: TradeValidation | str) -> TradeValidation:
+        """Parse a trade validation mode from an enum value or its name."""
+
         try:
-            return SupportedBroker(value)
-        except ValueError as exc:
-            allowed = ", ".join(b.value for b in SupportedBroker)
-            raise Pit8cError(f"Unsupported broker '{value}'. Supported brokers: {allowed}") from exc
+            return TradeValidation(value)
+        except ValueError:
+            modes = ", ".join(m.value for m in TradeValidation)
+            raise Pit8cError(f"Unsupported trade validation '{value}'. Supported modes: {modes}") from None
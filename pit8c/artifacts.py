@@ -0,0 +1,184 @@
+"""
+Output artifacts of a run, written concurrently.
+
+Every `ArtifactWriter` produces one file from the results of a run. `write_artifacts` runs the writers on a thread
+pool, each into a temporary file next to its target; only when all of them succeeded are the files renamed into
+place, so a failed run leaves neither partial files nor a mix of new and stale artifacts. Existing targets are moved
+aside while renaming and restored if a later rename fails. The first error is re-raised once the writers that were
+already running have finished.
+"""
+
+import contextlib
+import contextvars
+import secrets
+from collections.abc import Sequence
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+from pit8c.exceptions import Pit8cError
+from pit8c.io.xlsx import ClosedPositionsXlsxWriter, write_closed_positions_to_xlsx
+from pit8c.models import ClosedPosition
+from pit8c.reports.pit_8c import Pit8cReportGenerator
+from pit8c.result import Pit8cTotals
+from pit8c.tracing import span
+
+
+@dataclass(frozen=True, slots=True)
+class ArtifactData:
+    """Results of a run available to artifact writers (shared between threads, so writers must not modify it)."""
+
+    tax_year: int
+    totals: Pit8cTotals
+    closed_positions: list[ClosedPosition]
+    profit_positions: list[ClosedPosition]
+    loss_positions: list[ClosedPosition]
+
+
+class ArtifactWriter(Protocol):
+    """Writes one output file of a run; `name` identifies the artifact and its span (`pit8c.write_<name>`)."""
+
+    name: str
+
+    def filename(self, output_base: str) -> str:
+        """Return the artifact's file name for the given output base name."""
+
+    def write(self, data: ArtifactData, file: Path) -> None:
+        """Write the artifact to `file`."""
+
+
+class PdfArtifactWriter:
+    """PIT-8C PDF filled by a report generator."""
+
+    name = "pdf"
+
+    def __init__(self, report_generator: Pit8cReportGenerator) -> None:
+        self._report_generator = report_generator
+
+    def filename(self, output_base: str) -> str:
+        """Return `<output_base>_pit_8c.pdf`."""
+
+        return f"{output_base}_pit_8c.pdf"
+
+    def write(self, data: ArtifactData, file: Path) -> None:
+        """Write the PDF for the run totals."""
+
+        self._report_generator.write_pdf(data.totals, file)
+
+
+class ClosedPositionsXlsxArtifactWriter:
+    """Closed positions audit workbook (Profit and Loss sheets with per-ISIN, currency and month summaries)."""
+
+    name = "xlsx"
+
+    def filename(self, output_base: str) -> str:
+        """Return `<output_base>_closed_positions.xlsx`."""
+
+        return f"{output_base}_closed_positions.xlsx"
+
+    def write(self, data: ArtifactData, file: Path) -> None:
+        """Write the profit and loss positions."""
+
+        write_closed_positions_to_xlsx(data.profit_positions, data.loss_positions, file)
+
+
+class StreamedClosedPositionsXlsxArtifactWriter(ClosedPositionsXlsxArtifactWriter):
+    """Closed positions workbook whose rows were already streamed into `writer` (streaming mode); saved on write."""
+
+    def __init__(self, writer: ClosedPositionsXlsxWriter) -> None:
+        self._writer = writer
+
+    def write(self, data: ArtifactData, file: Path) -> None:
+        """Save the streamed workbook (`data` is not used)."""
+
+        _ = data
+        self._writer.save(file)
+
+
+def write_artifacts(
+    writers: Sequence[ArtifactWriter],
+    data: ArtifactData,
+    output_dir: Path,
+    output_base: str,
+    max_workers: int | None = None,
+) -> dict[str, Path]:
+    """
+    Write all artifacts into `output_dir` (concurrently unless `max_workers` is 1) and return their paths by name.
+    Either all artifacts are written or, when a writer fails, none of them is and its exception is raised.
+    """
+
+    targets: dict[str, Path] = {}
+    for writer in writers:
+        if writer.name in targets:
+            raise Pit8cError(f"Duplicate artifact writer name '{writer.name}'")
+        targets[writer.name] = output_dir / writer.filename(output_base)
+    temporary = {name: _temporary_path(target) for name, target in targets.items()}
+
+    try:
+        if max_workers == 1 or len(writers) <= 1:
+            for writer in writers:
+                _write_artifact(writer, data, targets[writer.name], temporary[writer.name])
+        else:
+            with ThreadPoolExecutor(
+                max_workers=max_workers or len(writers), thread_name_prefix="pit8c-artifact"
+            ) as executor:
+                # Each writer runs in a copy of the current context, so its span joins the run's trace.
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        _write_artifact,
+                        writer,
+                        data,
+                        targets[writer.name],
+                        temporary[writer.name],
+                    )
+                    for writer in writers
+                ]
+                wait(futures, return_when=FIRST_EXCEPTION)
+                for future in futures:
+                    future.cancel()
+            for future in futures:
+                if not future.cancelled() and (error := future.exception()) is not None:
+                    raise error
+
+        _commit(temporary, targets)
+    finally:
+        for path in temporary.values():
+            path.unlink(missing_ok=True)
+    return targets
+
+
+def _commit(temporary: dict[str, Path], targets: dict[str, Path]) -> None:
+    """Rename the temporary files onto their targets; when a rename fails, restore every target as it was."""
+
+    backups: dict[str, Path] = {}
+    committed: list[str] = []
+    try:
+        for name, target in targets.items():
+            if target.exists():
+                backups[name] = _temporary_path(target)
+                target.replace(backups[name])
+            temporary[name].replace(target)
+            committed.append(name)
+    except BaseException:
+        for name in committed:
+            with contextlib.suppress(OSError):
+                targets[name].unlink(missing_ok=True)
+        for name, backup in backups.items():
+            with contextlib.suppress(OSError):
+                backup.replace(targets[name])
+        raise
+    for backup in backups.values():
+        backup.unlink(missing_ok=True)
+
+
+def _write_artifact(writer: ArtifactWriter, data: ArtifactData, target: Path, file: Path) -> None:
+    with span(f"pit8c.write_{writer.name}", path=str(target)):
+        writer.write(data, file)
+
+
+def _temporary_path(target: Path) -> Path:
+    """Hidden sibling of `target` keeping its suffix (some writers pick the format by extension)."""
+
+    return target.with_name(f".{target.stem}.{secrets.token_hex(4)}.tmp{target.suffix}")
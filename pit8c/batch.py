@@ -0,0 +1,308 @@
+"""
+Batch processing of many accounts listed in a manifest.
+
+A manifest (TOML or JSON) lists `accounts`, each with a broker, a reports path, a tax year and an optional output
+directory. `run_batch` processes them on a thread pool whose runners share one thread-safe exchange rates provider
+(see `shared_exchange_provider`), so NBP archives are downloaded and parsed once for the whole batch. Every completed
+account is appended to a JSON lines checkpoint as soon as it finishes; a rerun with the same checkpoint skips those
+accounts and reports their recorded totals, so a crashed or interrupted batch resumes where it stopped. Failed
+accounts are not checkpointed and are retried on the next run.
+"""
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+import tomllib
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from pit8c.api import Pit8c
+from pit8c.exceptions import Pit8cError
+from pit8c.exchange.provider import (
+    ExchangeRatesProvider,
+    NbpExchangeRatesProvider,
+    shared_exchange_provider,
+)
+from pit8c.io.xlsx import XlsxReader
+from pit8c.result import Pit8cTotals
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLUMNS = (
+    "id",
+    "broker",
+    "reports_path",
+    "year",
+    "status",
+    "income_pln",
+    "costs_pln",
+    "profit_pln",
+    "elapsed_seconds",
+    "error",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BatchEntry:
+    """One account of a batch manifest."""
+
+    id: str
+    broker: str
+    reports_path: Path
+    year: int
+    # Artifacts are written next to the reports when omitted (like the CLI does).
+    output_dir: Path | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BatchOutcome:
+    """Result of one batch entry: totals on success, an error message otherwise."""
+
+    entry: BatchEntry
+    totals: Pit8cTotals | None
+    elapsed_seconds: float
+    error: str | None = None
+    # Whether the entry was completed by an earlier run and taken from the checkpoint.
+    resumed: bool = False
+
+    @property
+    def status(self) -> str:
+        """Return "ok", "resumed" or "failed"."""
+
+        if self.error is not None:
+            return "failed"
+        return "resumed" if self.resumed else "ok"
+
+
+def load_manifest(path: Path) -> list[BatchEntry]:
+    """
+    Read batch entries from a `.toml` or `.json` manifest with a list of `accounts`.
+    Relative paths are resolved against the manifest's directory; `id` defaults to `<reports_path>@<year>`.
+    """
+
+    try:
+        match path.suffix.lower():
+            case ".toml":
+                with path.open("rb") as f:
+                    document = tomllib.load(f)
+            case ".json":
+                document = json.loads(path.read_text(encoding="utf-8"))
+            case _:
+                raise Pit8cError(f"Unsupported manifest format '{path.suffix}', expected .toml or .json")
+    except (OSError, tomllib.TOMLDecodeError, json.JSONDecodeError) as exc:
+        raise Pit8cError(f"Cannot read batch manifest '{path}': {exc}") from exc
+
+    accounts = document.get("accounts") if isinstance(document, dict) else None
+    if not isinstance(accounts, list) or not accounts:
+        raise Pit8cError(f"Batch manifest '{path}' must contain a non-empty list of 'accounts'")
+
+    entries = [_parse_entry(account, i, path.parent) for i, account in enumerate(accounts, start=1)]
+    seen: set[str] = set()
+    for entry in entries:
+        if entry.id in seen:
+            raise Pit8cError(f"Duplicate account id '{entry.id}' in batch manifest '{path}'")
+        seen.add(entry.id)
+    return entries
+
+
+def run_batch(
+    entries: Sequence[BatchEntry],
+    *,
+    checkpoint_path: Path | None = None,
+    exchange_provider: ExchangeRatesProvider | None = None,
+    max_workers: int = 4,
+    xlsx_reader: XlsxReader | str = XlsxReader.openpyxl,
+    on_outcome: Callable[[BatchOutcome], None] | None = None,
+) -> list[BatchOutcome]:
+    """
+    Process batch entries on up to `max_workers` threads and return their outcomes in manifest order.
+
+    Entries recorded in `checkpoint_path` by an earlier run are not processed again; newly completed entries are
+    appended to it as they finish. An error fails only its own entry. `on_outcome` is called (from the calling
+    thread) for every entry as soon as its outcome is known, resumed entries first.
+    """
+
+    completed = _read_checkpoint(checkpoint_path) if checkpoint_path is not None else {}
+    outcomes: dict[str, BatchOutcome] = {}
+    pending = []
+    for entry in entries:
+        outcome = completed.get(entry.id)
+        if outcome is not None and outcome.entry == entry:
+            outcomes[entry.id] = outcome
+            if on_outcome is not None:
+                on_outcome(outcome)
+        else:
+            pending.append(entry)
+
+    processor = _BatchProcessor(shared_exchange_provider(exchange_provider or NbpExchangeRatesProvider()), xlsx_reader)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pit8c-batch")
+    try:
+        futures = [executor.submit(processor.process, entry) for entry in pending]
+        for future in as_completed(futures):
+            outcome = future.result()
+            outcomes[outcome.entry.id] = outcome
+            if checkpoint_path is not None and outcome.error is None:
+                _append_checkpoint(checkpoint_path, outcome)
+            if on_outcome is not None:
+                on_outcome(outcome)
+    finally:
+        # On interruption, entries not started yet are dropped; running ones finish (and are lost unless rerun).
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return [outcomes[entry.id] for entry in entries]
+
+
+def write_batch_summary(outcomes: Sequence[BatchOutcome], path: Path) -> None:
+    """Write one CSV row per outcome (see `SUMMARY_COLUMNS`), replacing `path` atomically."""
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_COLUMNS)
+        for outcome in outcomes:
+            entry, totals = outcome.entry, outcome.totals
+            writer.writerow(
+                [
+                    entry.id,
+                    entry.broker,
+                    str(entry.reports_path),
+                    entry.year,
+                    outcome.status,
+                    *((totals.income_pln, totals.costs_pln, totals.profit_pln) if totals is not None else ("", "", "")),
+                    f"{outcome.elapsed_seconds:.3f}",
+                    outcome.error or "",
+                ]
+            )
+    tmp_path.replace(path)
+
+
+class _BatchProcessor:
+    """Processes entries from worker threads with one runner per broker, all sharing the rates provider."""
+
+    def __init__(self, exchange_provider: ExchangeRatesProvider, xlsx_reader: XlsxReader | str) -> None:
+        self._exchange_provider = exchange_provider
+        self._xlsx_reader = xlsx_reader
+        self._runners: dict[str, Pit8c] = {}
+        self._runners_lock = threading.Lock()
+
+    def process(self, entry: BatchEntry) -> BatchOutcome:
+        """Process one entry, turning any error into a failed outcome."""
+
+        started = time.perf_counter()
+        try:
+            result = self._get_runner(entry.broker).process_reports_path(
+                reports_path=entry.reports_path, tax_year=entry.year, output_dir=entry.output_dir
+            )
+        except Exception as exc:
+            if not isinstance(exc, Pit8cError):
+                logger.exception("Batch entry %s failed", entry.id)
+            return BatchOutcome(
+                entry=entry,
+                totals=None,
+                elapsed_seconds=time.perf_counter() - started,
+                error=str(exc) or type(exc).__name__,
+            )
+        return BatchOutcome(entry=entry, totals=result.totals, elapsed_seconds=time.perf_counter() - started)
+
+    def _get_runner(self, broker: str) -> Pit8c:
+        with self._runners_lock:
+            runner = self._runners.get(broker)
+            if runner is None:
+                runner = self._runners[broker] = Pit8c(
+                    broker=broker, exchange_provider=self._exchange_provider, xlsx_reader=self._xlsx_reader
+                )
+            return runner
+
+
+def _parse_entry(account: object, index: int, base_dir: Path) -> BatchEntry:
+    if not isinstance(account, dict):
+        raise Pit8cError(f"Batch manifest account #{index} must be a table/object")
+    missing = [key for key in ("broker", "reports_path", "year") if key not in account]
+    if missing:
+        raise Pit8cError(f"Batch manifest account #{index} is missing {', '.join(missing)}")
+    try:
+        year = int(account["year"])
+    except (TypeError, ValueError):
+        raise Pit8cError(f"Batch manifest account #{index} has an invalid year: {account['year']!r}") from None
+
+    reports_path = base_dir / str(account["reports_path"])
+    output_dir = account.get("output_dir")
+    return BatchEntry(
+        id=str(account.get("id") or f"{account['reports_path']}@{year}"),
+        broker=str(account["broker"]),
+        reports_path=reports_path,
+        year=year,
+        output_dir=base_dir / str(output_dir) if output_dir is not None else None,
+    )
+
+
+def _entry_to_json(entry: BatchEntry) -> dict[str, Any]:
+    return {
+        "id": entry.id,
+        "broker": entry.broker,
+        "reports_path": str(entry.reports_path),
+        "year": entry.year,
+        "output_dir": str(entry.output_dir) if entry.output_dir is not None else None,
+    }
+
+
+def _append_checkpoint(path: Path, outcome: BatchOutcome) -> None:
+    """Append a completed entry and flush it to disk, so it survives a crash right after."""
+
+    totals = outcome.totals
+    record = {
+        "entry": _entry_to_json(outcome.entry),
+        "totals": [str(totals.income_pln), str(totals.costs_pln), str(totals.profit_pln)]
+        if totals is not None
+        else None,
+        "elapsed_seconds": outcome.elapsed_seconds,
+    }
+    line = json.dumps(record).encode() + b"\n"
+    with path.open("a+b") as f:
+        # After a crash mid-write the file ends with a torn line: start a new one, so this record stays readable.
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = b"\n" + line
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_checkpoint(path: Path) -> dict[str, BatchOutcome]:
+    """Read completed entries by id; a line torn by a crash while it was written is ignored."""
+
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return {}
+
+    completed: dict[str, BatchOutcome] = {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+            data = record["entry"]
+            income, costs, profit = (Decimal(value) for value in record["totals"])
+            entry = BatchEntry(
+                id=data["id"],
+                broker=data["broker"],
+                reports_path=Path(data["reports_path"]),
+                year=data["year"],
+                output_dir=Path(data["output_dir"]) if data["output_dir"] is not None else None,
+            )
+        except (ValueError, KeyError, TypeError, ArithmeticError):
+            continue
+        completed[entry.id] = BatchOutcome(
+            entry=entry,
+            totals=Pit8cTotals(income_pln=income, costs_pln=costs, profit_pln=profit),
+            elapsed_seconds=float(record.get("elapsed_seconds", 0.0)),
+            resumed=True,
+        )
+    return completed
@@ -1,6 +1,8 @@
+from collections.abc import Collection, Iterable, Iterator, Sequence
 from enum import Enum
-from typing import Any, Protocol
+from typing import Any, Protocol, runtime_checkable
 
+from pit8c.brokers.validation import TradeValidation
 from pit8c.models import Trade
 
 
@@ -17,5 +19,57 @@ class BrokerAdapter(Protocol):
         ...
 
 
+@runtime_checkable
+class RowTupleBrokerAdapter(BrokerAdapter, Protocol):
+    """
+    Adapter that can also parse rows as plain tuples laid out like the header row,
+    so reports can be streamed without building a dict per row.
+    """
+
+    def parse_rows(self, headers: Sequence[Any], rows: Iterable[Sequence[Any]]) -> list[Trade]:
+        """
+        Parse raw row tuples (after reading from XLSX) into a standardized list of trades.
+        """
+        ...
+
+
+@runtime_checkable
+class TradeStreamAdapter(BrokerAdapter, Protocol):
+    """
+    Adapter that converts row tuples into trades lazily, so a report can be processed
+    without holding all of its trades in memory (see `Pit8c(streaming=True)`).
+    """
+
+    def iter_trades(self, headers: Sequence[Any], rows: Iterable[Sequence[Any]]) -> Iterator[Trade]:
+        """
+        Yield trades parsed from raw row tuples laid out like `headers`, one row at a time.
+        """
+        ...
+
+
+@runtime_checkable
+class HeaderFingerprintAdapter(BrokerAdapter, Protocol):
+    """
+    Adapter that registers header fingerprints: sets of column names identifying its trades sheet,
+    so the sheet can be discovered in multi-sheet workbooks.
+    """
+
+    header_fingerprints: Sequence[Collection[str]]
+
+
+@runtime_checkable
+class TradeValidationAdapter(BrokerAdapter, Protocol):
+    """
+    Adapter that can build trades with pydantic validation of every row (strict) or without it (fast),
+    see `pit8c.brokers.validation`.
+    """
+
+    def with_validation(self, validation: TradeValidation) -> BrokerAdapter:
+        """
+        Return an adapter parsing like this one with the given validation mode.
+        """
+        ...
+
+
 class SupportedBroker(str, Enum):
     freedom24 = "freedom24"
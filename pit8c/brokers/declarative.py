@@ -0,0 +1,347 @@
+"""
+Generic broker adapter configured by a declarative column-mapping spec.
+
+A `ColumnMappingSpec` describes where trade fields live in a broker report and how labels, dates and commissions
+are written. For a given header row the spec is compiled once into a parser of plain row tuples: column positions
+are resolved up front, and repeated direction labels, dates and commission strings are converted only once
+per report. Rows are turned into field dicts, and trades are built from them in bulk (see `pit8c.brokers.validation`).
+"""
+
+import copy
+import re
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from typing import Any
+
+from pit8c.brokers.validation import TradeValidation, build_trades, invalid_row_error, iter_build_trades
+from pit8c.models import DirectionEnum, Trade
+from pit8c.symbols import symbol_interner
+
+RowParser = Callable[[Sequence[Any]], dict[str, Any] | None]
+
+_ZERO = Decimal(0)
+
+# strptime directives supported by compiled date formats: datetime field and accepted number of digits.
+_DATE_DIRECTIVES = {
+    "%Y": ("year", "4"),
+    "%m": ("month", "1,2"),
+    "%d": ("day", "1,2"),
+    "%H": ("hour", "1,2"),
+    "%M": ("minute", "1,2"),
+    "%S": ("second", "1,2"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RowFilter:
+    """Drop rows whose (stripped) `column` value is in `values`, or keep only those rows with `keep=True`."""
+
+    column: str
+    values: tuple[str, ...]
+    keep: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ColumnMappingSpec:
+    """
+    Declarative description of a broker trade report.
+
+    Columns listed as tuples are alternatives: the first non-empty value wins (e.g. trade date, then settlement date).
+    Direction labels are matched as case-insensitive substrings; rows matching neither side are skipped.
+    The commission pattern must define `value` and `currency` named groups; unmatched strings mean no commission.
+    """
+
+    isin: str
+    ticker: str
+    direction: str
+    currency: str
+    date: tuple[str, ...]
+    quantity: str
+    amount: str
+    price: str | None = None
+    commission: tuple[str, ...] = ()
+    trade_num: str | None = None
+    buy_labels: tuple[str, ...] = ("buy",)
+    sell_labels: tuple[str, ...] = ("sell",)
+    date_formats: tuple[str, ...] = (
+        "%Y-%m-%d",
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%d %H:%M",
+        "%Y-%m-%dT%H:%M:%S",
+        "%Y-%m-%dT%H:%M",
+    )
+    commission_pattern: str = r"^(?P<value>[0-9]+(\.[0-9]+)?)(?P<currency>[A-Za-z]+)$"
+    filters: tuple[RowFilter, ...] = field(default=())
+
+    def required_columns(self) -> tuple[str, ...]:
+        """Columns that must be present in a header row for a sheet to contain trades."""
+
+        return (self.isin, self.direction, self.currency, self.quantity, self.amount)
+
+
+class DeclarativeAdapter:
+    """Broker adapter driven by a `ColumnMappingSpec` instead of a hand-written parsing loop."""
+
+    def __init__(self, spec: ColumnMappingSpec, validation: TradeValidation | str = TradeValidation.strict) -> None:
+        self.spec = spec
+        self.validation = TradeValidation(validation)
+        self.header_fingerprints = (frozenset(spec.required_columns()),)
+
+    def with_validation(self, validation: TradeValidation) -> "DeclarativeAdapter":
+        """Return a copy of this adapter building trades with the given validation mode."""
+
+        if validation == self.validation:
+            return self
+        adapter = copy.copy(self)
+        adapter.validation = TradeValidation(validation)
+        return adapter
+
+    def parse_trades(self, raw_data: list[dict[str, Any]]) -> list[Trade]:
+        """Parse rows read as dicts (header -> value), e.g. by `read_trades_from_xlsx`."""
+
+        if not raw_data:
+            return []
+        headers = tuple(raw_data[0])
+        return self.parse_rows(headers, ([row.get(h) for h in headers] for row in raw_data))
+
+    def parse_rows(self, headers: Sequence[Any], rows: Iterable[Sequence[Any]]) -> list[Trade]:
+        """Parse row tuples laid out like `headers`; sheets without the spec's required columns yield no trades."""
+
+        parsed = list(self._iter_row_fields(headers, rows))
+        return build_trades([fields for _, fields in parsed], [n for n, _ in parsed], self.validation)
+
+    def iter_trades(self, headers: Sequence[Any], rows: Iterable[Sequence[Any]]) -> Iterator[Trade]:
+        """Lazy counterpart of `parse_rows`."""
+
+        return iter_build_trades(self._iter_row_fields(headers, rows), self.validation)
+
+    def _iter_row_fields(
+        self, headers: Sequence[Any], rows: Iterable[Sequence[Any]]
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Yield `(report row number, trade fields)` of the trade rows (the header being row 1)."""
+
+        parser = compile_row_parser(self.spec, [_text(h) for h in headers])
+        if parser is None:
+            return
+        for row_number, row in enumerate(rows, start=2):
+            try:
+                fields = parser(row)
+            except InvalidOperation:
+                raise invalid_row_error(row_number, "a numeric column does not contain a number") from None
+            if fields is not None:
+                yield row_number, fields
+
+
+def compile_row_parser(spec: ColumnMappingSpec, headers: Sequence[str]) -> RowParser | None:
+    """
+    Compile `spec` for a header row into a function turning one row tuple into Trade fields (or None to skip it).
+    Identifiers are interned into the symbol table of the current run (see `pit8c.symbols`).
+    """
+
+    positions: dict[str, int] = {}
+    for idx, header in enumerate(headers):
+        positions.setdefault(header, idx)
+    if any(column not in positions for column in spec.required_columns()):
+        return None
+
+    date_idx = _indexes(positions, spec.date)
+    if not date_idx:
+        return None
+
+    isin_idx = positions[spec.isin]
+    direction_idx = positions[spec.direction]
+    currency_idx = positions[spec.currency]
+    quantity_idx = positions[spec.quantity]
+    amount_idx = positions[spec.amount]
+    ticker_idx = positions.get(spec.ticker)
+    price_idx = positions.get(spec.price) if spec.price else None
+    trade_num_idx = positions.get(spec.trade_num) if spec.trade_num else None
+    commission_idx = _indexes(positions, spec.commission)
+    filters = [(positions[f.column], frozenset(f.values), f.keep) for f in spec.filters if f.column in positions]
+    width = max(positions.values()) + 1
+
+    intern = symbol_interner()
+    parse_direction = _direction_parser(spec.buy_labels, spec.sell_labels)
+    parse_row_date = _date_parser(spec.date_formats)
+    parse_commission = _commission_parser(spec.commission_pattern, intern)
+
+    def parse(row: Sequence[Any]) -> dict[str, Any] | None:
+        if len(row) < width:
+            row = [*row, *([None] * (width - len(row)))]
+
+        for idx, values, keep in filters:
+            if (_text(row[idx]) in values) != keep:
+                return None
+
+        direction = parse_direction(row[direction_idx])
+        if direction is None:
+            return None
+
+        dt = parse_row_date(_first(row, date_idx))
+        if dt is None:
+            return None
+
+        commission_value, commission_currency = parse_commission(_first(row, commission_idx))
+        price = row[price_idx] if price_idx is not None else None
+
+        return {
+            "isin": intern(_text(row[isin_idx])),
+            "ticker": intern(_text(row[ticker_idx])) if ticker_idx is not None else "",
+            "currency": intern(_text(row[currency_idx])),
+            "direction": direction,
+            "date": dt,
+            "quantity": _decimal(row[quantity_idx]),
+            "amount": _decimal(row[amount_idx]),
+            "commission_value": commission_value,
+            "commission_currency": commission_currency,
+            "price": _decimal(price) if price else None,
+            "trade_num": _int(row[trade_num_idx]) if trade_num_idx is not None else 0,
+        }
+
+    return parse
+
+
+def _indexes(positions: dict[str, int], columns: tuple[str, ...]) -> tuple[int, ...]:
+    return tuple(positions[c] for c in columns if c in positions)
+
+
+def _first(row: Sequence[Any], indexes: tuple[int, ...]) -> Any:
+    """Return the first truthy value among alternative columns (like `row.get(a) or row.get(b)`)."""
+
+    for idx in indexes:
+        value = row[idx]
+        if value:
+            return value
+    return None
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else str(value)
+
+
+def _decimal(value: Any) -> Decimal:
+    if value is None or value == "":
+        return _ZERO
+    if isinstance(value, int):
+        return Decimal(value)
+    return Decimal(str(value).strip())
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _direction_parser(
+    buy_labels: tuple[str, ...], sell_labels: tuple[str, ...]
+) -> Callable[[Any], DirectionEnum | None]:
+    buy = tuple(label.lower() for label in buy_labels)
+    sell = tuple(label.lower() for label in sell_labels)
+    cache: dict[Any, DirectionEnum | None] = {}
+
+    def parse(value: Any) -> DirectionEnum | None:
+        try:
+            return cache[value]
+        except KeyError:
+            pass
+        label = _text(value).lower()
+        if any(b in label for b in buy):
+            direction = DirectionEnum.buy
+        elif any(s in label for s in sell):
+            direction = DirectionEnum.sell
+        else:
+            direction = None
+        cache[value] = direction
+        return direction
+
+    return parse
+
+
+def _date_parser(formats: tuple[str, ...]) -> Callable[[Any], datetime | None]:
+    # Reports use one date format throughout, so try the last successful format first.
+    parsers = [_compile_date_format(fmt) for fmt in formats]
+
+    def parse(value: Any) -> datetime | None:
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, date):
+            return datetime(value.year, value.month, value.day)
+
+        text = str(value).strip()
+        if not text:
+            return None
+        for idx, parser in enumerate(parsers):
+            result = parser(text)
+            if result is not None:
+                if idx:
+                    parsers.insert(0, parsers.pop(idx))
+                return result
+        return None
+
+    return parse
+
+
+def _compile_date_format(fmt: str) -> Callable[[str], datetime | None]:
+    """
+    Compile a strptime format made of numeric date/time directives into a regex-based parser;
+    formats with other directives fall back to `datetime.strptime`.
+    """
+
+    pattern = []
+    fields = []
+    for literal, directive in re.findall(r"([^%]*)(%.)?", fmt):
+        pattern.append(re.escape(literal))
+        if not directive:
+            continue
+        if directive not in _DATE_DIRECTIVES:
+            return partial(_strptime_or_none, fmt=fmt)
+        field_name, digits = _DATE_DIRECTIVES[directive]
+        pattern.append(f"([0-9]{{{digits}}})")
+        fields.append(field_name)
+
+    regex = re.compile("".join(pattern))
+
+    def parse(text: str) -> datetime | None:
+        match = regex.fullmatch(text)
+        if match is None:
+            return None
+        try:
+            return datetime(**dict(zip(fields, map(int, match.groups()), strict=True)))
+        except ValueError:
+            return None
+
+    return parse
+
+
+def _strptime_or_none(text: str, fmt: str) -> datetime | None:
+    try:
+        return datetime.strptime(text, fmt)
+    except ValueError:
+        return None
+
+
+def _commission_parser(pattern: str, intern: Callable[[str], str]) -> Callable[[Any], tuple[Decimal, str]]:
+    regex = re.compile(pattern)
+    cache: dict[str, tuple[Decimal, str]] = {}
+
+    def parse(value: Any) -> tuple[Decimal, str]:
+        text = _text(value)
+        try:
+            return cache[text]
+        except KeyError:
+            pass
+        match = regex.match(text)
+        result = (Decimal(match["value"]), intern(match["currency"].upper())) if match else (_ZERO, "")
+        cache[text] = result
+        return result
+
+    return parse
@@ -1,13 +1,84 @@
-from pit8c.brokers import freedom24
+"""
+Broker adapter registry.
+
+Adapters are discovered through the `pit8c.brokers` entry point group, where each entry point maps a broker name
+to an adapter class (or a zero-argument factory), e.g. in the adapter package's pyproject.toml:
+
+    [project.entry-points."pit8c.brokers"]
+    mybroker = "mypackage.adapter:MyBrokerAdapter"
+
+Adapter modules are imported only when their broker is requested, and one adapter instance is kept per process.
+Built-in adapters are also registered here, so they resolve even without installed package metadata.
+"""
+
+import threading
+from importlib.metadata import EntryPoint, entry_points
+
 from pit8c.brokers.base import BrokerAdapter, SupportedBroker
 from pit8c.exceptions import Pit8cError
 
+ENTRY_POINT_GROUP = "pit8c.brokers"
+
+_BUILTIN_ADAPTERS: dict[str, str] = {
+    SupportedBroker.freedom24.value: "pit8c.brokers.freedom24:Freedom24Adapter",
+}
+
+_lock = threading.Lock()
+_registered: dict[str, EntryPoint] | None = None
+_adapters: dict[str, BrokerAdapter] = {}
+
+
+def available_brokers() -> list[str]:
+    """Return names of all registered brokers (built-in and installed plugins) without importing adapters."""
+
+    return sorted(_registered_entry_points())
+
+
+def get_broker_adapter(broker: SupportedBroker | str) -> BrokerAdapter:
+    """Return the (per-process cached) adapter implementation for the given broker."""
+
+    name = broker.value if isinstance(broker, SupportedBroker) else broker
+    adapter = _adapters.get(name)
+    if adapter is not None:
+        return adapter
+
+    entry_point = _registered_entry_points().get(name)
+    if entry_point is None:
+        raise Pit8cError(f"Unsupported broker '{name}'. Supported brokers: {', '.join(available_brokers())}")
+
+    with _lock:
+        adapter = _adapters.get(name)
+        if adapter is None:
+            try:
+                factory = entry_point.load()
+            except (ImportError, AttributeError) as exc:
+                raise Pit8cError(f"Failed to load adapter for broker '{name}' ({entry_point.value}): {exc}") from exc
+            adapter = _adapters[name] = factory()
+        return adapter
+
+
+def clear_broker_registry_cache() -> None:
+    """Forget discovered entry points and cached adapter instances (e.g. after installing a plugin)."""
+
+    global _registered
+    with _lock:
+        _registered = None
+        _adapters.clear()
+
 
-def get_broker_adapter(broker: SupportedBroker) -> BrokerAdapter:
-    """Return the adapter implementation for the given broker enum."""
+def _registered_entry_points() -> dict[str, EntryPoint]:
+    """Read broker entry points from package metadata once; installed plugins override built-ins by name."""
 
-    match broker:
-        case SupportedBroker.freedom24:
-            return freedom24.Freedom24Adapter()
-        case _:
-            raise Pit8cError(f"Broker '{broker}' not supported yet")
+    global _registered
+    registered = _registered
+    if registered is None:
+        with _lock:
+            if _registered is None:
+                discovered = {
+                    name: EntryPoint(name=name, value=value, group=ENTRY_POINT_GROUP)
+                    for name, value in _BUILTIN_ADAPTERS.items()
+                }
+                discovered.update((ep.name, ep) for ep in entry_points(group=ENTRY_POINT_GROUP))
+                _registered = discovered
+            registered = _registered
+    return registered
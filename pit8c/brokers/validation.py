@@ -0,0 +1,104 @@
+"""
+Construction of `Trade` models from field dicts prepared by broker adapters.
+
+Adapters collect the fields of all report rows first and build trades in one step: in strict mode every row is
+validated by pydantic in a single `TypeAdapter(list[Trade])` call (instead of paying the per-call overhead of
+`Trade(...)` for each row); in fast mode the field dicts become the instances' `__dict__` directly, without
+validation, which skips even the per-call work of `Trade.model_construct`.
+Invalid rows are reported as `Pit8cError` listing report row numbers (the header row being row 1).
+"""
+
+from collections.abc import Iterable, Iterator, Sequence
+from enum import StrEnum
+from itertools import islice
+from typing import Any
+
+from pydantic import TypeAdapter, ValidationError
+
+from pit8c.exceptions import Pit8cError
+from pit8c.models import Trade
+
+# Rows validated at once when trades are built lazily (see `iter_build_trades`).
+VALIDATION_CHUNK_SIZE = 4096
+
+# Validation errors listed in one error message; the rest are only counted.
+_MAX_REPORTED_ERRORS = 10
+
+_TRADES_ADAPTER = TypeAdapter(list[Trade])
+
+# Values of optional fields missing from a field dict built in fast mode.
+_TRADE_DEFAULTS = {name: info.default for name, info in Trade.model_fields.items() if not info.is_required()}
+_TRADE_FIELD_COUNT = len(Trade.model_fields)
+
+
+class TradeValidation(StrEnum):
+    """How adapters turn parsed report rows into `Trade` models."""
+
+    strict = "strict"  # pydantic validation of all rows in one call
+    fast = "fast"  # no validation, for trusted reports (values are still converted by the adapter)
+
+
+def invalid_row_error(row_number: int, detail: object) -> Pit8cError:
+    """Error for a report row whose values cannot be turned into a trade."""
+
+    return Pit8cError(f"Invalid trade in report row {row_number}: {detail}")
+
+
+def build_trades(
+    fields: list[dict[str, Any]], row_numbers: Sequence[int], validation: TradeValidation = TradeValidation.strict
+) -> list[Trade]:
+    """Build trades from per-row field dicts (`row_numbers[i]` is the report row of `fields[i]`)."""
+
+    if validation == TradeValidation.fast:
+        return _construct_trades(fields)
+    try:
+        return _TRADES_ADAPTER.validate_python(fields)
+    except ValidationError as exc:
+        raise _validation_error(exc, row_numbers) from None
+
+
+def iter_build_trades(
+    rows: Iterable[tuple[int, dict[str, Any]]],
+    validation: TradeValidation = TradeValidation.strict,
+    chunk_size: int = VALIDATION_CHUNK_SIZE,
+) -> Iterator[Trade]:
+    """Lazy counterpart of `build_trades` for `(row number, fields)` pairs, validating `chunk_size` rows at a time."""
+
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield from build_trades([f for _, f in chunk], [n for n, _ in chunk], validation)
+
+
+def _construct_trades(fields: list[dict[str, Any]]) -> list[Trade]:
+    """
+    Build trades without validation, like `Trade.model_construct` but setting the instance state directly.
+    The field dicts are adopted as the trades' `__dict__`, so adapters must pass fresh dicts.
+    """
+
+    new, set_attribute = object.__new__, object.__setattr__
+    trades = []
+    for trade_fields in fields:
+        trade = new(Trade)
+        set_attribute(trade, "__pydantic_fields_set__", set(trade_fields))
+        set_attribute(
+            trade,
+            "__dict__",
+            trade_fields if len(trade_fields) == _TRADE_FIELD_COUNT else {**_TRADE_DEFAULTS, **trade_fields},
+        )
+        set_attribute(trade, "__pydantic_extra__", None)
+        set_attribute(trade, "__pydantic_private__", None)
+        trades.append(trade)
+    return trades
+
+
+def _validation_error(exc: ValidationError, row_numbers: Sequence[int]) -> Pit8cError:
+    errors = exc.errors(include_url=False)
+    lines = []
+    for error in errors[:_MAX_REPORTED_ERRORS]:
+        index, *field = error["loc"]
+        location = ".".join(map(str, field))
+        row = row_numbers[index] if isinstance(index, int) and index < len(row_numbers) else index
+        lines.append(f"  row {row}, {location}: {error['msg']}")
+    if len(errors) > _MAX_REPORTED_ERRORS:
+        lines.append(f"  ... and {len(errors) - _MAX_REPORTED_ERRORS} more")
+    return Pit8cError(f"Invalid trades in report ({len(errors)} errors):\n" + "\n".join(lines))
@@ -0,0 +1,284 @@
+"""
+On-disk cache of PIT-8C results.
+
+Entries are keyed by `result_cache_key`: a digest of the input trades, the tax year, the library version and the
+options that shape the result (output paths, engines). Any change of those produces a new key; stale entries are only
+evicted by the size policy (least recently used first). Each entry also records the NBP archives (year -> currencies)
+its closed positions used and a fingerprint of their rates; a lookup fingerprints just those archives again, so
+a hit loads no more rate data than computing the result would, and changed rates are treated as a miss. Artifact
+files are stamped with their size and modification time, and an entry whose artifacts were removed or rewritten
+since is treated as a miss too.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+import pit8c
+from pit8c.models import ClosedPosition, Trade
+from pit8c.result import Pit8cArtifacts, Pit8cResult, Pit8cTotals
+
+logger = logging.getLogger(__name__)
+
+# Bump when the entry layout or the meaning of cached results changes.
+CACHE_FORMAT = 3
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_ENTRY_SUFFIX = ".json"
+
+
+@dataclass(frozen=True, slots=True)
+class ResultCacheStats:
+    """Counters of a result cache since it was created, plus its current size on disk."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+
+class _CacheEntry(BaseModel):
+    format: int
+    tax_year: int
+    input_reports: list[Path]
+    trades: list[Trade]
+    closed_positions: list[ClosedPosition]
+    # Profit/loss positions are the closed positions themselves, stored as indexes into `closed_positions`.
+    profit_indexes: list[int]
+    loss_indexes: list[int]
+    totals: tuple[Decimal, Decimal, Decimal]
+    pit8c_text: str | None
+    pit8c_pdf_path: Path | None
+    closed_positions_xlsx_path: Path | None
+    extra_files: dict[str, Path]
+    # Artifact path -> (size, mtime_ns) when the result was stored.
+    artifact_stamps: dict[str, tuple[int, int]]
+    # Rate archives (year -> currencies) the result was computed from, and the fingerprint of their rates.
+    rate_archives: dict[int, set[str]]
+    rate_fingerprint: str
+
+
+class ResultCache:
+    """
+    Directory of cached `Pit8cResult`s (safe to share between threads of one process).
+
+    When the entries exceed `max_bytes` (or `max_entries`, if set), the least recently used ones are removed.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int | None = None) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str, rate_fingerprint: Callable[[dict[int, set[str]]], str | None]) -> Pit8cResult | None:
+        """
+        Return the result stored under `key`, or None (a miss) when absent, unreadable, its artifacts changed or
+        `rate_fingerprint` of the entry's rate archives differs from the stored one.
+        """
+
+        path = self._entry_path(key)
+        result: Pit8cResult | None = None
+        try:
+            entry = _CacheEntry.model_validate_json(path.read_bytes())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValidationError) as exc:
+            logger.warning("Ignoring unreadable result cache entry '%s': %s", path, exc)
+        else:
+            if (
+                entry.format == CACHE_FORMAT
+                and _artifacts_unchanged(entry.artifact_stamps)
+                and rate_fingerprint(entry.rate_archives) == entry.rate_fingerprint
+            ):
+                result = _entry_to_result(entry)
+                _mark_used(path)
+
+        with self._lock:
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return result
+
+    def put(self, key: str, result: Pit8cResult, rate_archives: Mapping[int, set[str]], rate_fingerprint: str) -> None:
+        """
+        Store `result`, computed from the rates of `rate_archives` identified by `rate_fingerprint`, under `key`
+        (atomically), then evict old entries beyond the size limits.
+        """
+
+        entry = _result_to_entry(result, rate_archives, rate_fingerprint)
+        data = entry.model_dump_json().encode()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=_ENTRY_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            Path(tmp_name).replace(self._entry_path(key))
+            _mark_used(self._entry_path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> ResultCacheStats:
+        """Return hit/miss/eviction counters and the current number and size of entries."""
+
+        sizes = [_file_size(path) for path in self._entries()]
+        with self._lock:
+            return ResultCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(sizes),
+                size_bytes=sum(sizes),
+            )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{_ENTRY_SUFFIX}"
+
+    def _entries(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [p for p in self.directory.glob(f"*{_ENTRY_SUFFIX}") if not p.name.startswith(".tmp-")]
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort(reverse=True)
+
+        total = 0
+        for count, (_mtime, size, path) in enumerate(entries, start=1):
+            total += size
+            # The newest entry is always kept, even when it alone exceeds the limit.
+            over_limit = total > self.max_bytes or (self.max_entries is not None and count > self.max_entries)
+            if count > 1 and over_limit:
+                path.unlink(missing_ok=True)
+                with self._lock:
+                    self._evictions += 1
+
+
+def result_cache_key(trades: Iterable[Trade], tax_year: int, options: Mapping[str, Any]) -> str:
+    """
+    Return the cache key of a run: a SHA-256 digest of the trades (in input order), the tax year, the library version
+    and the result-shaping `options` (JSON-serializable values).
+    """
+
+    digest = hashlib.sha256()
+    header = {
+        "format": CACHE_FORMAT,
+        "version": pit8c.__version__,
+        "tax_year": tax_year,
+        "options": options,
+    }
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode())
+    for t in trades:
+        digest.update(
+            f"\n{t.isin}|{t.ticker}|{t.currency}|{t.direction.value}|{t.date.isoformat()}|{t.quantity}|{t.amount}|"
+            f"{t.commission_value}|{t.commission_currency}|{t.price}|{t.trade_num}".encode()
+        )
+    return digest.hexdigest()
+
+
+def _result_to_entry(result: Pit8cResult, rate_archives: Mapping[int, set[str]], rate_fingerprint: str) -> _CacheEntry:
+    indexes = {id(cp): idx for idx, cp in enumerate(result.closed_positions)}
+    artifacts = result.artifacts
+    return _CacheEntry(
+        format=CACHE_FORMAT,
+        tax_year=result.tax_year,
+        input_reports=result.input_reports,
+        trades=result.trades,
+        closed_positions=result.closed_positions,
+        profit_indexes=[indexes[id(cp)] for cp in result.profit_positions],
+        loss_indexes=[indexes[id(cp)] for cp in result.loss_positions],
+        totals=(result.totals.income_pln, result.totals.costs_pln, result.totals.profit_pln),
+        pit8c_text=artifacts.pit8c_text,
+        pit8c_pdf_path=artifacts.pit8c_pdf_path,
+        closed_positions_xlsx_path=artifacts.closed_positions_xlsx_path,
+        extra_files=artifacts.extra_files,
+        artifact_stamps={
+            str(path): _stamp(path)
+            for path in (
+                artifacts.pit8c_pdf_path,
+                artifacts.closed_positions_xlsx_path,
+                *artifacts.extra_files.values(),
+            )
+            if path is not None
+        },
+        rate_archives=dict(rate_archives),
+        rate_fingerprint=rate_fingerprint,
+    )
+
+
+def _entry_to_result(entry: _CacheEntry) -> Pit8cResult:
+    income_pln, costs_pln, profit_pln = entry.totals
+    return Pit8cResult(
+        tax_year=entry.tax_year,
+        input_reports=entry.input_reports,
+        trades=entry.trades,
+        closed_positions=entry.closed_positions,
+        profit_positions=[entry.closed_positions[idx] for idx in entry.profit_indexes],
+        loss_positions=[entry.closed_positions[idx] for idx in entry.loss_indexes],
+        totals=Pit8cTotals(income_pln=income_pln, costs_pln=costs_pln, profit_pln=profit_pln),
+        artifacts=Pit8cArtifacts(
+            pit8c_text=entry.pit8c_text,
+            pit8c_pdf_path=entry.pit8c_pdf_path,
+            closed_positions_xlsx_path=entry.closed_positions_xlsx_path,
+            extra_files=entry.extra_files,
+        ),
+    )
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _artifacts_unchanged(stamps: dict[str, tuple[int, int]]) -> bool:
+    try:
+        return all(_stamp(Path(path)) == tuple(stamp) for path, stamp in stamps.items())
+    except OSError:
+        return False
+
+
+def _mark_used(path: Path) -> None:
+    """Set the modification time (the eviction order) precisely, as file systems may keep coarse timestamps."""
+
+    now = time.time_ns()
+    with contextlib.suppress(FileNotFoundError):
+        os.utime(path, ns=(now, now))
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
@@ -1,30 +1,127 @@
+import logging
+import sys
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any
 
 import typer
 
 from pit8c.api import Pit8c
-from pit8c.brokers.base import SupportedBroker
+from pit8c.batch import BatchOutcome, load_manifest, run_batch, write_batch_summary
+from pit8c.brokers.registry import get_broker_adapter
+from pit8c.brokers.validation import TradeValidation
+from pit8c.cache import ResultCache
 from pit8c.exceptions import Pit8cError
+from pit8c.exchange.provider import NbpExchangeRatesProvider
+from pit8c.io.xlsx import XlsxReader
+from pit8c.progress import STAGE_EXCHANGE_RATES, STAGE_MATCH, STAGE_READ_REPORTS
+from pit8c.server import Pit8cService
+from pit8c.server import serve as serve_http
+from pit8c.tracing import JsonLinesSpanExporter
+from pit8c.watch import IncrementalReportsProcessor, WatchUpdate, watch_reports_path
 
 app = typer.Typer(pretty_exceptions_show_locals=False)
 
+_BROKER_HELP = "Broker name (built-in, e.g. freedom24, or registered under the 'pit8c.brokers' entry point group)"
+_REPORTS_PATH_HELP = "Path to annual report (.xlsx) or a directory with multiple annual reports"
+_YEAR_HELP = "Tax year to calculate PIT-8C for"
+
+_PROGRESS_LABELS = {
+    STAGE_READ_REPORTS: "Reading reports",
+    STAGE_MATCH: "Matching trades",
+    STAGE_EXCHANGE_RATES: "Loading NBP rates",
+}
+
+
+class _ProgressBar:
+    """Progress callback drawing one progress bar per pipeline stage on stderr (stages without a total are skipped)."""
+
+    def __init__(self) -> None:
+        self._stage: str | None = None
+        self._bar: Any = None
+        self._done = 0
+
+    def __call__(self, stage: str, done: int, total: int | None) -> None:
+        if stage != self._stage:
+            self.close()
+            self._stage = stage
+            if total:
+                self._bar = typer.progressbar(length=total, label=_PROGRESS_LABELS.get(stage, stage), file=sys.stderr)
+                self._bar.__enter__()
+                self._done = 0
+        if self._bar is not None:
+            self._bar.update(done - self._done)
+            self._done = done
+
+    def close(self) -> None:
+        """Finish the bar of the current stage."""
+
+        if self._bar is not None:
+            self._bar.__exit__(None, None, None)
+            self._bar = None
+
 
 @app.callback(invoke_without_command=True)
 def main(
-    broker: Annotated[SupportedBroker, typer.Option(..., help="Broker name")],
-    reports_path: Annotated[
-        Path, typer.Option(..., help="Path to annual report (.xlsx) or a directory with multiple annual reports")
-    ],
-    year: Annotated[int, typer.Option(..., "--year", "-y", help="Tax year to calculate PIT-8C for")],
+    ctx: typer.Context,
+    *,
+    broker: Annotated[str | None, typer.Option(help=_BROKER_HELP)] = None,
+    reports_path: Annotated[Path | None, typer.Option(help=_REPORTS_PATH_HELP)] = None,
+    year: Annotated[int | None, typer.Option("--year", "-y", help=_YEAR_HELP)] = None,
+    sheet: Annotated[
+        str | None, typer.Option(help="Sheet with trades (discovered by its header row when omitted)")
+    ] = None,
+    trace_file: Annotated[Path | None, typer.Option(help="Append pipeline spans as JSON lines to this file")] = None,
+    xlsx_reader: Annotated[
+        XlsxReader, typer.Option(help="Report reader: openpyxl, or stream (direct XML parsing, faster)")
+    ] = XlsxReader.openpyxl,
+    streaming: Annotated[
+        bool, typer.Option(help="Stream trades and positions instead of keeping them in memory (chronological reports)")
+    ] = False,
+    result_cache: Annotated[
+        Path | None,
+        typer.Option(help="Directory caching results, reused while reports and exchange rates are unchanged"),
+    ] = None,
+    rates_cache: Annotated[
+        Path | None,
+        typer.Option(help="Directory caching NBP rate archives (the current year's is revalidated hourly)"),
+    ] = None,
+    trade_validation: Annotated[
+        TradeValidation, typer.Option(help="Trade rows: strict (validated, invalid rows reported) or fast (trusted)")
+    ] = TradeValidation.strict,
 ) -> None:
     """
     Process the annual tax report using the specified broker adapter,
     reading reports_path and generating PIT-8C and .xlsx file with all closed positions (for audit).
     """
+    if ctx.invoked_subcommand is not None:
+        return
+
+    missing = [
+        name
+        for name, value in (("--broker", broker), ("--reports-path", reports_path), ("--year", year))
+        if value is None
+    ]
+    if missing:
+        typer.echo(ctx.get_usage(), err=True)
+        typer.echo(f"Missing option(s): {', '.join(missing)}", err=True)
+        raise typer.Exit(2)
+
+    tracer = JsonLinesSpanExporter(trace_file) if trace_file is not None else None
+    progress_bar = _ProgressBar() if sys.stderr.isatty() else None
     try:
-        pit8c = Pit8c(broker=broker)
-        result = pit8c.process_reports_path(reports_path=reports_path, tax_year=year)
+        pit8c = Pit8c(
+            broker=broker,
+            sheet_name=sheet,
+            tracer=tracer,
+            xlsx_reader=xlsx_reader,
+            streaming=streaming,
+            trade_validation=trade_validation,
+            exchange_provider=NbpExchangeRatesProvider(cache_dir=rates_cache),
+            result_cache=ResultCache(result_cache) if result_cache is not None else None,
+        )
+        result = pit8c.process_reports_path(reports_path=reports_path, tax_year=year, progress=progress_bar)
+        if progress_bar is not None:
+            progress_bar.close()
 
         if result.artifacts.pit8c_text:
             typer.echo(result.artifacts.pit8c_text)
@@ -37,6 +134,125 @@ def main(
     except Pit8cError as e:
         typer.echo(str(e), err=True)
         raise typer.Exit(1) from None
+    finally:
+        if progress_bar is not None:
+            progress_bar.close()
+        if tracer is not None:
+            tracer.close()
+
+
+@app.command()
+def watch(
+    broker: Annotated[str, typer.Option(..., help=_BROKER_HELP)],
+    reports_path: Annotated[Path, typer.Option(..., help=_REPORTS_PATH_HELP)],
+    year: Annotated[int, typer.Option(..., "--year", "-y", help=_YEAR_HELP)],
+    interval: Annotated[float, typer.Option(help="Polling interval in seconds")] = 1.0,
+) -> None:
+    """
+    Watch reports_path and print recomputed PIT-8C totals whenever report files change.
+    Parsed reports and exchange rates stay in memory, so only changed files are re-read.
+    """
+    try:
+        adapter = get_broker_adapter(broker)
+    except Pit8cError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1) from None
+    processor = IncrementalReportsProcessor(adapter=adapter, reports_path=reports_path, tax_year=year)
+
+    def _on_update(update: WatchUpdate) -> None:
+        typer.echo(update.pit8c_text)
+        changed = [p.name for p in [*update.changed_reports, *update.removed_reports]]
+        typer.echo(f"Recomputed after changes in {', '.join(changed)} in {update.elapsed_seconds * 1000:.1f} ms")
+
+    def _on_error(exc: Exception) -> None:
+        typer.echo(f"Failed to recompute: {exc}", err=True)
+
+    typer.echo(f"Watching '{reports_path}' (Ctrl+C to stop)")
+    try:
+        watch_reports_path(processor, on_update=_on_update, on_error=_on_error, interval=interval)
+    except KeyboardInterrupt:
+        typer.echo("Stopped watching")
+
+
+@app.command()
+def serve(
+    broker: Annotated[str, typer.Option(..., help="Default broker for uploaded reports")],
+    host: Annotated[str, typer.Option(help="Interface to bind to")] = "127.0.0.1",
+    port: Annotated[int, typer.Option(help="Port to listen on")] = 8000,
+    workers: Annotated[int, typer.Option(help="Number of worker threads processing requests")] = 4,
+    output_dir: Annotated[
+        Path | None, typer.Option(help="Directory for generated PDF/XLSX artifacts (not written when omitted)")
+    ] = None,
+) -> None:
+    """
+    Serve a local HTTP API (POST /trades, POST /reports) that reuses warm NBP rate caches across requests.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        service = Pit8cService(broker=broker, output_dir=output_dir)
+    except Pit8cError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1) from None
+    try:
+        serve_http(service, host=host, port=port, max_workers=workers)
+    except KeyboardInterrupt:
+        typer.echo("Server stopped")
+
+
+@app.command()
+def batch(
+    manifest: Annotated[Path, typer.Argument(help="Manifest (.toml or .json) listing accounts to process")],
+    *,
+    workers: Annotated[int, typer.Option(help="Number of accounts processed concurrently")] = 4,
+    checkpoint: Annotated[
+        Path | None, typer.Option(help="Checkpoint of completed accounts (default: <manifest>.checkpoint.jsonl)")
+    ] = None,
+    summary: Annotated[
+        Path | None, typer.Option(help="Summary CSV with totals, timings and errors (default: <manifest>.summary.csv)")
+    ] = None,
+    rates_cache: Annotated[
+        Path | None,
+        typer.Option(help="Directory caching NBP rate archives (the current year's is revalidated hourly)"),
+    ] = None,
+    xlsx_reader: Annotated[
+        XlsxReader, typer.Option(help="Report reader: openpyxl, or stream (direct XML parsing, faster)")
+    ] = XlsxReader.openpyxl,
+) -> None:
+    """
+    Process every account of a manifest with shared, warm NBP rates. Completed accounts are checkpointed,
+    so rerunning the same command after a crash or failures only processes the remaining accounts.
+    """
+    checkpoint = checkpoint or manifest.with_name(f"{manifest.stem}.checkpoint.jsonl")
+    summary = summary or manifest.with_name(f"{manifest.stem}.summary.csv")
+    try:
+        entries = load_manifest(manifest)
+    except Pit8cError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1) from None
+
+    def _on_outcome(outcome: BatchOutcome) -> None:
+        if outcome.error is not None:
+            typer.echo(f"[failed] {outcome.entry.id}: {outcome.error}", err=True)
+        elif outcome.totals is not None:
+            typer.echo(
+                f"[{outcome.status}] {outcome.entry.id}: profit {outcome.totals.profit_pln} PLN "
+                f"({outcome.elapsed_seconds:.1f} s)"
+            )
+
+    outcomes = run_batch(
+        entries,
+        checkpoint_path=checkpoint,
+        exchange_provider=NbpExchangeRatesProvider(cache_dir=rates_cache),
+        max_workers=workers,
+        xlsx_reader=xlsx_reader,
+        on_outcome=_on_outcome,
+    )
+    write_batch_summary(outcomes, summary)
+
+    failed = sum(outcome.error is not None for outcome in outcomes)
+    typer.echo(f"Processed {len(outcomes) - failed}/{len(outcomes)} accounts, summary written to '{summary}'")
+    if failed:
+        raise typer.Exit(1)
 
 
 if __name__ == "__main__":
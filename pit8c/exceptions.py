@@ -1,2 +1,6 @@
 class Pit8cError(Exception):
     pass
+
+
+class Pit8cCancelledError(Pit8cError):
+    """Raised at the next checkpoint of a run whose cancellation token was cancelled."""
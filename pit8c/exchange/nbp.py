@@ -1,102 +1,336 @@
 import csv
+import hashlib
 import io
+import json
 import logging
+import os
 import re
-from bisect import bisect_right
-from datetime import date, timedelta
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
+from itertools import pairwise
+from pathlib import Path
 
 import requests
 
+from pit8c.metrics import record_rate_archive_fetch
+from pit8c.progress import check_cancelled
+from pit8c.tracing import span
+
 logger = logging.getLogger(__name__)
 
+NBP_ARCHIVE_URL = "https://static.nbp.pl/dane/kursy/Archiwum/archiwum_tab_a_{year}.csv"
+
+# Seconds an archive of a year that has not ended yet (the current one) is used before it is revalidated.
+DEFAULT_ARCHIVE_TTL = 3600.0
+
+_CURRENCY_COLUMN = re.compile(r"^\s*(\d+)\s*([A-Za-z]+)\s*$")
+
+
+@dataclass(slots=True)
+class _Archive:
+    """Archive CSV of one year with its HTTP validators."""
+
+    text: str
+    etag: str | None
+    last_modified: str | None
+    # Wall-clock time of the last download or successful revalidation.
+    checked_at: float
+    # Currency columns of the header row and the end offset of the last data row, known once the text was parsed.
+    columns: dict[str, tuple[int, int]] | None = None
+    data_end: int = 0
+
+
+@dataclass(slots=True)
+class _ParsedArchive:
+    # Currency -> (column index, unit) from the header row.
+    columns: dict[str, tuple[int, int]]
+    dates: list[date]
+    # Cells of the data row of each of `dates`.
+    rows: list[list[str]]
+    data_end: int
+
+
+class _YearRates:
+    """
+    Every currency column of one year's archive: quotation dates in ascending order with their split CSV rows.
+    A currency's cells are converted to per-unit Decimal rates once, when the currency is first looked up.
+    """
+
+    __slots__ = ("_rates", "currencies", "dates", "rows")
+
+    def __init__(self, currencies: dict[str, tuple[int, int]]) -> None:
+        self.currencies = currencies
+        self.dates: list[date] = []
+        self.rows: list[list[str]] = []
+        self._rates: dict[str, list[Decimal | None]] = {}
+
+    def extend(self, parsed: _ParsedArchive) -> None:
+        """Append parsed rows (re-sorting in the unlikely case they are not after the rows already present)."""
+
+        size = len(self.dates)
+        self.dates.extend(parsed.dates)
+        self.rows.extend(parsed.rows)
+        if any(a >= b for a, b in pairwise(self.dates[max(size - 1, 0) :])):
+            # A date repeated in the archive keeps its last row, like a later table correcting an earlier one.
+            last_row = {d: i for i, d in enumerate(self.dates)}
+            order = [last_row[d] for d in sorted(last_row)]
+            self.dates = [self.dates[i] for i in order]
+            self.rows = [self.rows[i] for i in order]
+            self._rates.clear()
+            return
+        for currency, rates in self._rates.items():
+            rates.extend(self._convert(currency, parsed.rows))
+
+    def extended(self, parsed: _ParsedArchive) -> "_YearRates":
+        """Return a copy with the parsed rows appended (tables readers may hold are never changed in place)."""
+
+        table = _YearRates(self.currencies)
+        table.dates = self.dates.copy()
+        table.rows = self.rows.copy()
+        # Lock-free readers may convert new columns of this (published) table meanwhile: iterate over a snapshot,
+        # taken in one step under the GIL.
+        table._rates = {currency: rates.copy() for currency, rates in list(self._rates.items())}
+        table.extend(parsed)
+        return table
+
+    def rates(self, currency: str) -> list[Decimal | None] | None:
+        """
+        Return the rate of `currency` on each date (None for empty or invalid cells), or None without a column.
+        Concurrent first lookups may convert a column twice; both store equal lists, so no lock is needed.
+        """
+
+        rates = self._rates.get(currency)
+        if rates is None and currency in self.currencies:
+            rates = self._rates[currency] = self._convert(currency, self.rows)
+        return rates
+
+    def last_rate(self, target: date, currency: str) -> tuple[date, Decimal] | None:
+        """Return the last quotation date on or before `target` with a rate of `currency`, and that rate."""
+
+        rates = self._rates.get(currency) or self.rates(currency)
+        if rates is None:
+            return None
+        idx = bisect_right(self.dates, target) - 1
+        while idx >= 0:
+            rate = rates[idx]
+            if rate is not None:
+                return self.dates[idx], rate
+            idx -= 1
+        return None
+
+    def _convert(self, currency: str, rows: list[list[str]]) -> list[Decimal | None]:
+        idx, unit = self.currencies[currency]
+        divisor = Decimal(unit)
+        rates: list[Decimal | None] = []
+        for row in rows:
+            rate = None
+            raw_val = row[idx].strip() if idx < len(row) else ""
+            if raw_val:
+                try:
+                    rate = Decimal(raw_val.replace(",", "."))
+                except InvalidOperation:
+                    pass
+                else:
+                    if unit != 1:
+                        rate /= divisor
+            rates.append(rate)
+        return rates
+
+
+@dataclass(frozen=True, slots=True)
+class _RatesIndex:
+    """Loaded year tables, replaced as a whole whenever a year is loaded, so readers never see a partial update."""
+
+    years: dict[int, _YearRates]
+    sorted_years: tuple[int, ...]
+
 
 class NbpExchange:
     """
     Downloads and caches currency rates from NBP's archive CSV for a given year.
     Provides method to get rate for a specific (date, currency) pair.
-    """
 
-    def __init__(self) -> None:
-        self._rates: dict[date, dict[str, Decimal]] = {}
-        self._sorted_dates: list[date] = []
-        self._loaded_years: dict[int, set[str]] = {}
+    A year's archive is parsed once into a table with every currency column, so a later request for another currency
+    of a loaded year is a lookup. Archives are looked up in memory, then in `cache_dir` (when given), then downloaded.
+    An archive fetched before its year ended keeps growing on the server, so after `ttl` seconds it is revalidated
+    with a conditional GET (ETag / Last-Modified): "304 Not Modified" costs one round trip, and when rows were
+    appended only the new rows are parsed.
 
-    def _rebuild_sorted_dates(self) -> None:
-        """Rebuild the cached sorted list of available rate dates."""
-        self._sorted_dates = sorted(self._rates)
+    Instances are safe for concurrent use. Lookups read an immutable snapshot of the loaded tables and never take a
+    lock; loading publishes a new snapshot. Loads of one year are single-flight: threads requesting a year that is
+    being loaded wait for that load instead of downloading the archive again.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        ttl: float = DEFAULT_ARCHIVE_TTL,
+        archive_url: str = NBP_ARCHIVE_URL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._index = _RatesIndex(years={}, sorted_years=())
+        # Currencies requested per year so far (reported as fetched whenever the year's archive is downloaded).
+        self._requested: dict[int, set[str]] = {}
+        self._archives: dict[int, _Archive] = {}
+        # Guards `_requested`, `_year_locks` and publishing `_index`; never held during I/O or parsing.
+        self._lock = threading.Lock()
+        # One lock per year, held while that year is loaded (single-flight downloads).
+        self._year_locks: dict[int, threading.Lock] = {}
+        self._cache_dir = cache_dir
+        self._ttl = ttl
+        self._archive_url = archive_url
+        self._clock = clock
 
     def load_year(self, year: int, currencies: set[str]) -> None:
         """
-        Download the CSV from NBP archive for the given year, e.g.
+        Make rates of the given year available, e.g. from
         https://static.nbp.pl/dane/kursy/Archiwum/archiwum_tab_a_{year}.csv
 
-        Parse only the currencies in the given set, e.g. {"USD", "EUR", "HUF"}.
-        If a column in the header is "1USD" or "100HUF", we extract the code part
-        (USD, HUF) via regex and see if it's in `currencies`.
+        The first load parses every currency column (headers like "1USD" or "100HUF" are normalized to per-unit
+        rates); `currencies`, e.g. {"USD", "EUR", "HUF"}, only decide whether anything is needed at all and which
+        currencies are reported as fetched.
         """
         currencies_upper = {c.upper() for c in currencies if c and c.upper() != "PLN"}
         if not currencies_upper:
             return
 
-        already_loaded = self._loaded_years.get(year, set())
-        missing_currencies = currencies_upper - already_loaded
-        if not missing_currencies:
+        with self._lock:
+            self._requested.setdefault(year, set()).update(currencies_upper)
+            year_lock = self._year_locks.setdefault(year, threading.Lock())
+        if self._is_loaded(year):
             return
+        with year_lock:
+            # Another thread may have loaded the year while this one waited.
+            if not self._is_loaded(year):
+                self._load_year(year, currencies_upper)
 
-        url = f"https://static.nbp.pl/dane/kursy/Archiwum/archiwum_tab_a_{year}.csv"
-        logger.info("Downloading NBP archive from: %s", url)
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+    def _is_loaded(self, year: int) -> bool:
+        """Whether the table of `year` is loaded from an archive that does not need revalidation yet."""
 
-        reader = csv.reader(io.StringIO(response.text), delimiter=";")
+        archive = self._archives.get(year)
+        return year in self._index.years and archive is not None and not self._is_stale(year, archive)
 
-        currency_indexes: dict[str, tuple[int, int]] = {}
-        header_parsed = False
-        added_any_date = False
+    def _load_year(self, year: int, currencies: set[str]) -> None:
+        """Read, revalidate or download the archive of `year` and publish its table (holding the year's lock)."""
 
-        for _line_idx, row in enumerate(reader, start=1):
-            if not header_parsed:
-                if not row or "data" not in row[0].lower():
-                    continue
+        archive = self._archives.get(year)
+        if archive is None and self._cache_dir is not None:
+            archive = _read_cached_archive(self._cache_dir, year)
+            if archive is not None:
+                self._archives[year] = archive
+        stale = archive is None or self._is_stale(year, archive)
+        table = self._index.years.get(year)
+        if table is not None and not stale:
+            return
 
-                for i, val in enumerate(row):
-                    match = re.match(r"^\s*(\d+)\s*([A-Za-z]+)\s*$", val)
-                    if match:
-                        unit = int(match.group(1))
-                        currency_code = match.group(2).upper()
-                        if currency_code in missing_currencies:
-                            currency_indexes[currency_code] = (i, unit)
+        with span("nbp.load_year", year=year, currencies=sorted(currencies)):
+            previous = archive
+            if archive is None or stale:
+                archive = self._download(year, previous)
+            downloaded = archive is not previous
 
-                header_parsed = True
-                continue
+            if table is None or downloaded:
+                if (
+                    table is not None
+                    and previous is not None
+                    and previous.columns is not None
+                    and archive.text.startswith(previous.text[: previous.data_end])
+                ):
+                    # Rows were only appended: parse the new ones.
+                    with span("nbp.parse", incremental=True) as parse_span:
+                        parsed = _parse_archive(archive.text, start=previous.data_end, columns=previous.columns)
+                        table = table.extended(parsed)
+                        parse_span.set_attribute("currencies", sorted(parsed.columns))
+                        parse_span.set_attribute("rows", len(parsed.rows))
+                else:
+                    with span("nbp.parse") as parse_span:
+                        parsed = _parse_archive(archive.text)
+                        table = _YearRates(parsed.columns)
+                        table.extend(parsed)
+                        parse_span.set_attribute("currencies", sorted(parsed.columns))
+                        parse_span.set_attribute("rows", len(parsed.rows))
+                self._publish(year, table)
+                archive.columns = parsed.columns
+                archive.data_end = parsed.data_end
 
-            if not row or not row[0].isdigit():
-                continue
+            if downloaded:
+                with self._lock:
+                    requested = set(self._requested.get(year, ()))
+                # Currencies absent from the archive are not reported (nor downloaded again: the year is loaded).
+                record_rate_archive_fetch(year, requested & table.currencies.keys())
+
+    def _publish(self, year: int, table: _YearRates) -> None:
+        """Replace the index with one in which `year` maps to `table`."""
+
+        with self._lock:
+            years = {**self._index.years, year: table}
+            self._index = _RatesIndex(years=years, sorted_years=tuple(sorted(years)))
 
-            date_str = row[0].strip()
-            if len(date_str) == 8:
-                file_date = date(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]))
+    def _is_stale(self, year: int, archive: _Archive) -> bool:
+        """An archive checked after its year ended is final; others are revalidated once older than the TTL."""
+
+        if datetime.fromtimestamp(archive.checked_at).year > year:
+            return False
+        return self._clock() - archive.checked_at >= self._ttl
+
+    def _download(self, year: int, previous: _Archive | None) -> _Archive:
+        """
+        Fetch the archive of `year`, conditionally when `previous` has validators. Return `previous` (revalidated)
+        when the archive did not change, otherwise the new archive (also stored in the disk cache).
+        """
+
+        check_cancelled()
+        url = self._archive_url.format(year=year)
+        headers: dict[str, str] = {}
+        if previous is not None and previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous is not None and previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+
+        with span("nbp.download", url=url, conditional=bool(headers)) as download_span:
+            logger.info("Downloading NBP archive from: %s", url)
+            response = requests.get(url, timeout=30, headers=headers)
+            download_span.set_attribute("status", response.status_code)
+            if previous is not None and response.status_code == 304:
+                text = previous.text
             else:
-                continue
+                response.raise_for_status()
+                text = response.text
+                download_span.set_attribute("chars", len(text))
 
-            if file_date not in self._rates:
-                self._rates[file_date] = {}
-                added_any_date = True
+        now = self._clock()
+        if previous is not None and text == previous.text:
+            logger.debug("NBP archive %s not modified", url)
+            previous.checked_at = now
+            previous.etag = response.headers.get("ETag", previous.etag)
+            previous.last_modified = response.headers.get("Last-Modified", previous.last_modified)
+            self._write_cached_archive(year, previous, write_text=False)
+            return previous
 
-            for curr, (idx, unit) in currency_indexes.items():
-                if idx < len(row):
-                    raw_val = row[idx].strip()
-                    raw_val = raw_val.replace(",", ".")
-                    try:
-                        dec_value = Decimal(raw_val)
-                    except InvalidOperation:
-                        continue
-                    self._rates[file_date][curr] = dec_value / Decimal(unit)
+        archive = _Archive(
+            text=text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            checked_at=now,
+        )
+        self._archives[year] = archive
+        self._write_cached_archive(year, archive, write_text=True)
+        return archive
 
-        self._loaded_years[year] = already_loaded | set(currency_indexes.keys())
-        if added_any_date:
-            self._rebuild_sorted_dates()
+    def _write_cached_archive(self, year: int, archive: _Archive, write_text: bool) -> None:
+        if self._cache_dir is None:
+            return
+        text_path, meta_path = _cached_archive_paths(self._cache_dir, year)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        if write_text:
+            _write_atomic(text_path, archive.text)
+        meta = {"etag": archive.etag, "last_modified": archive.last_modified, "checked_at": archive.checked_at}
+        _write_atomic(meta_path, json.dumps(meta))
 
     def get_rate_for(self, d: date, currency: str, use_previous_day: bool = True) -> Decimal:
         """
@@ -109,25 +343,51 @@ class NbpExchange:
         if currency == "PLN":
             return Decimal(1)
 
-        if not self._sorted_dates:
+        index = self._index
+        if not index.years:
             raise ValueError("No rates loaded. Call load_year first.")
 
         if use_previous_day:
             target = d - timedelta(days=1)
-            idx = bisect_right(self._sorted_dates, target) - 1
-            while idx >= 0:
-                candidate_date = self._sorted_dates[idx]
-                if currency in self._rates[candidate_date]:
-                    return self._rates[candidate_date][currency]
-                idx -= 1
-            raise ValueError(f"No exchange rate found for {currency} prior to {d}")
-
-        if d in self._rates:
-            if currency in self._rates[d]:
-                return self._rates[d][currency]
+            table = index.years.get(target.year)
+            found = table.last_rate(target, currency) if table is not None else None
+            if found is None:
+                found = _find_last_rate(index, target, currency)
+                if (found is None or found[0].year < target.year) and target.year - 1 not in index.years:
+                    # No quotation yet in the target's year (early January): the previous year is fetched only now.
+                    self.load_year(target.year - 1, {currency})
+                    found = _find_last_rate(self._index, target, currency)
+            if found is None:
+                raise ValueError(f"No exchange rate found for {currency} prior to {d}")
+            return found[1]
+
+        table = index.years.get(d.year)
+        idx = bisect_left(table.dates, d) if table is not None else 0
+        if table is not None and idx < len(table.dates) and table.dates[idx] == d:
+            rates = table.rates(currency)
+            if rates is not None and rates[idx] is not None:
+                return rates[idx]
             raise ValueError(f"Currency {currency} not found for date {d}")
         raise ValueError(f"No exchange rate found for date {d}")
 
+    def rates_digest(self, years: set[int], currencies: set[str]) -> str:
+        """Return a SHA-256 digest of the loaded rates of `currencies` on dates within `years`."""
+
+        wanted = {c.upper() for c in currencies} - {"PLN"}
+        index = self._index
+        digest = hashlib.sha256()
+        for year in index.sorted_years:
+            if year not in years:
+                continue
+            table = index.years[year]
+            columns = [(currency, table.rates(currency) or []) for currency in sorted(wanted & table.currencies.keys())]
+            for i, d in enumerate(table.dates):
+                for currency, column in columns:
+                    rate = column[i]
+                    if rate is not None:
+                        digest.update(f"{d.isoformat()}:{currency}:{rate}\n".encode())
+        return digest.hexdigest()
+
     def get_rates_for(self, pairs: list[tuple[date, str]]) -> list[Decimal]:
         """
         For a list of (date, currency), return a list of the corresponding exchange rates.
@@ -138,3 +398,93 @@ class NbpExchange:
             rate = self.get_rate_for(d, curr, use_previous_day=True)
             result.append(rate)
         return result
+
+
+def _find_last_rate(index: _RatesIndex, target: date, currency: str) -> tuple[date, Decimal] | None:
+    """Return the last loaded date on or before `target` that has a rate for `currency`, and the rate."""
+
+    for i in range(bisect_right(index.sorted_years, target.year) - 1, -1, -1):
+        found = index.years[index.sorted_years[i]].last_rate(target, currency)
+        if found is not None:
+            return found
+    return None
+
+
+def _parse_archive(text: str, start: int = 0, columns: dict[str, tuple[int, int]] | None = None) -> _ParsedArchive:
+    """
+    Split the data rows of an archive CSV from offset `start` of `text` (past the header row, whose currency columns
+    are then given as `columns`) and return them with their dates and the end offset of the last one.
+    """
+
+    offset = start
+
+    def _lines() -> Iterator[str]:
+        nonlocal offset
+        for line in io.StringIO(text[start:]):
+            offset += len(line)
+            yield line
+
+    dates: list[date] = []
+    rows: list[list[str]] = []
+    data_end = start
+
+    for row in csv.reader(_lines(), delimiter=";"):
+        if columns is None:
+            if row and "data" in row[0].lower():
+                columns = _currency_columns(row)
+            continue
+
+        if not row or not row[0].isdigit():
+            continue
+        date_str = row[0].strip()
+        if len(date_str) != 8:
+            continue
+
+        dates.append(date(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8])))
+        rows.append(row)
+        data_end = offset
+
+    return _ParsedArchive(columns=columns or {}, dates=dates, rows=rows, data_end=data_end)
+
+
+def _currency_columns(header: list[str]) -> dict[str, tuple[int, int]]:
+    """Map currencies to their (column index, unit) from a header row with columns like "1USD" or "100HUF"."""
+
+    columns: dict[str, tuple[int, int]] = {}
+    for i, val in enumerate(header):
+        match = _CURRENCY_COLUMN.match(val)
+        if match:
+            columns[match.group(2).upper()] = (i, int(match.group(1)))
+    return columns
+
+
+def _cached_archive_paths(cache_dir: Path, year: int) -> tuple[Path, Path]:
+    """Archive text and its metadata (validators, last check time) in the disk cache."""
+
+    return cache_dir / f"archiwum_tab_a_{year}.csv", cache_dir / f"archiwum_tab_a_{year}.json"
+
+
+def _read_cached_archive(cache_dir: Path, year: int) -> _Archive | None:
+    text_path, meta_path = _cached_archive_paths(cache_dir, year)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        text = text_path.read_text(encoding="utf-8")
+        return _Archive(
+            text=text, etag=meta["etag"], last_modified=meta["last_modified"], checked_at=meta["checked_at"]
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.warning("Ignoring unreadable cached NBP archive of %s: %s", year, exc)
+        return None
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Replace `path` with `text` through a temporary sibling, so readers never see a partial file."""
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_text(text, encoding="utf-8")
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
@@ -1,8 +1,10 @@
+import threading
 from datetime import date
 from decimal import Decimal
-from typing import Protocol
+from pathlib import Path
+from typing import Protocol, runtime_checkable
 
-from pit8c.exchange.nbp import NbpExchange
+from pit8c.exchange.nbp import DEFAULT_ARCHIVE_TTL, NBP_ARCHIVE_URL, NbpExchange
 
 
 class ExchangeRatesProvider(Protocol):
@@ -15,11 +17,30 @@ class ExchangeRatesProvider(Protocol):
         """Return an exchange rate for the given currency and date."""
 
 
+@runtime_checkable
+class FingerprintedExchangeRatesProvider(ExchangeRatesProvider, Protocol):
+    """Provider that can identify the rate data it serves, so results computed from it can be cached."""
+
+    def rate_data_fingerprint(self, years: set[int], currencies: set[str]) -> str | None:
+        """Return a digest of the rates of the given years and currencies (None when it cannot be determined)."""
+
+
 class NbpExchangeRatesProvider:
-    """Exchange rates provider backed by NBP archive CSV tables."""
+    """Exchange rates provider backed by NBP archive CSV tables, safe to share between threads (see `NbpExchange`)."""
 
-    def __init__(self) -> None:
-        self._exchange = NbpExchange()
+    # Shared as is by `shared_exchange_provider`: lookups never block, concurrent loads of a year download it once.
+    thread_safe = True
+
+    def __init__(
+        self, cache_dir: Path | None = None, ttl: float = DEFAULT_ARCHIVE_TTL, archive_url: str = NBP_ARCHIVE_URL
+    ) -> None:
+        """
+        Create a provider downloading NBP archives on demand. With `cache_dir`, archives are also kept on disk;
+        archives of a year that has not ended yet are revalidated after `ttl` seconds (see `NbpExchange`).
+        `archive_url` (with a `{year}` placeholder) can point to a mirror or a local stand-in of the NBP host.
+        """
+
+        self._exchange = NbpExchange(cache_dir=cache_dir, ttl=ttl, archive_url=archive_url)
 
     def prefetch(self, years: set[int], currencies: set[str]) -> None:
         """Preload NBP archive rates for required years and currencies."""
@@ -31,3 +52,53 @@ class NbpExchangeRatesProvider:
         """Return NBP exchange rate using previous-day lookup by default."""
 
         return self._exchange.get_rate_for(d, currency, use_previous_day=use_previous_day)
+
+    def rate_data_fingerprint(self, years: set[int], currencies: set[str]) -> str | None:
+        """Load the archives of the given years and return a digest of their rates for `currencies`."""
+
+        self.prefetch(years, currencies)
+        return self._exchange.rates_digest(years, currencies)
+
+
+class SynchronizedExchangeRatesProvider:
+    """
+    Wraps a provider so that it can be shared by concurrent callers (e.g. server workers).
+    All calls are serialized, for providers that are not safe for concurrent use themselves.
+    """
+
+    thread_safe = True
+
+    def __init__(self, provider: ExchangeRatesProvider) -> None:
+        self._provider = provider
+        self._lock = threading.Lock()
+
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Warm up the wrapped provider while holding the lock."""
+
+        with self._lock:
+            self._provider.prefetch(years, currencies)
+
+    def get_rate(self, d: date, currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return an exchange rate from the wrapped provider while holding the lock."""
+
+        with self._lock:
+            return self._provider.get_rate(d, currency, use_previous_day=use_previous_day)
+
+    def rate_data_fingerprint(self, years: set[int], currencies: set[str]) -> str | None:
+        """Return the wrapped provider's rate data fingerprint (None when it has none) while holding the lock."""
+
+        if not isinstance(self._provider, FingerprintedExchangeRatesProvider):
+            return None
+        with self._lock:
+            return self._provider.rate_data_fingerprint(years, currencies)
+
+
+def shared_exchange_provider(provider: ExchangeRatesProvider) -> ExchangeRatesProvider:
+    """
+    Return `provider` ready to be shared by concurrent runs: as is when it declares `thread_safe = True`,
+    otherwise wrapped in `SynchronizedExchangeRatesProvider`.
+    """
+
+    if getattr(provider, "thread_safe", False):
+        return provider
+    return SynchronizedExchangeRatesProvider(provider)
@@ -1,46 +1,80 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
 from pit8c.exchange.provider import ExchangeRatesProvider, NbpExchangeRatesProvider
 from pit8c.models import ClosedPosition
+from pit8c.progress import STAGE_EXCHANGE_RATES, checkpoint
+
+
+def plan_rate_archives(closed_positions: list[ClosedPosition]) -> dict[int, set[str]]:
+    """
+    Return the minimal archives (year -> currencies) needed to fill exchange rates of closed positions.
+
+    Rates are looked up for the day before each trade, so only the year of that lookup date is planned.
+    The previous year is needed only when no quotation precedes the lookup date in its own year
+    (early January); providers load it lazily on such a miss instead of always prefetching it.
+    """
+
+    plan: dict[int, set[str]] = {}
+    for cp in closed_positions:
+        trade_currency = cp.currency
+        buy_comm_currency = cp.buy_commission_currency or trade_currency
+        sell_comm_currency = cp.sell_commission_currency or trade_currency
+
+        plan.setdefault(_lookup_date(cp.buy_date.date()).year, set()).update((trade_currency, buy_comm_currency))
+        plan.setdefault(_lookup_date(cp.sell_date.date()).year, set()).update((trade_currency, sell_comm_currency))
+    return plan
 
 
 def fill_exchange_rates(
     closed_positions: list[ClosedPosition],
     provider: ExchangeRatesProvider | None = None,
 ) -> list[ClosedPosition]:
-    """Fill exchange rate fields in-place for each closed position (trade and commission currencies)."""
+    """
+    Fill exchange rate fields in-place for each closed position (trade and commission currencies).
+
+    Each (date, currency) is looked up once: positions of partial fills and lots share dates, and commissions are
+    mostly charged in the trade currency (interned currency codes make these keys cheap to hash and compare).
+    """
 
     if provider is None:
         provider = NbpExchangeRatesProvider()
 
-    years_needed = set()
-    currencies_needed = set()
-    for cp in closed_positions:
-        years_needed.add(cp.buy_date.year)
-        years_needed.add(cp.sell_date.year)
-        years_needed.add(cp.buy_date.year - 1)
-        years_needed.add(cp.sell_date.year - 1)
+    plan = sorted(plan_rate_archives(closed_positions).items())
+    for done, (year, currencies) in enumerate(plan):
+        checkpoint(STAGE_EXCHANGE_RATES, done, len(plan))
+        provider.prefetch({year}, currencies)
+    checkpoint(STAGE_EXCHANGE_RATES, len(plan), len(plan))
 
-        trade_currency = cp.currency
-        buy_comm_currency = cp.buy_commission_currency or trade_currency
-        sell_comm_currency = cp.sell_commission_currency or trade_currency
+    rates: dict[tuple[date, str], Decimal] = {}
 
-        currencies_needed.add(trade_currency)
-        currencies_needed.add(buy_comm_currency)
-        currencies_needed.add(sell_comm_currency)
-
-    provider.prefetch(years_needed, currencies_needed)
+    def rate(d: date, currency: str) -> Decimal:
+        key = (d, currency)
+        found = rates.get(key)
+        if found is None:
+            found = rates[key] = provider.get_rate(d, currency, use_previous_day=True)
+        return found
 
     for cp in closed_positions:
         curr = cp.currency
         buy_comm_curr = cp.buy_commission_currency or curr
         sell_comm_curr = cp.sell_commission_currency or curr
+        buy_date = cp.buy_date.date()
+        sell_date = cp.sell_date.date()
 
         # Normalize currencies so downstream consumers can rely on non-empty codes.
         cp.buy_commission_currency = buy_comm_curr
         cp.sell_commission_currency = sell_comm_curr
 
-        cp.buy_exchange_rate = provider.get_rate(cp.buy_date.date(), curr, use_previous_day=True)
-        cp.sell_exchange_rate = provider.get_rate(cp.sell_date.date(), curr, use_previous_day=True)
-        cp.buy_commission_exchange_rate = provider.get_rate(cp.buy_date.date(), buy_comm_curr, use_previous_day=True)
-        cp.sell_commission_exchange_rate = provider.get_rate(cp.sell_date.date(), sell_comm_curr, use_previous_day=True)
+        cp.buy_exchange_rate = rate(buy_date, curr)
+        cp.sell_exchange_rate = rate(sell_date, curr)
+        cp.buy_commission_exchange_rate = rate(buy_date, buy_comm_curr)
+        cp.sell_commission_exchange_rate = rate(sell_date, sell_comm_curr)
 
     return closed_positions
+
+
+def _lookup_date(d: date) -> date:
+    """Date whose rate is used for a trade on `d` (the previous day, see `use_previous_day`)."""
+
+    return d - timedelta(days=1)
@@ -1,93 +1,316 @@
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import StrEnum
 from pathlib import Path
-from typing import Any
+from types import TracebackType
+from typing import Any, Self
 
 import openpyxl
 from openpyxl import Workbook
 
+from pit8c.exceptions import Pit8cError
 from pit8c.io.utils import serialize_decimal
 from pit8c.models import ClosedPosition
 
 
+class XlsxReader(StrEnum):
+    """Implementation used to read report sheets."""
+
+    openpyxl = "openpyxl"
+    stream = "stream"  # direct zip/XML parsing, see `pit8c.io.xlsx_stream`
+
+
+@dataclass(frozen=True, slots=True)
+class SheetLocation:
+    """Sheet holding a table and the (1-based) row of its header."""
+
+    name: str
+    header_row: int = 1
+
+
 def read_trades_from_xlsx(file: Path, sheet_name: str | None = None) -> list[dict[str, Any]]:
     """
     Reads an XLSX file (entire sheet) into a list of dictionaries (raw data).
     The first row is assumed to be the header.
     """
     wb = openpyxl.load_workbook(file, data_only=True)
-    sheet = wb[sheet_name] if sheet_name else wb.active
+    sheet = _get_sheet(wb, file, sheet_name)
+    return rows_to_dicts(sheet.iter_rows(values_only=True))
+
+
+def rows_to_dicts(rows: Iterable[Sequence[Any]]) -> list[dict[str, Any]]:
+    """Turn value rows (header row first) into dictionaries keyed by the stripped header names."""
 
-    rows = list(sheet.rows)
-    if not rows:
+    rows = iter(rows)
+    header_row = next(rows, None)
+    if header_row is None:
         return []
 
-    headers = [cell.value if cell.value else "" for cell in rows[0]]
-    raw_data = []
-    for row in rows[1:]:
-        row_dict = {}
-        for col_idx, cell in enumerate(row):
-            if col_idx < len(headers):
-                header = headers[col_idx].strip()
-                row_dict[header] = cell.value
-        raw_data.append(row_dict)
-    return raw_data
+    headers = [str(value).strip() if value else "" for value in header_row]
+    return [dict(zip(headers, row, strict=False)) for row in rows]
 
 
-def write_closed_positions_to_xlsx(
-    profit_positions: list[ClosedPosition], loss_positions: list[ClosedPosition], file: Path
-) -> None:
+def iter_xlsx_rows(file: Path, sheet_name: str | None = None, header_row: int = 1) -> Iterator[tuple[Any, ...]]:
     """
-    Writes the matched buy-sell trades into an XLSX file
+    Stream the rows of an XLSX sheet as value tuples (header row first) in read-only mode,
+    without materializing cell objects or per-row dicts. Rows above `header_row` are skipped.
     """
-    wb = Workbook()
-    wb.remove(wb.active)
-    profit_ws = wb.create_sheet("Profit")
-    loss_ws = wb.create_sheet("Loss")
-
-    headers = [
-        "ISIN",
-        "Ticker",
-        "Currency",
-        "BuyDate",
-        "Quantity",
-        "BuyAmount",
-        "BuyCommission",
-        "BuyExchangeRate",
-        "SellDate",
-        "SellAmount",
-        "SellCommission",
-        "SellExchangeRate",
-        "Profit",
-        "ProfitPLN",
-        "IncomePLN",
-        "CostsPLN",
-    ]
-    for ws in [profit_ws, loss_ws]:
-        ws.append(headers)
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = _get_sheet(wb, file, sheet_name)
+        yield from sheet.iter_rows(min_row=header_row, values_only=True)
+    finally:
+        wb.close()
+
 
-    def create_row(pos: ClosedPosition) -> list[str]:
+def find_sheet_by_headers(
+    file: Path, fingerprints: Iterable[Collection[str]], max_header_row: int = 10
+) -> SheetLocation | None:
+    """
+    Find the sheet whose header row contains all columns of one of the fingerprints.
+    Only the first `max_header_row` rows of each sheet are read (in read-only mode); the active sheet is checked first.
+    """
+    fingerprints = [frozenset(fp) for fp in fingerprints]
+    if not fingerprints:
+        return None
+
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        active = wb.active
+        sheets = [active, *(ws for ws in wb.worksheets if ws is not active)] if active is not None else wb.worksheets
+        for sheet in sheets:
+            for row_idx, row in enumerate(sheet.iter_rows(max_row=max_header_row, values_only=True), start=1):
+                headers = {value.strip() for value in row if isinstance(value, str)}
+                if any(fp <= headers for fp in fingerprints):
+                    return SheetLocation(name=sheet.title, header_row=row_idx)
+    finally:
+        wb.close()
+    return None
+
+
+def _get_sheet(wb: Workbook, file: Path, sheet_name: str | None) -> Any:
+    if not sheet_name:
+        return wb.active
+    if sheet_name not in wb.sheetnames:
+        raise Pit8cError(f"Sheet '{sheet_name}' not found in '{file}'")
+    return wb[sheet_name]
+
+
+_CLOSED_POSITIONS_HEADERS = [
+    "ISIN",
+    "Ticker",
+    "Currency",
+    "BuyDate",
+    "Quantity",
+    "BuyAmount",
+    "BuyCommission",
+    "BuyExchangeRate",
+    "SellDate",
+    "SellAmount",
+    "SellCommission",
+    "SellExchangeRate",
+    "Profit",
+    "ProfitPLN",
+    "IncomePLN",
+    "CostsPLN",
+]
+_BY_ISIN_HEADERS = [
+    "ISIN",
+    "Ticker",
+    "Currency",
+    "Positions",
+    "Quantity",
+    "Profit",
+    "IncomePLN",
+    "CostsPLN",
+    "ProfitPLN",
+]
+_BY_CURRENCY_HEADERS = ["Currency", "Positions", "Profit", "IncomePLN", "CostsPLN", "ProfitPLN"]
+_BY_MONTH_HEADERS = ["Month", "Positions", "IncomePLN", "CostsPLN", "ProfitPLN"]
+
+
+# Rows of a worksheet in Excel (header included); longer sheets are split into several (see `_ShardedSheet`).
+XLSX_MAX_ROWS = 1_048_576
+
+
+@dataclass(slots=True)
+class _Subtotal:
+    """Running sums over the closed positions of one summary row."""
+
+    positions: int = 0
+    quantity: Decimal = Decimal(0)
+    profit: Decimal = Decimal(0)
+    income_pln: Decimal = Decimal(0)
+    costs_pln: Decimal = Decimal(0)
+
+    def add(self, pos: ClosedPosition) -> None:
+        self.positions += 1
+        self.quantity += pos.quantity
+        self.profit += pos.profit
+        self.income_pln += pos.income_pln
+        self.costs_pln += pos.costs_pln
+
+    def pln_cells(self) -> list[str]:
         return [
-            pos.isin,
-            pos.ticker,
-            pos.currency,
-            pos.buy_date.strftime("%Y-%m-%d"),
-            serialize_decimal(pos.quantity),
-            serialize_decimal(pos.buy_amount),
-            serialize_decimal(pos.buy_commission),
-            serialize_decimal(pos.buy_exchange_rate),
-            pos.sell_date.strftime("%Y-%m-%d"),
-            serialize_decimal(pos.sell_amount),
-            serialize_decimal(pos.sell_commission),
-            serialize_decimal(pos.sell_exchange_rate),
-            serialize_decimal(pos.profit),
-            serialize_decimal(pos.income_pln - pos.costs_pln),
-            serialize_decimal(pos.income_pln),
-            serialize_decimal(pos.costs_pln),
+            serialize_decimal(self.income_pln),
+            serialize_decimal(self.costs_pln),
+            serialize_decimal(self.income_pln - self.costs_pln),
         ]
 
-    for position in sorted(profit_positions, key=lambda x: (x.isin, x.sell_date)):
-        profit_ws.append(create_row(position))
 
-    for position in sorted(loss_positions, key=lambda x: (x.isin, x.sell_date)):
-        loss_ws.append(create_row(position))
+class _ShardedSheet:
+    """
+    Write-only sheet continued in "<title> (2)", "<title> (3)", ... sheets (each with the header row) once it reaches
+    `max_rows`. Continuation sheets are placed right after the previous part.
+    """
+
+    def __init__(self, wb: Workbook, title: str, headers: list[str], max_rows: int) -> None:
+        self._wb = wb
+        self._title = title
+        self._headers = headers
+        self._max_rows = max_rows
+        self._parts = self._rows = 0
+        self._ws = self._add_part()
+
+    def _add_part(self) -> Any:
+        index = self._wb.worksheets.index(self._ws) + 1 if self._parts else None
+        self._parts += 1
+        self._rows = 1
+        ws = self._wb.create_sheet(self._title if self._parts == 1 else f"{self._title} ({self._parts})", index)
+        ws.append(self._headers)
+        return ws
+
+    def append(self, row: list[Any]) -> None:
+        if self._rows >= self._max_rows:
+            self._ws = self._add_part()
+        self._ws.append(row)
+        self._rows += 1
+
+
+class ClosedPositionsXlsxWriter:
+    """
+    Incrementally write closed positions into the Profit and Loss sheets of a write-only workbook
+    (rows are streamed to temporary files, so positions need not be kept in memory).
+    Sheets longer than `max_rows` continue in "Profit (2)", "Loss (2)", ... sheets. Subtotals per ISIN, currency and
+    sell month are accumulated while rows are written and added as summary sheets on save.
+    The workbook is saved to `file` by `close()` (use as a context manager to skip saving when writing fails),
+    or to any path by `save()`.
+    """
+
+    def __init__(self, file: Path | None = None, max_rows: int = XLSX_MAX_ROWS) -> None:
+        if max_rows < 2:
+            raise Pit8cError(f"XLSX sheets need room for a header and a row, got max_rows={max_rows}")
+        self._file = file
+        self._max_rows = max_rows
+        self._wb = Workbook(write_only=True)
+        self._profit_ws = _ShardedSheet(self._wb, "Profit", _CLOSED_POSITIONS_HEADERS, max_rows)
+        self._loss_ws = _ShardedSheet(self._wb, "Loss", _CLOSED_POSITIONS_HEADERS, max_rows)
+        self._by_isin: dict[tuple[str, str], _Subtotal] = {}
+        self._tickers: dict[tuple[str, str], str] = {}
+        self._by_currency: dict[str, _Subtotal] = {}
+        self._by_month: dict[str, _Subtotal] = {}
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        if exc_type is None:
+            self.close()
+
+    def write(self, profit_positions: Iterable[ClosedPosition], loss_positions: Iterable[ClosedPosition]) -> None:
+        """Append positions to the Profit and Loss sheets, in the given order."""
+
+        for ws, positions in ((self._profit_ws, profit_positions), (self._loss_ws, loss_positions)):
+            for position in positions:
+                ws.append(_closed_position_row(position))
+                self._add_to_summaries(position)
+
+    def _add_to_summaries(self, pos: ClosedPosition) -> None:
+        isin_key = (pos.isin, pos.currency)
+        subtotal = self._by_isin.get(isin_key)
+        if subtotal is None:
+            subtotal = self._by_isin[isin_key] = _Subtotal()
+            self._tickers[isin_key] = pos.ticker
+        subtotal.add(pos)
+        subtotal = self._by_currency.get(pos.currency)
+        if subtotal is None:
+            subtotal = self._by_currency[pos.currency] = _Subtotal()
+        subtotal.add(pos)
+        month = pos.sell_date.strftime("%Y-%m")
+        subtotal = self._by_month.get(month)
+        if subtotal is None:
+            subtotal = self._by_month[month] = _Subtotal()
+        subtotal.add(pos)
+
+    def _write_summaries(self) -> None:
+        by_isin = _ShardedSheet(self._wb, "By ISIN", _BY_ISIN_HEADERS, self._max_rows)
+        for (isin, currency), subtotal in sorted(self._by_isin.items()):
+            by_isin.append(
+                [
+                    isin,
+                    self._tickers[isin, currency],
+                    currency,
+                    subtotal.positions,
+                    serialize_decimal(subtotal.quantity),
+                    serialize_decimal(subtotal.profit),
+                    *subtotal.pln_cells(),
+                ]
+            )
+        by_currency = _ShardedSheet(self._wb, "By currency", _BY_CURRENCY_HEADERS, self._max_rows)
+        for currency, subtotal in sorted(self._by_currency.items()):
+            by_currency.append(
+                [currency, subtotal.positions, serialize_decimal(subtotal.profit), *subtotal.pln_cells()]
+            )
+        by_month = _ShardedSheet(self._wb, "By month", _BY_MONTH_HEADERS, self._max_rows)
+        for month, subtotal in sorted(self._by_month.items()):
+            by_month.append([month, subtotal.positions, *subtotal.pln_cells()])
 
-    wb.save(file)
+    def save(self, file: Path) -> None:
+        """Add the summary sheets and save the workbook to `file` (once: write-only workbooks cannot be resaved)."""
+
+        self._write_summaries()
+        self._wb.save(file)
+
+    def close(self) -> None:
+        """Save the workbook to the file given on creation."""
+
+        if self._file is None:
+            raise Pit8cError("ClosedPositionsXlsxWriter was created without a file; use save(file)")
+        self.save(self._file)
+
+
+def write_closed_positions_to_xlsx(
+    profit_positions: list[ClosedPosition], loss_positions: list[ClosedPosition], file: Path
+) -> None:
+    """
+    Writes the matched buy-sell trades into an XLSX file
+    """
+    with ClosedPositionsXlsxWriter(file) as writer:
+        writer.write(
+            sorted(profit_positions, key=lambda x: (x.isin, x.sell_date)),
+            sorted(loss_positions, key=lambda x: (x.isin, x.sell_date)),
+        )
+
+
+def _closed_position_row(pos: ClosedPosition) -> list[str]:
+    return [
+        pos.isin,
+        pos.ticker,
+        pos.currency,
+        pos.buy_date.strftime("%Y-%m-%d"),
+        serialize_decimal(pos.quantity),
+        serialize_decimal(pos.buy_amount),
+        serialize_decimal(pos.buy_commission),
+        serialize_decimal(pos.buy_exchange_rate),
+        pos.sell_date.strftime("%Y-%m-%d"),
+        serialize_decimal(pos.sell_amount),
+        serialize_decimal(pos.sell_commission),
+        serialize_decimal(pos.sell_exchange_rate),
+        serialize_decimal(pos.profit),
+        serialize_decimal(pos.income_pln - pos.costs_pln),
+        serialize_decimal(pos.income_pln),
+        serialize_decimal(pos.costs_pln),
+    ]
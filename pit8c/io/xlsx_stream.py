@@ -0,0 +1,331 @@
+"""
+Streaming XLSX reader for plain trade tables that bypasses openpyxl.
+
+The workbook zip is opened directly: sheet names come from `xl/workbook.xml` (and its relationships), text from the
+shared strings table and date formats from `xl/styles.xml`; the sheet XML is then `iterparse`d row by row and every
+parsed row element is discarded immediately. Only cell values are produced:
+
+- shared, inline and formula strings as `str`, booleans as `bool`, error codes (e.g. "#N/A") as `str`,
+- numbers formatted as dates as `datetime` (or `time` for pure times), using the same conversion as openpyxl,
+- other numbers as `int` when the stored text is integral and as `Decimal` of the stored text otherwise,
+  so values like 0.1 keep their exact decimal representation instead of going through float.
+
+The stdlib (expat) parser neither resolves external entities nor allows unbounded entity expansion (expat >= 2.4),
+so reports from untrusted sources are safe to read without defusedxml.
+
+Rows are returned as tuples padded with None to the sheet dimension (or the first returned row, if wider); empty rows
+inside the table are returned as well, so row numbers line up with the sheet.
+"""
+
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Collection, Iterable, Iterator
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import cache
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+from xml.etree.ElementTree import Element
+
+from pit8c.exceptions import Pit8cError
+from pit8c.io.xlsx import SheetLocation
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_DIMENSION = f"{_MAIN_NS}dimension"
+_SHEET_DATA = f"{_MAIN_NS}sheetData"
+_ROW = f"{_MAIN_NS}row"
+_CELL = f"{_MAIN_NS}c"
+_VALUE = f"{_MAIN_NS}v"
+_INLINE_STRING = f"{_MAIN_NS}is"
+_TEXT = f"{_MAIN_NS}t"
+_PHONETIC_RUN = f"{_MAIN_NS}rPh"
+_SHARED_STRING = f"{_MAIN_NS}si"
+
+_WINDOWS_EPOCH = datetime(1899, 12, 30)
+_MAC_EPOCH = datetime(1904, 1, 1)
+_MS_PER_DAY = 86_400_000
+
+# Built-in number formats that are dates or times (ECMA-376, 18.8.30).
+_BUILTIN_DATE_FORMATS = frozenset({*range(14, 23), *range(27, 37), *range(45, 48), *range(50, 59)})
+# Quoted text, escaped characters and bracketed sections (colors, locales, conditions) never denote dates.
+_NON_DATE_FORMAT_PARTS = re.compile(r'"[^"]*"|\\.|_.|\*.|\[[^\]]*\]')
+_DATE_FORMAT_CHARS = re.compile(r"[dmyhs]", re.IGNORECASE)
+_INTEGER_TEXT = re.compile(r"^-?[0-9]+$")
+_DIGITS = "0123456789"
+
+
+class XlsxStreamReader:
+    """Read-only access to the sheets of an XLSX file as streams of value tuples (use as a context manager)."""
+
+    def __init__(self, file: Path) -> None:
+        try:
+            self._zip = zipfile.ZipFile(file)
+        except (OSError, zipfile.BadZipFile) as exc:
+            raise Pit8cError(f"Cannot open '{file}' as an XLSX file: {exc}") from exc
+        self._file = file
+        self._shared_strings: list[str] | None = None
+        try:
+            self._sheet_paths, self._active_sheet, self._epoch = self._read_workbook()
+            self._date_styles = self._read_date_styles()
+        except Exception:
+            self._zip.close()
+            raise
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying zip file."""
+
+        self._zip.close()
+
+    @property
+    def sheet_names(self) -> list[str]:
+        """Sheet names in workbook order."""
+
+        return list(self._sheet_paths)
+
+    @property
+    def active_sheet(self) -> str:
+        """Name of the sheet that is active (selected) when the workbook is opened."""
+
+        return self._active_sheet
+
+    def iter_rows(
+        self, sheet_name: str | None = None, header_row: int = 1, max_row: int | None = None
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield value tuples of rows `header_row`..`max_row` (1-based, inclusive) of a sheet (default: active)."""
+
+        name = sheet_name or self._active_sheet
+        if name not in self._sheet_paths:
+            raise Pit8cError(f"Sheet '{name}' not found in '{self._file}'")
+        shared_strings = self._load_shared_strings()
+
+        sheet_width = 0
+        width: int | None = None
+        next_row = header_row
+        # Processed rows are removed from <sheetData>, so memory does not grow with the number of rows.
+        sheet_data: ET.Element | None = None
+        with self._zip.open(self._sheet_paths[name]) as sheet_xml:
+            for event, element in ET.iterparse(sheet_xml, events=("start", "end")):  # noqa: S314
+                if element.tag != _ROW:
+                    if event == "start":
+                        if element.tag == _SHEET_DATA:
+                            sheet_data = element
+                    elif element.tag == _DIMENSION:
+                        sheet_width = _column_index(element.get("ref", "A1").rpartition(":")[2]) + 1
+                    continue
+                if event == "start":
+                    continue
+                row_idx = int(element.get("r") or next_row)
+                if max_row is not None and row_idx > max_row:
+                    return
+                if row_idx < header_row:
+                    _discard(sheet_data, element)
+                    continue
+
+                values = self._row_values(element, shared_strings)
+                _discard(sheet_data, element)
+                if width is None:
+                    width = max(len(values), sheet_width)
+                # Rows missing from the XML are empty rows of the table.
+                for _ in range(next_row, row_idx):
+                    yield (None,) * width
+                if len(values) < width:
+                    values.extend([None] * (width - len(values)))
+                next_row = row_idx + 1
+                yield tuple(values)
+
+    def _row_values(self, row: Element, shared_strings: list[str]) -> list[Any]:
+        values: list[Any] = []
+        for cell in row:
+            if cell.tag != _CELL:
+                continue
+            ref = cell.get("r")
+            if ref is not None:
+                column = _column_index(ref)
+                if column > len(values):
+                    values.extend([None] * (column - len(values)))
+            values.append(self._cell_value(cell, shared_strings))
+        return values
+
+    def _cell_value(self, cell: Element, shared_strings: list[str]) -> Any:
+        cell_type = cell.get("t", "n")
+        if cell_type == "inlineStr":
+            inline = cell.find(_INLINE_STRING)
+            return _rich_text(inline) if inline is not None else None
+
+        raw = cell.findtext(_VALUE)
+        if not raw:
+            return None
+        if cell_type == "s":
+            return shared_strings[int(raw)]
+        if cell_type == "b":
+            return raw == "1"
+        if cell_type in {"str", "e"}:
+            return raw
+        if cell_type == "d":
+            return datetime.fromisoformat(raw)
+
+        style = cell.get("s")
+        if style is not None and int(style) in self._date_styles:
+            return _from_excel(float(raw), self._epoch)
+        if _INTEGER_TEXT.match(raw):
+            return int(raw)
+        return Decimal(raw)
+
+    def _read_workbook(self) -> tuple[dict[str, str], str, datetime]:
+        workbook = _parse_xml(self._zip, "xl/workbook.xml")
+        relationships = _parse_xml(self._zip, "xl/_rels/workbook.xml.rels")
+        targets = {rel.get("Id"): rel.get("Target", "") for rel in relationships.iter(f"{_PKG_REL_NS}Relationship")}
+
+        sheet_paths: dict[str, str] = {}
+        for sheet in workbook.iter(f"{_MAIN_NS}sheet"):
+            target = targets.get(sheet.get(f"{_REL_NS}id"), "")
+            path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            sheet_paths[sheet.get("name", "")] = path
+        if not sheet_paths:
+            raise Pit8cError(f"'{self._file}' does not contain any sheets")
+
+        view = workbook.find(f"{_MAIN_NS}bookViews/{_MAIN_NS}workbookView")
+        active_tab = int(view.get("activeTab", "0")) if view is not None else 0
+        names = list(sheet_paths)
+        active_sheet = names[active_tab] if active_tab < len(names) else names[0]
+
+        properties = workbook.find(f"{_MAIN_NS}workbookPr")
+        date1904 = properties is not None and properties.get("date1904", "").lower() in {"1", "true"}
+        return sheet_paths, active_sheet, _MAC_EPOCH if date1904 else _WINDOWS_EPOCH
+
+    def _read_date_styles(self) -> frozenset[int]:
+        """Return indexes of cell styles (cellXfs) whose number format is a date or time format."""
+
+        if "xl/styles.xml" not in self._zip.namelist():
+            return frozenset()
+        styles = _parse_xml(self._zip, "xl/styles.xml")
+        date_formats = set(_BUILTIN_DATE_FORMATS)
+        for num_fmt in styles.iter(f"{_MAIN_NS}numFmt"):
+            if _is_date_format(num_fmt.get("formatCode", "")):
+                date_formats.add(int(num_fmt.get("numFmtId", "0")))
+
+        cell_xfs = styles.find(f"{_MAIN_NS}cellXfs")
+        if cell_xfs is None:
+            return frozenset()
+        return frozenset(
+            idx for idx, xf in enumerate(cell_xfs.iter(f"{_MAIN_NS}xf")) if int(xf.get("numFmtId", "0")) in date_formats
+        )
+
+    def _load_shared_strings(self) -> list[str]:
+        if self._shared_strings is None:
+            self._shared_strings = []
+            if "xl/sharedStrings.xml" in self._zip.namelist():
+                with self._zip.open("xl/sharedStrings.xml") as strings_xml:
+                    root: ET.Element | None = None
+                    for event, element in ET.iterparse(strings_xml, events=("start", "end")):  # noqa: S314
+                        if root is None:
+                            root = element
+                        elif event == "end" and element.tag == _SHARED_STRING:
+                            self._shared_strings.append(_rich_text(element))
+                            _discard(root, element)
+        return self._shared_strings
+
+
+def iter_xlsx_rows_stream(file: Path, sheet_name: str | None = None, header_row: int = 1) -> Iterator[tuple[Any, ...]]:
+    """Streaming counterpart of `iter_xlsx_rows` (header row first, rows above `header_row` skipped)."""
+
+    with XlsxStreamReader(file) as reader:
+        yield from reader.iter_rows(sheet_name, header_row=header_row)
+
+
+def find_sheet_by_headers_stream(
+    file: Path, fingerprints: Iterable[Collection[str]], max_header_row: int = 10
+) -> SheetLocation | None:
+    """Streaming counterpart of `find_sheet_by_headers` (only the first rows of each sheet are parsed)."""
+
+    fingerprints = [frozenset(fp) for fp in fingerprints]
+    if not fingerprints:
+        return None
+
+    with XlsxStreamReader(file) as reader:
+        names = [reader.active_sheet, *(name for name in reader.sheet_names if name != reader.active_sheet)]
+        for name in names:
+            for row_idx, row in enumerate(reader.iter_rows(name, max_row=max_header_row), start=1):
+                headers = {value.strip() for value in row if isinstance(value, str)}
+                if any(fp <= headers for fp in fingerprints):
+                    return SheetLocation(name=name, header_row=row_idx)
+    return None
+
+
+def _parse_xml(archive: zipfile.ZipFile, member: str) -> Element:
+    """Parse a small workbook part (workbook, relationships, styles) into an element tree."""
+
+    try:
+        with archive.open(member) as xml:
+            return ET.parse(xml).getroot()  # noqa: S314
+    except KeyError as exc:
+        raise Pit8cError(f"Invalid XLSX file: missing '{member}'") from exc
+
+
+def _discard(parent: ET.Element | None, element: ET.Element) -> None:
+    """Free a processed element and detach it, with the siblings processed before it, from its parent."""
+
+    element.clear()
+    if parent is not None:
+        parent.clear()
+
+
+def _column_index(ref: str) -> int:
+    """Zero-based column index of a cell reference like 'AB12'."""
+
+    return _column_letters_index(ref.rstrip(_DIGITS))
+
+
+@cache
+def _column_letters_index(letters: str) -> int:
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def _rich_text(element: Element) -> str:
+    """Concatenate the text runs of a (possibly rich) string, skipping phonetic hints."""
+
+    direct = element.find(_TEXT)
+    if direct is not None and len(element) == 1:
+        return direct.text or ""
+    parts = []
+    for child in element:
+        if child.tag == _TEXT:
+            parts.append(child.text or "")
+        elif child.tag != _PHONETIC_RUN:
+            parts.extend(t.text or "" for t in child.iter(_TEXT))
+    return "".join(parts)
+
+
+def _is_date_format(code: str) -> bool:
+    if code.lower() == "general":
+        return False
+    return bool(_DATE_FORMAT_CHARS.search(_NON_DATE_FORMAT_PARTS.sub("", code)))
+
+
+def _from_excel(value: float, epoch: datetime) -> datetime | time:
+    """Convert an Excel serial date like openpyxl (millisecond precision, 1900 leap-year bug)."""
+
+    day, fraction = divmod(value, 1)
+    diff = timedelta(milliseconds=round(fraction * _MS_PER_DAY))
+    if 0 <= value < 1 and diff.days == 0:
+        return (datetime.min + diff).time()
+    if 0 < value < 60 and epoch == _WINDOWS_EPOCH:
+        day += 1
+    return epoch + timedelta(days=day) + diff
@@ -0,0 +1,85 @@
+"""
+Opt-in per-stage memory accounting based on `tracemalloc`.
+
+`TracemallocProfiler` is a tracer: for every span it records the peak memory allocated while the span ran and the
+memory still retained when it ended, both relative to the traced memory at span start. tracemalloc keeps a single
+process-wide peak, so the profiler folds peaks into enclosing spans before resetting it for a nested span.
+Allocations of other threads are included, so figures are exact only for runs that do not overlap.
+"""
+
+import threading
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from pit8c.metrics import record_stage_memory
+from pit8c.tracing import Span
+
+_lock = threading.Lock()
+# Number of running `tracing_memory` blocks sharing the tracing the first of them started.
+_users = 0
+
+
+@dataclass(slots=True)
+class _OpenStage:
+    span_id: int
+    start_bytes: int
+    peak_bytes: int
+
+
+class TracemallocProfiler:
+    """Tracer recording peak and retained bytes of every span into the current run metrics."""
+
+    def __init__(self) -> None:
+        self._stack: list[_OpenStage] = []
+
+    def on_start(self, span: Span) -> None:
+        """Remember current memory and start measuring a fresh peak for the span."""
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            parent = self._stack[-1]
+            parent.peak_bytes = max(parent.peak_bytes, peak)
+        self._stack.append(_OpenStage(span_id=span.span_id, start_bytes=current, peak_bytes=current))
+        tracemalloc.reset_peak()
+
+    def on_end(self, span: Span) -> None:
+        """Record the span's peak and retained memory and propagate its peak to the enclosing span."""
+
+        if not self._stack or self._stack[-1].span_id != span.span_id:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        stage = self._stack.pop()
+        stage.peak_bytes = max(stage.peak_bytes, peak)
+        if self._stack:
+            parent = self._stack[-1]
+            parent.peak_bytes = max(parent.peak_bytes, stage.peak_bytes)
+
+        span.set_attribute("memory_peak_bytes", stage.peak_bytes - stage.start_bytes)
+        span.set_attribute("memory_retained_bytes", current - stage.start_bytes)
+        record_stage_memory(span.name, stage.peak_bytes - stage.start_bytes, current - stage.start_bytes)
+
+
+@contextmanager
+def tracing_memory() -> Iterator[None]:
+    """
+    Run the block with tracemalloc enabled. Overlapping blocks (e.g. concurrent runs) share the tracing started by
+    the first of them, which the last one to finish stops; tracing started elsewhere is left running.
+    """
+
+    global _users
+    with _lock:
+        shared = _users > 0 or not tracemalloc.is_tracing()
+        if shared:
+            if not _users:
+                tracemalloc.start()
+            _users += 1
+    try:
+        yield
+    finally:
+        if shared:
+            with _lock:
+                _users -= 1
+                if not _users:
+                    tracemalloc.stop()
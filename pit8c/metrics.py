@@ -0,0 +1,70 @@
+"""
+Per-run metrics collection.
+
+Components deep in the pipeline (e.g. the NBP downloader) report what they did to the collector of the current run,
+found through a context variable, so nothing has to be threaded through provider interfaces. Outside of a run
+reporting is a no-op.
+"""
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from pit8c.result import Pit8cMetrics, StageMemory
+
+
+class MetricsCollector:
+    """Mutable accumulator of metrics for a single pipeline run."""
+
+    def __init__(self) -> None:
+        self.fetched_rate_archives: set[tuple[int, str]] = set()
+        self.stage_memory: list[StageMemory] = []
+        self.result_cache_hit: bool | None = None
+
+    def snapshot(self) -> Pit8cMetrics:
+        """Return an immutable copy of the collected metrics."""
+
+        return Pit8cMetrics(
+            fetched_rate_archives=tuple(sorted(self.fetched_rate_archives)),
+            stage_memory=tuple(self.stage_memory),
+            result_cache_hit=self.result_cache_hit,
+        )
+
+
+_current_collector: ContextVar[MetricsCollector | None] = ContextVar("pit8c_metrics_collector", default=None)
+
+
+@contextmanager
+def collect_metrics() -> Iterator[MetricsCollector]:
+    """Collect metrics reported within the block (and the calls it makes in the same thread)."""
+
+    collector = MetricsCollector()
+    token = _current_collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _current_collector.reset(token)
+
+
+def record_rate_archive_fetch(year: int, currencies: Iterable[str]) -> None:
+    """Record that the exchange rates archive of `year` was downloaded for `currencies`."""
+
+    collector = _current_collector.get()
+    if collector is not None:
+        collector.fetched_rate_archives.update((year, currency) for currency in currencies)
+
+
+def record_stage_memory(stage: str, peak_bytes: int, retained_bytes: int) -> None:
+    """Record peak and retained memory of a finished pipeline stage."""
+
+    collector = _current_collector.get()
+    if collector is not None:
+        collector.stage_memory.append(StageMemory(stage=stage, peak_bytes=peak_bytes, retained_bytes=retained_bytes))
+
+
+def record_result_cache_lookup(hit: bool) -> None:
+    """Record whether the result of the run was found in the result cache."""
+
+    collector = _current_collector.get()
+    if collector is not None:
+        collector.result_cache_hit = hit
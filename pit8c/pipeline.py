@@ -1,10 +1,25 @@
+from collections.abc import Callable, Iterable, Iterator, Sized
+from itertools import chain, islice
 from pathlib import Path
+from typing import Any
 
-from pit8c.brokers.base import BrokerAdapter
+from pit8c.brokers.base import BrokerAdapter, HeaderFingerprintAdapter, RowTupleBrokerAdapter, TradeStreamAdapter
 from pit8c.exceptions import Pit8cError
-from pit8c.io.xlsx import read_trades_from_xlsx
+from pit8c.io.xlsx import XlsxReader, find_sheet_by_headers, iter_xlsx_rows, read_trades_from_xlsx, rows_to_dicts
+from pit8c.io.xlsx_stream import find_sheet_by_headers_stream, iter_xlsx_rows_stream
 from pit8c.models import ClosedPosition, Trade
-from pit8c.positions.trades_matcher import match_trades_fifo
+from pit8c.positions.trades_matcher import (
+    iter_matched_positions,
+    merge_trade_streams,
+    sort_trades_chronologically,
+    sort_trades_for_matching,
+    verify_fifo_order,
+)
+from pit8c.progress import STAGE_MATCH, STAGE_READ_REPORTS, checkpoint, track_progress
+from pit8c.tracing import span
+
+# Trades read from one report per `pit8c.read_report` span while reports are streamed.
+READ_CHUNK_SIZE = 10_000
 
 
 def list_xlsx_inputs(reports_path: Path) -> list[Path]:
@@ -24,24 +39,178 @@ def list_xlsx_inputs(reports_path: Path) -> list[Path]:
     return files
 
 
-def load_trades_from_reports_path(adapter: BrokerAdapter, reports_path: Path) -> tuple[list[Path], list[Trade]]:
+def load_trades_from_reports_path(
+    adapter: BrokerAdapter,
+    reports_path: Path,
+    sheet_name: str | None = None,
+    xlsx_reader: XlsxReader = XlsxReader.openpyxl,
+) -> tuple[list[Path], list[Trade]]:
     """Read one or more report XLSX files and parse them into a unified list of trades."""
 
+    input_reports, trade_streams = load_trade_streams_from_reports_path(
+        adapter, reports_path, sort=False, sheet_name=sheet_name, xlsx_reader=xlsx_reader
+    )
+    return input_reports, list(chain.from_iterable(trade_streams))
+
+
+def load_trade_streams_from_reports_path(
+    adapter: BrokerAdapter,
+    reports_path: Path,
+    sort: bool = True,
+    sheet_name: str | None = None,
+    xlsx_reader: XlsxReader = XlsxReader.openpyxl,
+) -> tuple[list[Path], list[list[Trade]]]:
+    """
+    Read one or more report XLSX files into one list of trades per report (see `parse_report` for sheet selection).
+    With `sort=True` every list is put in FIFO order, ready for `match_trade_streams_and_select_tax_year`.
+    """
+
     input_reports = list_xlsx_inputs(reports_path)
 
-    trades: list[Trade] = []
-    for xlsx_path in input_reports:
-        raw_data = read_trades_from_xlsx(xlsx_path)
-        parsed = adapter.parse_trades(raw_data)
-        trades.extend(parsed)
+    trade_streams: list[list[Trade]] = []
+    for done, xlsx_path in enumerate(input_reports):
+        checkpoint(STAGE_READ_REPORTS, done, len(input_reports))
+        with span("pit8c.read_report", path=str(xlsx_path)) as report_span:
+            parsed = parse_report(adapter, xlsx_path, sheet_name, xlsx_reader=xlsx_reader)
+            trade_streams.append(sort_trades_chronologically(parsed) if sort else parsed)
+            report_span.set_attribute("trades", len(parsed))
+    checkpoint(STAGE_READ_REPORTS, len(input_reports), len(input_reports))
 
-    if not trades:
+    if not any(trade_streams):
         raise Pit8cError(f"'{reports_path}' does not contain any trades")
-    return input_reports, trades
+    return input_reports, trade_streams
+
+
+def parse_report(
+    adapter: BrokerAdapter,
+    xlsx_path: Path,
+    sheet_name: str | None = None,
+    xlsx_reader: XlsxReader = XlsxReader.openpyxl,
+) -> list[Trade]:
+    """
+    Parse one report XLSX file, streaming row tuples when the adapter supports them.
+
+    Without `sheet_name`, adapters registering header fingerprints get their trades sheet discovered from the first
+    rows of every sheet; otherwise (or when no sheet matches) the active sheet is read.
+
+    `xlsx_reader=XlsxReader.stream` parses the workbook XML directly instead of going through openpyxl;
+    non-integral numbers are then passed to the adapter as exact Decimals instead of floats.
+    """
+
+    iter_rows, sheet_name, header_row = _locate_trades_sheet(adapter, xlsx_path, sheet_name, xlsx_reader)
+    if isinstance(adapter, RowTupleBrokerAdapter):
+        rows = iter_rows(xlsx_path, sheet_name, header_row=header_row)
+        headers = next(rows, None)
+        return adapter.parse_rows(headers, rows) if headers is not None else []
+    if sheet_name is not None or xlsx_reader == XlsxReader.stream:
+        # Stream just the selected sheet instead of loading the whole workbook.
+        return adapter.parse_trades(rows_to_dicts(iter_rows(xlsx_path, sheet_name, header_row=header_row)))
+    return adapter.parse_trades(read_trades_from_xlsx(xlsx_path))
+
+
+def iter_report_trades(
+    adapter: BrokerAdapter,
+    xlsx_path: Path,
+    sheet_name: str | None = None,
+    xlsx_reader: XlsxReader = XlsxReader.openpyxl,
+) -> Iterator[Trade]:
+    """
+    Lazily parse one report XLSX file (sheet selection as in `parse_report`). Adapters implementing `iter_trades`
+    convert streamed rows one at a time; trades of other adapters are parsed per report by `parse_report`.
+    """
+
+    if not isinstance(adapter, TradeStreamAdapter):
+        yield from parse_report(adapter, xlsx_path, sheet_name, xlsx_reader=xlsx_reader)
+        return
+
+    iter_rows, sheet_name, header_row = _locate_trades_sheet(adapter, xlsx_path, sheet_name, xlsx_reader)
+    rows = iter_rows(xlsx_path, sheet_name, header_row=header_row)
+    headers = next(rows, None)
+    if headers is not None:
+        yield from adapter.iter_trades(headers, rows)
+
+
+def iter_trades_from_reports_path(
+    adapter: BrokerAdapter,
+    reports_path: Path,
+    sheet_name: str | None = None,
+    xlsx_reader: XlsxReader = XlsxReader.openpyxl,
+) -> tuple[list[Path], Iterator[Trade]]:
+    """
+    Return report paths and a lazy FIFO-ordered stream of their trades (k-way merged across reports).
+    Every report must be chronological, since its trades are never held in memory together to be sorted.
+    """
+
+    input_reports = list_xlsx_inputs(reports_path)
+    streams = [
+        verify_fifo_order(
+            _traced_report_reads(iter_report_trades(adapter, path, sheet_name, xlsx_reader=xlsx_reader), path),
+            source=f"'{path}'",
+        )
+        for path in input_reports
+    ]
+
+    def _merged() -> Iterator[Trade]:
+        empty = True
+        for trade in merge_trade_streams(streams):
+            empty = False
+            yield trade
+        if empty:
+            raise Pit8cError(f"'{reports_path}' does not contain any trades")
+
+    return input_reports, _merged()
+
+
+def _traced_report_reads(trades: Iterator[Trade], xlsx_path: Path) -> Iterator[Trade]:
+    """
+    Pass through a report's trade stream, reading it in chunks of `READ_CHUNK_SIZE` trades, each within a
+    `pit8c.read_report` span: merged reports are read interleaved, so one span cannot cover a whole report.
+    """
+
+    while True:
+        with span("pit8c.read_report", path=str(xlsx_path)) as report_span:
+            chunk = list(islice(trades, READ_CHUNK_SIZE))
+            report_span.set_attribute("trades", len(chunk))
+        yield from chunk
+        if len(chunk) < READ_CHUNK_SIZE:
+            return
+
+
+def _locate_trades_sheet(
+    adapter: BrokerAdapter, xlsx_path: Path, sheet_name: str | None, xlsx_reader: XlsxReader
+) -> tuple[Callable[..., Iterator[tuple[Any, ...]]], str | None, int]:
+    """Return the row reader for `xlsx_reader` and the trades sheet name and header row to read."""
+
+    if xlsx_reader == XlsxReader.stream:
+        find_sheet, iter_rows = find_sheet_by_headers_stream, iter_xlsx_rows_stream
+    else:
+        find_sheet, iter_rows = find_sheet_by_headers, iter_xlsx_rows
+
+    header_row = 1
+    if sheet_name is None and isinstance(adapter, HeaderFingerprintAdapter):
+        location = find_sheet(xlsx_path, adapter.header_fingerprints)
+        if location is not None:
+            sheet_name, header_row = location.name, location.header_row
+    return iter_rows, sheet_name, header_row
 
 
 def match_trades_and_select_tax_year(trades: list[Trade], tax_year: int) -> list[ClosedPosition]:
     """Match trades using FIFO and return positions closed (sold) in the given tax year."""
 
-    closed_positions = match_trades_fifo(trades)
-    return [cp for cp in closed_positions if cp.sell_date.year == tax_year]
+    # Positions are filtered as they are matched, so closures from other years are never held in memory together.
+    sorted_trades = track_progress(sort_trades_for_matching(trades), STAGE_MATCH, total=len(trades))
+    return [cp for cp in iter_matched_positions(sorted_trades) if cp.sell_date.year == tax_year]
+
+
+def match_trade_streams_and_select_tax_year(
+    trade_streams: Iterable[Iterable[Trade]], tax_year: int
+) -> list[ClosedPosition]:
+    """
+    K-way merge FIFO-ordered per-report trade streams, match them and return positions closed in the given tax year.
+    Positions are returned in chronological (sell) order rather than grouped by ISIN.
+    """
+
+    trade_streams = list(trade_streams)
+    total = sum(len(s) for s in trade_streams) if all(isinstance(s, Sized) for s in trade_streams) else None
+    merged = track_progress(merge_trade_streams(trade_streams), STAGE_MATCH, total=total)
+    return [cp for cp in iter_matched_positions(merged) if cp.sell_date.year == tax_year]
@@ -1,6 +1,7 @@
 from decimal import Decimal
 
 from pit8c.models import ClosedPosition
+from pit8c.result import Pit8cTotals
 
 
 def calculate_profit(closed_positions: list[ClosedPosition]) -> tuple[list[ClosedPosition], list[ClosedPosition]]:
@@ -12,6 +13,8 @@ def calculate_profit(closed_positions: list[ClosedPosition]) -> tuple[list[Close
     profit_positions: list[ClosedPosition] = []
     loss_positions: list[ClosedPosition] = []
 
+    # Plain Decimal on purpose: prorated amounts of partially closed lots have no fixed scale, and converting them
+    # to scaled integers costs more than the multiplications it would replace.
     for cp in closed_positions:
         # profit in trade currency
         cp.profit = cp.sell_amount - cp.buy_amount
@@ -34,3 +37,12 @@ def calculate_profit(closed_positions: list[ClosedPosition]) -> tuple[list[Close
             loss_positions.append(cp)
 
     return profit_positions, loss_positions
+
+
+def compute_totals(closed_positions: list[ClosedPosition]) -> Pit8cTotals:
+    """Compute aggregated income/costs/profit totals in PLN from closed positions."""
+
+    total_income = sum((cp.income_pln for cp in closed_positions), Decimal(0)).quantize(Decimal("0.01"))
+    total_costs = sum((cp.costs_pln for cp in closed_positions), Decimal(0)).quantize(Decimal("0.01"))
+    profit = (total_income - total_costs).quantize(Decimal("0.01"))
+    return Pit8cTotals(income_pln=total_income, costs_pln=total_costs, profit_pln=profit)
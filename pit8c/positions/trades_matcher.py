@@ -1,20 +1,89 @@
-from collections import deque
+import heapq
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import TypedDict
+from itertools import pairwise
 
 from pit8c.exceptions import Pit8cError
 from pit8c.models import ClosedPosition, DirectionEnum, Trade
 
+# Closed lots are dropped from the front of a lot queue once at least this many (and half of the queue) piled up.
+_LOT_QUEUE_COMPACT_MIN = 1024
+
+
+@dataclass(slots=True)
+class _OpenLot:
+    """Buy lot with the quantity, amount and commission not matched yet."""
 
-class _OpenPosition(TypedDict):
     remaining_qty: Decimal
-    buy_date: datetime
-    remaining_buy_amount: Decimal
-    remaining_buy_commission: Decimal
-    buy_comm_currency: str
-    ticker: str
-    currency: str
+    remaining_amount: Decimal
+    remaining_commission: Decimal
+    buy: Trade
+
+
+class _LotQueue:
+    """FIFO of open buy lots of one (isin, currency): a list with a head index instead of a deque of records."""
+
+    __slots__ = ("head", "lots")
+
+    def __init__(self) -> None:
+        self.lots: list[_OpenLot] = []
+        self.head = 0
+
+    def advance(self) -> None:
+        """Drop the head lot (fully matched), compacting the list when closed lots dominate it."""
+
+        self.head += 1
+        if self.head == len(self.lots):
+            self.lots.clear()
+            self.head = 0
+        elif self.head >= _LOT_QUEUE_COMPACT_MIN and self.head * 2 >= len(self.lots):
+            del self.lots[: self.head]
+            self.head = 0
+
+
+def fifo_order_key(trade: Trade) -> tuple[datetime, int, int]:
+    """
+    Chronological FIFO order of trades within one (isin, currency):
+    by time, buys before sells at the same moment, then by trade number.
+    """
+    return trade.date, 0 if trade.direction == DirectionEnum.buy else 1, trade.trade_num
+
+
+def sort_trades_chronologically(trades: list[Trade]) -> list[Trade]:
+    """
+    Return trades in FIFO order (see `fifo_order_key`). Broker reports are normally chronological already,
+    so the list is only verified in a single pass and sorted (stably) when the check fails.
+    """
+    if all(fifo_order_key(a) <= fifo_order_key(b) for a, b in pairwise(trades)):
+        return trades
+    return sorted(trades, key=fifo_order_key)
+
+
+def verify_fifo_order(trades: Iterable[Trade], source: str) -> Iterator[Trade]:
+    """
+    Pass through a trade stream that must already be in FIFO order (see `fifo_order_key`),
+    raising when a trade arrives out of order instead of sorting (which would need the whole stream).
+    """
+    previous: tuple[datetime, int, int] | None = None
+    for trade in trades:
+        key = fifo_order_key(trade)
+        if previous is not None and key < previous:
+            raise Pit8cError(
+                f"Trades in {source} are not in chronological order (trade_num={trade.trade_num}, {trade.date}); "
+                "streaming requires chronological reports"
+            )
+        previous = key
+        yield trade
+
+
+def merge_trade_streams(streams: Iterable[Iterable[Trade]]) -> Iterator[Trade]:
+    """
+    Lazily k-way merge per-report trade streams, each already in FIFO order, into a single FIFO-ordered stream.
+    Ties are resolved in favour of earlier streams, exactly like a stable sort of the concatenated streams.
+    """
+    return heapq.merge(*streams, key=fifo_order_key)
 
 
 def match_trades_fifo(trades: list[Trade]) -> list[ClosedPosition]:
@@ -25,11 +94,17 @@ def match_trades_fifo(trades: list[Trade]) -> list[ClosedPosition]:
     Output: List[ClosedPosition], describing each partial/full closure.
     """
 
+    return list(iter_matched_positions(sort_trades_for_matching(trades)))
+
+
+def sort_trades_for_matching(trades: list[Trade]) -> list[Trade]:
+    """Sort trades grouped by (isin, currency) and in FIFO order within each group."""
+
     # Sort deterministically and FIFO-correctly:
     # - group by (isin, currency)
     # - process in chronological order
     # - for same moment, process buys before sells
-    trades_sorted = sorted(
+    return sorted(
         trades,
         key=lambda t: (
             t.isin,
@@ -40,12 +115,24 @@ def match_trades_fifo(trades: list[Trade]) -> list[ClosedPosition]:
         ),
     )
 
-    # { (isin, currency): queue of buy-lots with remaining qty/amount/commission, ... }
-    open_positions: dict[tuple[str, str], deque[_OpenPosition]] = {}
 
-    results: list[ClosedPosition] = []
+def match_trade_streams_fifo(streams: Iterable[Iterable[Trade]]) -> Iterator[ClosedPosition]:
+    """
+    Match FIFO-ordered per-report trade streams without concatenating and re-sorting the full history.
+    Only open buy lots are kept in memory while the merged stream is consumed.
+    """
+    return iter_matched_positions(merge_trade_streams(streams))
+
 
-    for trade in trades_sorted:
+def iter_matched_positions(trades: Iterable[Trade]) -> Iterator[ClosedPosition]:
+    """
+    Match a stream of trades in which the trades of every (isin, currency) arrive in FIFO order
+    (the stream may be grouped by key or interleaved chronologically) and yield closed positions.
+    """
+
+    open_lots: dict[tuple[str, str], _LotQueue] = {}
+
+    for trade in trades:
         if not trade.isin or not trade.currency:
             continue
         if trade.quantity <= 0:
@@ -53,22 +140,14 @@ def match_trades_fifo(trades: list[Trade]) -> list[ClosedPosition]:
 
         key = (trade.isin, trade.currency)
         if trade.direction == DirectionEnum.buy:
-            if key not in open_positions:
-                open_positions[key] = deque()
-            open_positions[key].append(
-                {
-                    "remaining_qty": trade.quantity,
-                    "buy_date": trade.date,
-                    "remaining_buy_amount": trade.amount,
-                    "remaining_buy_commission": trade.commission_value,
-                    "buy_comm_currency": trade.commission_currency or trade.currency,
-                    "ticker": trade.ticker,
-                    "currency": trade.currency,
-                }
-            )
+            queue = open_lots.get(key)
+            if queue is None:
+                queue = open_lots[key] = _LotQueue()
+            queue.lots.append(_OpenLot(trade.quantity, trade.amount, trade.commission_value, trade))
 
         elif trade.direction == DirectionEnum.sell:
-            if key not in open_positions:
+            queue = open_lots.get(key)
+            if queue is None:
                 raise Pit8cError(
                     f"Sell trade has no matching buy lots (isin={trade.isin}, currency={trade.currency}, "
                     f"trade_num={trade.trade_num})"
@@ -78,56 +157,61 @@ def match_trades_fifo(trades: list[Trade]) -> list[ClosedPosition]:
             remaining_sell_amount = trade.amount
             remaining_sell_commission = trade.commission_value
             sell_comm_currency = trade.commission_currency or trade.currency
-            fifo_queue = open_positions[key]
+            lots = queue.lots
 
             while remaining_sell_qty > 0:
-                if not fifo_queue:
+                if queue.head == len(lots):
                     raise Pit8cError(
                         f"Sell quantity exceeds available buy lots by {remaining_sell_qty} "
                         f"(isin={trade.isin}, currency={trade.currency}, trade_num={trade.trade_num})"
                     )
 
-                current_buy = fifo_queue.popleft()
-                if current_buy["remaining_qty"] <= 0:
-                    continue
-
-                available_buy_qty = current_buy["remaining_qty"]
-                closed_lot = min(remaining_sell_qty, available_buy_qty)
-
-                buy_portion = closed_lot / available_buy_qty
-                sell_portion = closed_lot / remaining_sell_qty
-
-                buy_amount_portion = current_buy["remaining_buy_amount"] * buy_portion
-                buy_comm_portion = current_buy["remaining_buy_commission"] * buy_portion
-
-                sell_amount_portion = remaining_sell_amount * sell_portion
-                sell_comm_portion = remaining_sell_commission * sell_portion
-
-                closed_pos = ClosedPosition(
+                lot = lots[queue.head]
+                buy = lot.buy
+                available_buy_qty = lot.remaining_qty
+                closes_buy = remaining_sell_qty >= available_buy_qty
+                closes_sell = remaining_sell_qty <= available_buy_qty
+                closed_lot = available_buy_qty if closes_buy else remaining_sell_qty
+
+                # A side closed as a whole has a portion of exactly 1 (x / x), so its remainders are used as they are.
+                if closes_buy:
+                    buy_amount_portion = lot.remaining_amount
+                    buy_comm_portion = lot.remaining_commission
+                else:
+                    buy_portion = closed_lot / available_buy_qty
+                    buy_amount_portion = lot.remaining_amount * buy_portion
+                    buy_comm_portion = lot.remaining_commission * buy_portion
+
+                if closes_sell:
+                    sell_amount_portion = remaining_sell_amount
+                    sell_comm_portion = remaining_sell_commission
+                else:
+                    sell_portion = closed_lot / remaining_sell_qty
+                    sell_amount_portion = remaining_sell_amount * sell_portion
+                    sell_comm_portion = remaining_sell_commission * sell_portion
+
+                yield ClosedPosition(
                     isin=trade.isin,
-                    ticker=current_buy["ticker"],
+                    ticker=buy.ticker,
                     currency=trade.currency,
-                    buy_date=current_buy["buy_date"],
+                    buy_date=buy.date,
                     quantity=closed_lot,
                     buy_amount=buy_amount_portion,
                     sell_date=trade.date,
                     sell_amount=sell_amount_portion,
                     buy_commission=buy_comm_portion,
                     sell_commission=sell_comm_portion,
-                    buy_commission_currency=current_buy["buy_comm_currency"],
+                    buy_commission_currency=buy.commission_currency or buy.currency,
                     sell_commission_currency=sell_comm_currency,
                 )
-                results.append(closed_pos)
 
-                current_buy["remaining_qty"] = available_buy_qty - closed_lot
-                current_buy["remaining_buy_amount"] = current_buy["remaining_buy_amount"] - buy_amount_portion
-                current_buy["remaining_buy_commission"] = current_buy["remaining_buy_commission"] - buy_comm_portion
+                # A partially consumed lot stays at the head and is updated in place; a closed one is skipped.
+                lot.remaining_qty = available_buy_qty - closed_lot
+                if closes_buy:
+                    queue.advance()
+                else:
+                    lot.remaining_amount -= buy_amount_portion
+                    lot.remaining_commission -= buy_comm_portion
                 remaining_sell_qty = remaining_sell_qty - closed_lot
                 remaining_sell_amount = remaining_sell_amount - sell_amount_portion
                 remaining_sell_commission = remaining_sell_commission - sell_comm_portion
-
-                # Keep the partially consumed lot at the head of the queue for subsequent matches.
-                if current_buy["remaining_qty"] > 0:
-                    fifo_queue.appendleft(current_buy)
-
-    return results
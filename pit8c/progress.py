@@ -0,0 +1,118 @@
+"""
+Progress reporting and cooperative cancellation of pipeline runs.
+
+Like metrics and tracing, the progress callback and cancellation token of the current run are found through a context
+variable, so stages deep in the pipeline report progress and check for cancellation without threading either through
+adapter and provider interfaces. Checkpoints sit between report files, every `PROGRESS_INTERVAL` trades while
+matching and between NBP archive downloads; outside of a run they are no-ops.
+
+A progress callback receives `(stage, done, total)`, where `total` is None when it is not known in advance
+(e.g. matching streamed trades). Stages are `STAGE_READ_REPORTS`, `STAGE_MATCH` and `STAGE_EXCHANGE_RATES`.
+"""
+
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TypeVar
+
+from pit8c.exceptions import Pit8cCancelledError
+
+ProgressCallback = Callable[[str, int, int | None], None]
+
+STAGE_READ_REPORTS = "read_reports"  # report files read
+STAGE_MATCH = "match"  # trades matched
+STAGE_EXCHANGE_RATES = "exchange_rates"  # years of NBP rates loaded
+
+# Trades between two checkpoints while matching.
+PROGRESS_INTERVAL = 4096
+
+_T = TypeVar("_T")
+
+
+class CancellationToken:
+    """Flag that stops the runs it is passed to at their next checkpoint; `cancel()` may be called from any thread."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether `cancel()` was called."""
+
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Request cancellation."""
+
+        self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        """Raise `Pit8cCancelledError` when cancellation was requested."""
+
+        if self._event.is_set():
+            raise Pit8cCancelledError("Run cancelled")
+
+
+@dataclass(frozen=True, slots=True)
+class _RunControl:
+    progress: ProgressCallback | None
+    cancel_token: CancellationToken | None
+
+
+_current_control: ContextVar[_RunControl | None] = ContextVar("pit8c_run_control", default=None)
+
+
+@contextmanager
+def run_control(
+    progress: ProgressCallback | None = None, cancel_token: CancellationToken | None = None
+) -> Iterator[None]:
+    """Report progress to `progress` and honour `cancel_token` within the block (in the same thread)."""
+
+    if progress is None and cancel_token is None:
+        yield
+        return
+    token = _current_control.set(_RunControl(progress, cancel_token))
+    try:
+        yield
+    finally:
+        _current_control.reset(token)
+
+
+def checkpoint(stage: str, done: int, total: int | None) -> None:
+    """Raise `Pit8cCancelledError` if the current run was cancelled, otherwise report its progress."""
+
+    control = _current_control.get()
+    if control is None:
+        return
+    if control.cancel_token is not None:
+        control.cancel_token.raise_if_cancelled()
+    if control.progress is not None:
+        control.progress(stage, done, total)
+
+
+def check_cancelled() -> None:
+    """Raise `Pit8cCancelledError` if the current run was cancelled."""
+
+    control = _current_control.get()
+    if control is not None and control.cancel_token is not None:
+        control.cancel_token.raise_if_cancelled()
+
+
+def track_progress(
+    items: Iterable[_T], stage: str, total: int | None = None, interval: int = PROGRESS_INTERVAL
+) -> Iterator[_T]:
+    """Pass `items` through, with a checkpoint before the first item, every `interval` items and after the last one."""
+
+    if _current_control.get() is None:
+        yield from items
+        return
+    done = 0
+    checkpoint(stage, done, total)
+    for item in items:
+        yield item
+        done += 1
+        if done % interval == 0:
+            checkpoint(stage, done, total)
+    checkpoint(stage, done, total)
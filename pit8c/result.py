@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
 from pathlib import Path
 
@@ -27,11 +27,37 @@ class Pit8cArtifacts:
     pit8c_text: str | None = None
     pit8c_pdf_path: Path | None = None
     closed_positions_xlsx_path: Path | None = None
+    # Files of extra artifact writers, by writer name.
+    extra_files: dict[str, Path] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class StageMemory:
+    """Memory allocated by one pipeline stage, relative to the traced memory when the stage started."""
+
+    stage: str
+    peak_bytes: int
+    retained_bytes: int
+
+
+@dataclass(frozen=True, slots=True)
+class Pit8cMetrics:
+    """Diagnostics collected during a PIT-8C processing run."""
+
+    # (year, currency) pairs of exchange rate archives downloaded during the run.
+    fetched_rate_archives: tuple[tuple[int, str], ...] = ()
+    # Per-stage memory in the order stages finished (only with memory profiling enabled).
+    stage_memory: tuple[StageMemory, ...] = ()
+    # Whether the result came from the result cache (None when no cache lookup was made).
+    result_cache_hit: bool | None = None
 
 
 @dataclass(frozen=True, slots=True)
 class Pit8cResult:
-    """Result of PIT-8C processing run, including computed positions, totals and output artifacts."""
+    """
+    Result of PIT-8C processing run, including computed positions, totals and output artifacts.
+    Runs in streaming mode keep no trades or positions: the lists are empty.
+    """
 
     tax_year: int
     input_reports: list[Path]
@@ -41,3 +67,4 @@ class Pit8cResult:
     loss_positions: list[ClosedPosition]
     totals: Pit8cTotals
     artifacts: Pit8cArtifacts
+    metrics: Pit8cMetrics = field(default_factory=Pit8cMetrics)
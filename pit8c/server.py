@@ -0,0 +1,260 @@
+import json
+import logging
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socket import socket
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import TypeAdapter, ValidationError
+
+from pit8c.api import Pit8c
+from pit8c.brokers.base import SupportedBroker
+from pit8c.exceptions import Pit8cError
+from pit8c.exchange.provider import (
+    ExchangeRatesProvider,
+    NbpExchangeRatesProvider,
+    shared_exchange_provider,
+)
+from pit8c.models import Trade
+from pit8c.result import Pit8cResult
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+_TRADES_ADAPTER = TypeAdapter(list[Trade])
+
+
+class Pit8cService:
+    """
+    Processes PIT-8C requests against warm, shared state: one exchange rates provider
+    (and its downloaded NBP archives) is reused by every request and every broker runner.
+    """
+
+    def __init__(
+        self,
+        broker: SupportedBroker | str,
+        exchange_provider: ExchangeRatesProvider | None = None,
+        output_dir: Path | None = None,
+    ) -> None:
+        """Create a service; artifacts are written under output_dir only when it is provided."""
+
+        self._exchange_provider = shared_exchange_provider(exchange_provider or NbpExchangeRatesProvider())
+        self._output_dir = output_dir
+        self._runners: dict[str, Pit8c] = {}
+        self._runners_lock = threading.Lock()
+        self._default_broker = broker
+        self._get_runner(broker)
+
+    def process_trades_json(self, body: bytes, *, request_id: str) -> dict[str, Any]:
+        """Process a JSON body of the form {"tax_year": 2024, "trades": [...]}."""
+
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError as exc:
+            raise Pit8cError(f"Request body is not valid JSON: {exc}") from exc
+        if not isinstance(payload, dict):
+            raise Pit8cError("Request body must be a JSON object")
+
+        tax_year = _parse_tax_year(payload.get("tax_year"))
+        trades = _TRADES_ADAPTER.validate_python(payload.get("trades", []))
+
+        runner = self._get_runner(self._default_broker)
+        result = runner.process_trades(
+            trades, tax_year=tax_year, output_base=request_id, output_dir=self._request_output_dir(request_id)
+        )
+        return _result_to_payload(result, request_id)
+
+    def process_report_upload(
+        self,
+        body: bytes,
+        *,
+        request_id: str,
+        tax_year: object,
+        broker: str | None = None,
+        filename: str | None = None,
+    ) -> dict[str, Any]:
+        """Process a raw XLSX broker report sent as the request body."""
+
+        tax_year = _parse_tax_year(tax_year)
+        if not body:
+            raise Pit8cError("Request body must contain an XLSX report")
+
+        report_name = Path(filename or "report.xlsx").name
+        if not report_name.lower().endswith(".xlsx"):
+            report_name = f"{report_name}.xlsx"
+
+        runner = self._get_runner(broker or self._default_broker)
+        with tempfile.TemporaryDirectory(prefix="pit8c-upload-") as tmp_dir:
+            report_path = Path(tmp_dir) / report_name
+            report_path.write_bytes(body)
+            result = runner.process_reports_path(
+                reports_path=report_path, tax_year=tax_year, output_dir=self._request_output_dir(request_id)
+            )
+        return _result_to_payload(result, request_id)
+
+    def _get_runner(self, broker: SupportedBroker | str) -> Pit8c:
+        """Return (creating once) the runner for a broker; all runners share the rates provider."""
+
+        key = broker.value if isinstance(broker, SupportedBroker) else broker
+        with self._runners_lock:
+            runner = self._runners.get(key)
+            if runner is None:
+                write_artifacts = self._output_dir is not None
+                runner = Pit8c(
+                    broker=broker,
+                    exchange_provider=self._exchange_provider,
+                    write_pdf=write_artifacts,
+                    write_xlsx=write_artifacts,
+                )
+                self._runners[key] = runner
+            return runner
+
+    def _request_output_dir(self, request_id: str) -> Path | None:
+        return self._output_dir / request_id if self._output_dir is not None else None
+
+
+class Pit8cHTTPServer(HTTPServer):
+    """HTTP server dispatching each connection to a bounded pool of worker threads."""
+
+    def __init__(self, server_address: tuple[str, int], service: Pit8cService, max_workers: int = 4) -> None:
+        super().__init__(server_address, _Pit8cRequestHandler)
+        self.service = service
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pit8c-worker")
+        # Backpressure: stop accepting connections once every worker is busy and a small queue is full.
+        self._slots = threading.BoundedSemaphore(max_workers * 2)
+
+    def process_request(self, request: socket, client_address: Any) -> None:
+        self._slots.acquire()
+        self._executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request: socket, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+def _content_length(value: str | None) -> int | None:
+    """Return the body length announced by a Content-Length header (0 without one), or None when it is invalid."""
+
+    if value is None:
+        return 0
+    value = value.strip()
+    # int() would also accept signs, underscores and non-ASCII digits; a negative length would read until EOF.
+    return int(value) if value.isascii() and value.isdigit() else None
+
+
+class _Pit8cRequestHandler(BaseHTTPRequestHandler):
+    server: Pit8cHTTPServer
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path '{self.path}'"})
+
+    def do_POST(self) -> None:
+        started = time.perf_counter()
+        request_id = uuid.uuid4().hex
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        status, payload = HTTPStatus.OK, {}
+        try:
+            content_length = _content_length(self.headers.get("Content-Length"))
+            if content_length is None:
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+            elif content_length > MAX_BODY_BYTES:
+                status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body is too large"}
+            else:
+                body = self.rfile.read(content_length)
+                match url.path:
+                    case "/trades":
+                        payload = self.server.service.process_trades_json(body, request_id=request_id)
+                    case "/reports":
+                        payload = self.server.service.process_report_upload(
+                            body,
+                            request_id=request_id,
+                            tax_year=query.get("year"),
+                            broker=query.get("broker"),
+                            filename=query.get("filename"),
+                        )
+                    case _:
+                        status, payload = HTTPStatus.NOT_FOUND, {"error": f"Unknown path '{url.path}'"}
+        except (Pit8cError, ValidationError, ValueError) as exc:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception:
+            logger.exception("Request %s failed", request_id)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+        self._send_json(status, payload)
+        logger.info(
+            "%s %s -> %d in %.1f ms (request_id=%s)",
+            self.command,
+            url.path,
+            status,
+            (time.perf_counter() - started) * 1000,
+            request_id,
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug(format, *args)
+
+    def _send_json(self, status: HTTPStatus, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(service: Pit8cService, host: str = "127.0.0.1", port: int = 8000, max_workers: int = 4) -> None:
+    """Run the HTTP service until interrupted."""
+
+    with Pit8cHTTPServer((host, port), service, max_workers=max_workers) as server:
+        logger.info("Serving PIT-8C API on http://%s:%d with %d workers", host, server.server_port, max_workers)
+        server.serve_forever()
+
+
+def _parse_tax_year(value: object) -> int:
+    try:
+        return int(str(value))
+    except ValueError:
+        raise Pit8cError(f"Invalid or missing tax year: {value!r}") from None
+
+
+def _result_to_payload(result: Pit8cResult, request_id: str) -> dict[str, Any]:
+    artifacts = result.artifacts
+    return {
+        "request_id": request_id,
+        "tax_year": result.tax_year,
+        "totals": {
+            "income_pln": str(result.totals.income_pln),
+            "costs_pln": str(result.totals.costs_pln),
+            "profit_pln": str(result.totals.profit_pln),
+        },
+        "closed_positions": [cp.model_dump(mode="json") for cp in result.closed_positions],
+        "artifacts": {
+            "pit8c_text": artifacts.pit8c_text,
+            "pit8c_pdf_path": str(artifacts.pit8c_pdf_path) if artifacts.pit8c_pdf_path else None,
+            "closed_positions_xlsx_path": (
+                str(artifacts.closed_positions_xlsx_path) if artifacts.closed_positions_xlsx_path else None
+            ),
+        },
+    }
@@ -0,0 +1,59 @@
+"""
+Per-run symbol table for identifier strings (ISINs, tickers, currency codes).
+
+Reports repeat a few hundred identifiers over thousands of rows, but readers return a new string object for every
+cell. Adapters pass identifiers through the symbol table of the current run, found through a context variable like
+the metrics collector, so all trades and closed positions of a run share one string per identifier: memory does not
+grow with duplicates, every identifier is hashed once, and equal identifiers compare by identity in the matcher's
+keys and sort tuples. The interned strings act as the ids, so nothing has to be resolved back to names at output.
+
+Unlike `sys.intern`, the table lives only as long as its run (or a long-lived owner such as a watch processor).
+Outside of a run identifiers pass through unchanged.
+"""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class SymbolTable:
+    """Canonical instances of the identifier strings seen by one run."""
+
+    __slots__ = ("_symbols",)
+
+    def __init__(self) -> None:
+        self._symbols: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def intern(self, value: str) -> str:
+        """Return the canonical instance of `value`, registering it on first sight."""
+
+        return self._symbols.setdefault(value, value)
+
+
+_current_table: ContextVar[SymbolTable | None] = ContextVar("pit8c_symbol_table", default=None)
+
+
+@contextmanager
+def use_symbol_table(table: SymbolTable | None = None) -> Iterator[SymbolTable]:
+    """Intern identifiers parsed within the block (and the calls it makes in the same thread) into `table`."""
+
+    table = table if table is not None else SymbolTable()
+    token = _current_table.set(table)
+    try:
+        yield table
+    finally:
+        _current_table.reset(token)
+
+
+def symbol_interner() -> Callable[[str], str]:
+    """Return the intern function of the current symbol table (identity outside of one), to look up once per report."""
+
+    table = _current_table.get()
+    return table.intern if table is not None else _identity
+
+
+def _identity(value: str) -> str:
+    return value
@@ -0,0 +1,219 @@
+"""
+Lightweight tracing hooks.
+
+Pipeline stages, report files, NBP downloads and artifact writes are wrapped in `span(...)` blocks. Spans are sent
+to the tracer installed for the current context (see `use_tracer`, `Pit8c(tracer=...)`); without a tracer `span`
+returns a shared no-op object, so instrumentation costs a context variable lookup.
+
+A tracer only needs `on_start(span)` and `on_end(span)`, which makes it easy to bridge to an existing tracing stack
+(e.g. start an OpenTelemetry span in `on_start` keyed by `span.span_id` and end it in `on_end`).
+"""
+
+import itertools
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Protocol, Self
+
+logger = logging.getLogger(__name__)
+
+_span_ids = itertools.count(1)
+
+
+@dataclass(slots=True)
+class Span:
+    """A timed operation with attributes; `end_time`/`error` are set when the span finishes."""
+
+    name: str
+    span_id: int
+    parent_id: int | None
+    attributes: dict[str, Any]
+    start_time: float = field(default_factory=time.time)
+    end_time: float | None = None
+    error: str | None = None
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def duration(self) -> float | None:
+        """Duration in seconds, or None while the span is running."""
+
+        return self.end_time - self.start_time if self.end_time is not None else None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute (e.g. a result size) to the span."""
+
+        self.attributes[key] = value
+
+    def _finish(self, error: BaseException | None) -> None:
+        self.end_time = self.start_time + (time.perf_counter() - self._started)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+
+class Tracer(Protocol):
+    """Receives span start/end callbacks."""
+
+    def on_start(self, span: Span) -> None:
+        """Called when a span starts (attributes known upfront are already set)."""
+
+    def on_end(self, span: Span) -> None:
+        """Called when a span ends, with its final attributes, end time and error."""
+
+
+class NoopTracer:
+    """Tracer that ignores all spans."""
+
+    def on_start(self, span: Span) -> None:
+        """Ignore span start."""
+
+        _ = span
+
+    def on_end(self, span: Span) -> None:
+        """Ignore span end."""
+
+        _ = span
+
+
+class MultiTracer:
+    """Tracer forwarding every callback to several tracers in order."""
+
+    def __init__(self, *tracers: Tracer) -> None:
+        self._tracers = tracers
+
+    def on_start(self, span: Span) -> None:
+        """Forward span start."""
+
+        for tracer in self._tracers:
+            tracer.on_start(span)
+
+    def on_end(self, span: Span) -> None:
+        """Forward span end (in reverse order, so tracers nest like context managers)."""
+
+        for tracer in reversed(self._tracers):
+            tracer.on_end(span)
+
+
+class JsonLinesSpanExporter:
+    """Tracer writing every finished span as one JSON object per line to a file or text stream."""
+
+    def __init__(self, target: Path | IO[str]) -> None:
+        self._owned = isinstance(target, Path)
+        self._stream: IO[str] = target.open("a", encoding="utf-8") if isinstance(target, Path) else target
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        """Spans are exported when they end."""
+
+        _ = span
+
+    def on_end(self, span: Span) -> None:
+        """Write the finished span as a JSON line."""
+
+        record = {
+            "name": span.name,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "start_time": span.start_time,
+            "duration_ms": round((span.duration or 0.0) * 1000, 3),
+            "attributes": span.attributes,
+            "error": span.error,
+            "thread": threading.current_thread().name,
+        }
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def close(self) -> None:
+        """Close the output file (streams passed in by the caller are left open)."""
+
+        if self._owned:
+            self._stream.close()
+
+
+_current_tracer: ContextVar[Tracer | None] = ContextVar("pit8c_tracer", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("pit8c_span", default=None)
+
+
+@contextmanager
+def use_tracer(tracer: Tracer | None) -> Iterator[None]:
+    """Send spans opened within the block (in the same thread/context) to `tracer`."""
+
+    token = _current_tracer.set(None if isinstance(tracer, NoopTracer) else tracer)
+    try:
+        yield
+    finally:
+        _current_tracer.reset(token)
+
+
+class _NoopSpan:
+    """Shared span handle used when no tracer is installed."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore attributes."""
+
+        _ = key
+        _ = value
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("_span", "_span_token", "_tracer")
+
+    def __init__(self, tracer: Tracer, name: str, attributes: dict[str, Any]) -> None:
+        self._tracer = tracer
+        parent = _current_span.get()
+        self._span = Span(
+            name=name,
+            span_id=next(_span_ids),
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=attributes,
+        )
+        self._span_token: Token[Span | None] | None = None
+
+    def __enter__(self) -> Span:
+        self._span_token = _current_span.set(self._span)
+        _notify(self._tracer.on_start, self._span)
+        return self._span
+
+    def __exit__(self, exc_type: object, exc: BaseException | None, tb: object) -> None:
+        self._span._finish(exc)  # noqa: SLF001
+        if self._span_token is not None:
+            _current_span.reset(self._span_token)
+        _notify(self._tracer.on_end, self._span)
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager[Span | _NoopSpan]:
+    """
+    Open a span for a `with` block: `with span("pit8c.match", trades=len(trades)) as s: s.set_attribute(...)`.
+    """
+
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return _NOOP_SPAN
+    return _ActiveSpan(tracer, name, attributes)
+
+
+def _notify(callback: Any, span: Span) -> None:
+    """Run a tracer callback; tracing failures are logged and never break the computation."""
+
+    try:
+        callback(span)
+    except Exception:
+        logger.exception("Tracer callback failed for span '%s'", span.name)
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pit8c.brokers.base import BrokerAdapter
+from pit8c.exchange.provider import ExchangeRatesProvider, NbpExchangeRatesProvider
+from pit8c.exchange.rates import fill_exchange_rates
+from pit8c.models import ClosedPosition, Trade
+from pit8c.pipeline import list_xlsx_inputs, match_trades_and_select_tax_year, parse_report
+from pit8c.positions.profit_calculator import calculate_profit, compute_totals
+from pit8c.reports.pit_8c import Pit8cReportGenerator, TemplatePit8cReportGenerator
+from pit8c.result import Pit8cTotals
+from pit8c.symbols import SymbolTable, use_symbol_table
+
+_PositionKey = tuple[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class WatchUpdate:
+    """Totals recomputed after one or more watched report files changed."""
+
+    tax_year: int
+    changed_reports: list[Path]
+    removed_reports: list[Path]
+    totals: Pit8cTotals
+    pit8c_text: str
+    elapsed_seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class _ReportState:
+    """Parsed trades of a single report file, grouped by (isin, currency)."""
+
+    signature: tuple[int, int]
+    trades_by_key: dict[_PositionKey, list[Trade]] = field(default_factory=dict)
+
+
+class IncrementalReportsProcessor:
+    """
+    Keeps parsed trades, matched positions and the rate provider in memory between runs,
+    so that a change in one report only re-parses that file and re-matches the (isin, currency)
+    keys it contains.
+    """
+
+    def __init__(
+        self,
+        adapter: BrokerAdapter,
+        reports_path: Path,
+        tax_year: int,
+        exchange_provider: ExchangeRatesProvider | None = None,
+        report_generator: Pit8cReportGenerator | None = None,
+    ) -> None:
+        """Create a processor for reports_path; nothing is read until the first refresh()."""
+
+        self._adapter = adapter
+        self._reports_path = reports_path
+        self._tax_year = tax_year
+        self._exchange_provider = exchange_provider or NbpExchangeRatesProvider()
+        self._report_generator = report_generator or TemplatePit8cReportGenerator()
+
+        # Identifiers of all reports share one table, so re-parsed reports reuse the strings of earlier ones.
+        self._symbols = SymbolTable()
+        self._reports: dict[Path, _ReportState] = {}
+        self._positions_by_key: dict[_PositionKey, list[ClosedPosition]] = {}
+        self._totals: Pit8cTotals | None = None
+
+    @property
+    def totals(self) -> Pit8cTotals | None:
+        """Return totals of the last successful refresh (None before the first one)."""
+
+        return self._totals
+
+    @property
+    def closed_positions(self) -> list[ClosedPosition]:
+        """Return positions closed in the tax year as of the last successful refresh."""
+
+        return [cp for positions in self._positions_by_key.values() for cp in positions]
+
+    def refresh(self) -> WatchUpdate | None:
+        """
+        Re-scan reports_path and recompute totals if any report was added, changed or removed.
+        Returns None when nothing changed since the previous refresh.
+
+        State is only committed after a successful recompute, so a file caught mid-save
+        is simply picked up again on the next refresh.
+        """
+        started = time.perf_counter()
+
+        input_reports = list_xlsx_inputs(self._reports_path)
+        current_reports = set(input_reports)
+        removed = [path for path in self._reports if path not in current_reports]
+
+        parsed: dict[Path, _ReportState] = {}
+        for xlsx_path in input_reports:
+            signature = _file_signature(xlsx_path)
+            state = self._reports.get(xlsx_path)
+            if state is not None and state.signature == signature:
+                continue
+            with use_symbol_table(self._symbols):
+                trades = parse_report(self._adapter, xlsx_path)
+            parsed[xlsx_path] = _ReportState(signature=signature, trades_by_key=_group_by_key(trades))
+
+        if not parsed and not removed and self._totals is not None:
+            return None
+
+        affected_keys: set[_PositionKey] = set()
+        for xlsx_path in [*parsed, *removed]:
+            if xlsx_path in self._reports:
+                affected_keys.update(self._reports[xlsx_path].trades_by_key)
+        for state in parsed.values():
+            affected_keys.update(state.trades_by_key)
+
+        # Keep the directory order so FIFO tie-breaking matches a full run.
+        reports = {path: parsed.get(path) or self._reports[path] for path in input_reports}
+        affected_trades = [
+            trade for state in reports.values() for key in affected_keys for trade in state.trades_by_key.get(key, [])
+        ]
+
+        recomputed = match_trades_and_select_tax_year(affected_trades, self._tax_year)
+        fill_exchange_rates(recomputed, provider=self._exchange_provider)
+        calculate_profit(recomputed)
+
+        positions_by_key = {key: value for key, value in self._positions_by_key.items() if key not in affected_keys}
+        for cp in recomputed:
+            positions_by_key.setdefault((cp.isin, cp.currency), []).append(cp)
+
+        self._reports = reports
+        self._positions_by_key = positions_by_key
+        self._totals = compute_totals(self.closed_positions)
+
+        return WatchUpdate(
+            tax_year=self._tax_year,
+            changed_reports=list(parsed),
+            removed_reports=removed,
+            totals=self._totals,
+            pit8c_text=self._report_generator.render_text(self._totals),
+            elapsed_seconds=time.perf_counter() - started,
+        )
+
+
+def watch_reports_path(
+    processor: IncrementalReportsProcessor,
+    on_update: Callable[[WatchUpdate], None],
+    on_error: Callable[[Exception], None],
+    interval: float = 1.0,
+    stop: threading.Event | None = None,
+) -> None:
+    """
+    Poll the processor every `interval` seconds until `stop` is set, reporting updates and errors.
+    Errors do not stop watching: reports are often caught half-written while being edited.
+    """
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            update = processor.refresh()
+        except Exception as exc:
+            on_error(exc)
+        else:
+            if update is not None:
+                on_update(update)
+        stop.wait(interval)
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    """Return a cheap change signature for a file (modification time and size)."""
+
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _group_by_key(trades: list[Trade]) -> dict[_PositionKey, list[Trade]]:
+    """Group trades by (isin, currency) preserving their original order."""
+
+    grouped: dict[_PositionKey, list[Trade]] = {}
+    for trade in trades:
+        grouped.setdefault((trade.isin, trade.currency), []).append(trade)
+    return grouped
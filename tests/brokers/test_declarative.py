@@ -0,0 +1,164 @@
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import openpyxl
+from pit8c.brokers.base import RowTupleBrokerAdapter
+from pit8c.brokers.declarative import ColumnMappingSpec, DeclarativeAdapter, RowFilter
+from pit8c.brokers.freedom24 import FREEDOM24_SPEC, Freedom24Adapter
+from pit8c.models import DirectionEnum
+from pit8c.pipeline import parse_report
+
+_FREEDOM24_ROWS = [
+    {
+        "ISIN": " TEST123 ",
+        "Ticker": "TST",
+        "Direction": "Buy",
+        "Currency": "USD",
+        "Trade date": "2024-01-01 10:15:00",
+        "Settlement date": "2024-01-03",
+        "Quantity": 10,
+        "Amount": 1000.5,
+        "Price": 100.05,
+        "Commission": "2.50usd",
+        "Fee": None,
+        "Trade#": 1234,
+    },
+    {
+        "ISIN": "ABC999",
+        "Ticker": "ABC",
+        "Direction": "Sell (short)",
+        "Currency": "EUR",
+        "Trade date": None,
+        "Settlement date": datetime(2024, 3, 15),
+        "Quantity": "3",
+        "Amount": "450",
+        "Price": None,
+        "Commission": None,
+        "Fee": "1.00EUR",
+        "Trade#": "n/a",
+    },
+    {
+        "ISIN": "CASH",
+        "Ticker": "",
+        "Direction": "Dividend",
+        "Currency": "USD",
+        "Trade date": "2024-02-01",
+        "Settlement date": None,
+        "Quantity": 0,
+        "Amount": 5,
+        "Price": None,
+        "Commission": "",
+        "Fee": None,
+        "Trade#": None,
+    },
+    {
+        "ISIN": "NODATE",
+        "Ticker": "ND",
+        "Direction": "buy",
+        "Currency": "USD",
+        "Trade date": "",
+        "Settlement date": "not a date",
+        "Quantity": 1,
+        "Amount": 1,
+        "Price": 1,
+        "Commission": "n/a",
+        "Fee": None,
+        "Trade#": 7,
+    },
+]
+
+
+def test_freedom24_spec_parses_trade_rows() -> None:
+    """Freedom24 rows: trade date before settlement date, Fee as a fallback commission, non-trade rows skipped."""
+    trades = DeclarativeAdapter(FREEDOM24_SPEC).parse_trades(_FREEDOM24_ROWS)
+
+    assert [(t.isin, t.direction, t.date, t.quantity, t.amount, t.price, t.trade_num) for t in trades] == [
+        (
+            "TEST123",
+            DirectionEnum.buy,
+            datetime(2024, 1, 1, 10, 15),
+            Decimal(10),
+            Decimal("1000.5"),
+            Decimal("100.05"),
+            1234,
+        ),
+        ("ABC999", DirectionEnum.sell, datetime(2024, 3, 15), Decimal(3), Decimal(450), None, 0),
+    ]
+    assert [(t.commission_value, t.commission_currency) for t in trades] == [
+        (Decimal("2.50"), "USD"),
+        (Decimal("1.00"), "EUR"),
+    ]
+    assert Freedom24Adapter().parse_trades(_FREEDOM24_ROWS) == trades
+
+
+def test_parse_rows_uses_custom_labels_formats_and_filters() -> None:
+    spec = ColumnMappingSpec(
+        isin="Symbol ISIN",
+        ticker="Symbol",
+        direction="Side",
+        currency="Ccy",
+        date=("Executed",),
+        quantity="Qty",
+        amount="Value",
+        commission=("Fees",),
+        buy_labels=("kupno",),
+        sell_labels=("sprzedaż",),
+        date_formats=("%d.%m.%Y",),
+        commission_pattern=r"^(?P<currency>[A-Z]{3}) (?P<value>[0-9.]+)$",
+        filters=(RowFilter(column="Status", values=("Cancelled",)),),
+    )
+    headers = (" Symbol ISIN ", "Symbol", "Side", "Ccy", "Executed", "Qty", "Value", "Fees", "Status")
+    rows = [
+        ("PL0001", "AAA", "KUPNO", "PLN", "02.01.2024", 5, "100.10", "PLN 1.5", "Done"),
+        ("PL0001", "AAA", "Sprzedaż", "PLN", "03.01.2024", 5, "120", None, "Cancelled"),
+        # Trailing empty cells are often omitted by XLSX writers.
+        ("PL0001", "AAA", "Sprzedaż", "PLN", "04.01.2024", 2, "50"),
+    ]
+
+    trades = DeclarativeAdapter(spec).parse_rows(headers, rows)
+
+    assert [(t.direction, t.date, t.quantity, t.amount) for t in trades] == [
+        (DirectionEnum.buy, datetime(2024, 1, 2), Decimal(5), Decimal("100.10")),
+        (DirectionEnum.sell, datetime(2024, 1, 4), Decimal(2), Decimal(50)),
+    ]
+    assert (trades[0].commission_value, trades[0].commission_currency) == (Decimal("1.5"), "PLN")
+    assert (trades[1].commission_value, trades[1].commission_currency) == (Decimal(0), "")
+
+
+def test_sheets_without_required_columns_yield_no_trades() -> None:
+    adapter = DeclarativeAdapter(FREEDOM24_SPEC)
+    assert adapter.parse_rows(("ISIN", "Ticker", "Profit"), [("X", "Y", 1)]) == []
+    assert adapter.parse_trades([]) == []
+
+
+def test_pipeline_streams_row_tuples_for_declarative_adapters(tmp_path: Path) -> None:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(list(_FREEDOM24_ROWS[0]))
+    for row in _FREEDOM24_ROWS:
+        ws.append(list(row.values()))
+    report = tmp_path / "report.xlsx"
+    wb.save(report)
+
+    adapter = Freedom24Adapter()
+    assert isinstance(adapter, RowTupleBrokerAdapter)
+    assert parse_report(adapter, report) == adapter.parse_trades(_FREEDOM24_ROWS)
+
+
+def test_date_formats_fall_back_to_strptime_for_non_numeric_directives() -> None:
+    spec = ColumnMappingSpec(
+        isin="ISIN",
+        ticker="Ticker",
+        direction="Direction",
+        currency="Currency",
+        date=("Date",),
+        quantity="Quantity",
+        amount="Amount",
+        date_formats=("%Y-%m-%d", "%d %b %Y"),
+    )
+    headers = ("ISIN", "Ticker", "Direction", "Currency", "Date", "Quantity", "Amount")
+    rows = [("X", "X", "Buy", "USD", "5 Feb 2024", 1, 1), ("X", "X", "Buy", "USD", "2024-02-30", 1, 1)]
+
+    trades = DeclarativeAdapter(spec).parse_rows(headers, rows)
+    assert [t.date for t in trades] == [datetime(2024, 2, 5)]
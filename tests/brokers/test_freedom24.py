@@ -3,6 +3,8 @@ from decimal import Decimal
 
 import pytest
 from pit8c.brokers.freedom24 import Freedom24Adapter
+from pit8c.brokers.validation import TradeValidation
+from pit8c.exceptions import Pit8cError
 from pit8c.models import DirectionEnum
 
 
@@ -140,3 +142,59 @@ def test_freedom24_adapter_parses_fee_column_as_commission() -> None:
     assert len(trades) == 1
     assert trades[0].commission_value == Decimal("6.00")
     assert trades[0].commission_currency == "USD"
+
+
+def test_freedom24_adapter_iter_trades_matches_parse_trades() -> None:
+    """Streamed row tuples are parsed like dict rows, lazily and skipping non-trade rows."""
+    headers = (" ISIN ", "Ticker", "Direction", "Currency", "Trade date", "Quantity", "Amount", "Commission", None)
+    rows = [
+        ("TEST123", "TST", "Buy", "USD", "2024-01-01", 2, 100.5, "1.5USD", None),
+        ("Total", None, None, None, None, None, 100.5, None, None),
+        ("TEST123", "TST", "Sell", "USD", "2024-02-01", 1),
+    ]
+    adapter = Freedom24Adapter()
+
+    trades = adapter.iter_trades(headers, iter(rows))
+    assert not isinstance(trades, list)
+    dict_rows = [dict(zip([str(h).strip() if h else "" for h in headers], row, strict=False)) for row in rows]
+    assert list(trades) == adapter.parse_trades(dict_rows)
+    assert len(adapter.parse_trades(dict_rows)) == 2
+
+
+def test_freedom24_adapter_reports_invalid_rows_by_number() -> None:
+    """Rows with non-numeric amounts fail with their report row number in both validation modes."""
+    rows = [
+        {"ISIN": "X1", "Direction": "Buy", "Currency": "USD", "Trade date": "2024-01-01", "Quantity": 1, "Amount": 10},
+        {
+            "ISIN": "X1",
+            "Direction": "Sell",
+            "Currency": "USD",
+            "Trade date": "2024-02-01",
+            "Quantity": 1,
+            "Amount": "?",
+        },
+    ]
+    for validation in TradeValidation:
+        with pytest.raises(Pit8cError, match="Invalid trade in report row 3"):
+            Freedom24Adapter(validation).parse_trades(rows)
+
+
+def test_freedom24_adapter_fast_validation_builds_equal_trades() -> None:
+    """Trades built without validation equal the validated ones."""
+    rows = [
+        {
+            "ISIN": "X1",
+            "Direction": "Buy",
+            "Currency": "USD",
+            "Trade date": "2024-01-01",
+            "Quantity": 2,
+            "Amount": 10.5,
+        },
+        {"ISIN": "X1", "Direction": "Sell", "Currency": "USD", "Trade date": "2024-02-01", "Quantity": 2, "Amount": 12},
+    ]
+    adapter = Freedom24Adapter()
+    fast = adapter.with_validation(TradeValidation.fast)
+
+    assert adapter.with_validation(TradeValidation.strict) is adapter
+    assert fast.parse_trades(rows) == adapter.parse_trades(rows)
+    assert list(fast.iter_trades(tuple(rows[0]), (tuple(r.values()) for r in rows))) == adapter.parse_trades(rows)
@@ -0,0 +1,62 @@
+import sys
+from collections.abc import Iterator
+from importlib.metadata import EntryPoint
+from pathlib import Path
+
+import pytest
+from pit8c.api import Pit8c
+from pit8c.brokers import registry
+from pit8c.brokers.base import SupportedBroker
+from pit8c.brokers.freedom24 import Freedom24Adapter
+from pit8c.exceptions import Pit8cError
+
+_PLUGIN_SOURCE = """
+class AcmeAdapter:
+    def parse_trades(self, raw_data):
+        return []
+"""
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry() -> Iterator[None]:
+    registry.clear_broker_registry_cache()
+    yield
+    registry.clear_broker_registry_cache()
+
+
+@pytest.fixture
+def acme_plugin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Install a fake plugin module exposed through the broker entry point group."""
+    (tmp_path / "acme_pit8c_plugin.py").write_text(_PLUGIN_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "acme_pit8c_plugin", raising=False)
+
+    plugin = EntryPoint(name="acme", value="acme_pit8c_plugin:AcmeAdapter", group=registry.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(registry, "entry_points", lambda group: [plugin] if group == registry.ENTRY_POINT_GROUP else [])
+    return "acme"
+
+
+def test_builtin_brokers_resolve_from_enum_and_name() -> None:
+    adapter = registry.get_broker_adapter(SupportedBroker.freedom24)
+    assert isinstance(adapter, Freedom24Adapter)
+    assert registry.get_broker_adapter("freedom24") is adapter
+
+
+def test_plugin_adapters_are_imported_lazily_and_cached(acme_plugin: str) -> None:
+    assert registry.available_brokers() == ["acme", "freedom24"]
+    assert "acme_pit8c_plugin" not in sys.modules
+
+    adapter = registry.get_broker_adapter(acme_plugin)
+    assert "acme_pit8c_plugin" in sys.modules
+    assert type(adapter).__name__ == "AcmeAdapter"
+    assert registry.get_broker_adapter(acme_plugin) is adapter
+
+
+def test_pit8c_accepts_plugin_brokers_and_rejects_unknown(acme_plugin: str) -> None:
+    Pit8c(broker=acme_plugin)
+    assert "acme_pit8c_plugin" not in sys.modules
+
+    with pytest.raises(Pit8cError, match="Supported brokers: acme, freedom24"):
+        Pit8c(broker="unknown")
+    with pytest.raises(Pit8cError, match="Unsupported broker 'unknown'"):
+        registry.get_broker_adapter("unknown")
@@ -0,0 +1,61 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from pit8c.brokers.validation import TradeValidation, build_trades, iter_build_trades
+from pit8c.exceptions import Pit8cError
+from pit8c.models import DirectionEnum, Trade
+
+
+def _fields(**overrides: object) -> dict[str, object]:
+    fields = {
+        "isin": "X1",
+        "ticker": "X",
+        "currency": "USD",
+        "direction": DirectionEnum.buy,
+        "date": datetime(2024, 1, 1),
+        "quantity": Decimal(1),
+        "amount": Decimal(10),
+        "commission_value": Decimal(0),
+        "commission_currency": "",
+        "price": None,
+        "trade_num": 0,
+    }
+    fields.update(overrides)
+    return fields
+
+
+def test_build_trades_reports_validation_errors_with_row_numbers() -> None:
+    fields = [_fields(), _fields(direction="hold"), _fields(), _fields(quantity="many")]
+
+    with pytest.raises(Pit8cError, match=r"\(2 errors\)") as exc_info:
+        build_trades(fields, [2, 3, 5, 8])
+
+    message = str(exc_info.value)
+    assert "row 3, direction:" in message
+    assert "row 8, quantity:" in message
+
+
+def test_iter_build_trades_validates_in_chunks() -> None:
+    rows = [(n, _fields(trade_num=n)) for n in range(2, 9)]
+
+    trades = list(iter_build_trades(iter(rows), chunk_size=3))
+    assert [t.trade_num for t in trades] == list(range(2, 9))
+    assert list(iter_build_trades(rows, TradeValidation.fast)) == trades
+
+    rows[5] = (7, _fields(date="never"))
+    with pytest.raises(Pit8cError, match="row 7, date:"):
+        list(iter_build_trades(rows, chunk_size=3))
+
+
+def test_fast_trades_behave_like_constructed_models() -> None:
+    fields = _fields(trade_num=7)
+    minimal = {k: v for k, v in fields.items() if k not in {"commission_currency", "price", "trade_num"}}
+
+    full, partial = build_trades([dict(fields), dict(minimal)], [2, 3], TradeValidation.fast)
+    assert full == Trade.model_construct(**fields)
+    assert partial == Trade.model_construct(**minimal)
+    assert partial.model_fields_set == set(minimal)
+    assert partial.model_dump() == {**fields, "trade_num": 0}
+    assert full.model_copy(update={"trade_num": 8}).trade_num == 8
+    assert repr(full) == repr(Trade(**fields))
@@ -1,27 +1,45 @@
-from collections.abc import Callable
-from datetime import date
+import hashlib
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
 
 import pytest
 from pit8c.exchange.nbp import NbpExchange
+from pit8c.exchange.provider import (
+    NbpExchangeRatesProvider,
+    SynchronizedExchangeRatesProvider,
+    shared_exchange_provider,
+)
+from pit8c.metrics import collect_metrics
+from pit8c.tracing import Span, use_tracer
 
 
 class _DummyResponse:
+    status_code = 200
+
     def __init__(self, text: str) -> None:
         """Create a response-like object with a fixed text body."""
         self.text = text
+        self.headers: dict[str, str] = {}
 
     def raise_for_status(self) -> None:
         """Mimic requests.Response.raise_for_status for successful responses."""
         return None
 
 
-def _make_get(text: str) -> Callable[[str, int], _DummyResponse]:
+def _make_get(text: str) -> Callable[..., _DummyResponse]:
     """Create a stub replacement for requests.get that returns a fixed response body."""
 
-    def _get(_url: str, timeout: int) -> _DummyResponse:
+    def _get(_url: str, timeout: int, headers: dict[str, str]) -> _DummyResponse:
         """Return a dummy response for any request URL."""
         _ = timeout
+        _ = headers
         return _DummyResponse(text)
 
     return _get
@@ -60,9 +78,10 @@ def test_nbp_previous_day_lookup_can_cross_year_boundary(monkeypatch: pytest.Mon
         ]
     )
 
-    def _get(url: str, timeout: int) -> _DummyResponse:
+    def _get(url: str, timeout: int, headers: dict[str, str]) -> _DummyResponse:
         """Return year-specific CSV content based on the requested URL."""
         _ = timeout
+        _ = headers
         return _DummyResponse(csv_2023 if "archiwum_tab_a_2023.csv" in url else csv_2024)
 
     monkeypatch.setattr("requests.get", _get)
@@ -90,3 +109,296 @@ def test_nbp_skips_invalid_values_and_keeps_searching(monkeypatch: pytest.Monkey
 
     # 2024-01-03 previous day is 2024-01-02 (missing), so it should fall back to 2024-01-01.
     assert exchange.get_rate_for(date(2024, 1, 3), "HUF", use_previous_day=True) == Decimal("1.00")
+
+
+def test_nbp_year_table_keeps_the_last_row_of_a_repeated_date(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Rows out of order are sorted; a repeated date keeps its last row, also for currencies requested later."""
+    csv_text = "\n".join(
+        [
+            "data;1USD;1EUR",
+            "20240103;4,20;4,60",
+            "20240102;4,00;4,40",
+            "20240103;4,30;",
+        ]
+    )
+    requested: list[str] = []
+
+    def _get(url: str, timeout: int, headers: dict[str, str]) -> _DummyResponse:
+        """Serve the archive and record requested URLs."""
+        _ = timeout
+        _ = headers
+        requested.append(url)
+        return _DummyResponse(csv_text)
+
+    monkeypatch.setattr("requests.get", _get)
+
+    exchange = NbpExchange()
+    exchange.load_year(2024, {"USD"})
+    exchange.load_year(2024, {"EUR"})
+
+    assert len(requested) == 1
+    assert exchange.get_rate_for(date(2024, 1, 3), "USD", use_previous_day=False) == Decimal("4.30")
+    assert exchange.get_rate_for(date(2024, 1, 4), "EUR") == Decimal("4.40")
+    with pytest.raises(ValueError, match="Currency EUR not found for date 2024-01-03"):
+        exchange.get_rate_for(date(2024, 1, 3), "EUR", use_previous_day=False)
+
+
+def test_nbp_loads_previous_year_lazily_on_miss(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The previous year is downloaded only for lookups before the first quotation of the year."""
+    csv_by_year = {
+        2023: "data;1USD;1EUR\n20231229;4,00;4,40",
+        2024: "data;1USD;1EUR\n20240102;4,10;4,50\n20240103;4,20;4,60",
+    }
+    requested: list[str] = []
+
+    def _get(url: str, timeout: int, headers: dict[str, str]) -> _DummyResponse:
+        """Serve year-specific CSV content and record requested URLs."""
+        _ = timeout
+        _ = headers
+        requested.append(url)
+        return _DummyResponse(csv_by_year[int(url[-8:-4])])
+
+    monkeypatch.setattr("requests.get", _get)
+
+    exchange = NbpExchange()
+    with collect_metrics() as metrics:
+        exchange.load_year(2024, {"USD", "EUR", "CHF"})
+        assert exchange.get_rate_for(date(2024, 1, 4), "USD") == Decimal("4.20")
+        assert len(requested) == 1
+
+        assert exchange.get_rate_for(date(2024, 1, 2), "USD") == Decimal("4.00")
+        assert exchange.get_rate_for(date(2024, 1, 1), "USD") == Decimal("4.00")
+        assert len(requested) == 2
+
+        # Currencies missing from an archive are not downloaded again.
+        exchange.load_year(2024, {"CHF"})
+        assert len(requested) == 2
+
+    assert metrics.snapshot().fetched_rate_archives == ((2023, "USD"), (2024, "EUR"), (2024, "USD"))
+
+
+class _ArchiveServer:
+    """Local stand-in for the NBP archive host that honours If-None-Match with "304 Not Modified"."""
+
+    def __init__(self) -> None:
+        self.archives: dict[int, str] = {}
+        self.requests: list[tuple[int, str | None]] = []
+        # Seconds every response is delayed, so that concurrent clients overlap.
+        self.delay = 0.0
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                year = int(self.path[-8:-4])
+                body = server.archives[year].encode()
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                server.requests.append((year, self.headers.get("If-None-Match")))
+                time.sleep(server.delay)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+                _ = format
+                _ = args
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}/archiwum_tab_a_{{year}}.csv"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def archive_server() -> Iterator[_ArchiveServer]:
+    server = _ArchiveServer()
+    try:
+        yield server
+    finally:
+        server.close()
+
+
+class _ParseSpans:
+    def __init__(self) -> None:
+        """Record finished nbp.parse spans."""
+
+        self.parses: list[Span] = []
+
+    def on_start(self, span: Span) -> None:
+        """Spans are recorded when they end."""
+
+        _ = span
+
+    def on_end(self, span: Span) -> None:
+        """Record parse spans."""
+
+        if span.name == "nbp.parse":
+            self.parses.append(span)
+
+
+def test_nbp_current_year_is_revalidated_conditionally(archive_server: _ArchiveServer, tmp_path: Path) -> None:
+    """Within the TTL nothing is requested; then 304 skips parsing and appended rows are parsed incrementally."""
+    footer = "\nkod ISO;USD;EUR\nnazwa waluty;dolar amerykanski;euro\n"
+    rows = ["20240102;4,00;4,40", "20240103;4,10;4,50"]
+    archive_server.archives[2024] = "data;1USD;1EUR\n" + "\n".join(rows) + footer
+    now = [datetime(2024, 1, 4, 13).timestamp()]
+    tracer = _ParseSpans()
+
+    def _exchange() -> NbpExchange:
+        return NbpExchange(cache_dir=tmp_path, ttl=600, archive_url=archive_server.url, clock=lambda: now[0])
+
+    exchange = _exchange()
+    with use_tracer(tracer):
+        exchange.load_year(2024, {"USD"})
+        exchange.load_year(2024, {"USD", "EUR"})
+        assert archive_server.requests == [(2024, None)]
+        # Every currency column was parsed by the first load: EUR is a lookup.
+        assert len(tracer.parses) == 1
+        assert exchange.get_rate_for(date(2024, 1, 4), "EUR") == Decimal("4.50")
+
+        now[0] += 601
+        exchange.load_year(2024, {"USD", "EUR"})
+        assert len(archive_server.requests) == 2
+        assert archive_server.requests[1][1] is not None
+        assert len(tracer.parses) == 1
+
+        rows.append("20240104;4,20;4,60")
+        archive_server.archives[2024] = "data;1USD;1EUR\n" + "\n".join(rows) + footer
+        now[0] += 601
+        with collect_metrics() as metrics:
+            exchange.load_year(2024, {"USD"})
+        assert len(archive_server.requests) == 3
+        assert tracer.parses[-1].attributes["incremental"] is True
+        assert tracer.parses[-1].attributes["rows"] == 1
+        assert metrics.snapshot().fetched_rate_archives == ((2024, "EUR"), (2024, "USD"))
+        assert exchange.get_rate_for(date(2024, 1, 5), "USD") == Decimal("4.20")
+        assert exchange.get_rate_for(date(2024, 1, 5), "EUR") == Decimal("4.60")
+
+    # A new process within the TTL reads the archive from the disk cache.
+    restarted = _exchange()
+    restarted.load_year(2024, {"EUR"})
+    assert len(archive_server.requests) == 3
+    assert restarted.get_rate_for(date(2024, 1, 5), "EUR") == Decimal("4.60")
+
+
+def test_nbp_archive_checked_after_its_year_is_final(archive_server: _ArchiveServer, tmp_path: Path) -> None:
+    archive_server.archives[2023] = "data;1USD\n20231229;4,00\n"
+    now = [datetime(2023, 12, 30, 12).timestamp()]
+
+    def _exchange() -> NbpExchange:
+        return NbpExchange(cache_dir=tmp_path, ttl=600, archive_url=archive_server.url, clock=lambda: now[0])
+
+    _exchange().load_year(2023, {"USD"})
+    now[0] = datetime(2024, 1, 3).timestamp()
+    # Fetched before the year ended: revalidated once, then final.
+    _exchange().load_year(2023, {"USD"})
+    now[0] += 10 * 365 * 24 * 3600
+    _exchange().load_year(2023, {"USD"})
+
+    assert len(archive_server.requests) == 2
+    assert archive_server.requests[1][1] is not None
+
+
+def test_nbp_provider_downloads_from_given_archive_url(archive_server: _ArchiveServer) -> None:
+    archive_server.archives[2024] = "data;1USD\n20240102;4,00\n"
+    provider = NbpExchangeRatesProvider(archive_url=archive_server.url)
+
+    provider.prefetch({2024}, {"USD"})
+
+    assert archive_server.requests == [(2024, None)]
+    assert provider.get_rate(date(2024, 1, 3), "USD") == Decimal("4.00")
+
+
+def test_nbp_concurrent_loads_download_each_year_once(archive_server: _ArchiveServer) -> None:
+    """Threads loading and reading the same years at once trigger one download per year and always see full tables."""
+    years = range(2018, 2025)
+    for year in years:
+        archive_server.archives[year] = (
+            f"data;1USD;100HUF\n{year}0102;{year % 100},00;1,{year % 100}\n{year}0103;4,00;1,00\n"
+        )
+    archive_server.delay = 0.05
+    provider = NbpExchangeRatesProvider(archive_url=archive_server.url)
+    n_threads = 32
+    barrier = threading.Barrier(n_threads)
+
+    def _worker(i: int) -> None:
+        barrier.wait()
+        for year in (*years[i % len(years) :], *years[: i % len(years)]):
+            provider.prefetch({year}, {"USD", "HUF"} if i % 2 else {"USD"})
+            for _ in range(20):
+                assert provider.get_rate(date(year, 1, 3), "USD") == Decimal(year % 100)
+                assert provider.get_rate(date(year, 1, 3), "HUF") == Decimal(f"0.01{year % 100}")
+                assert provider.get_rate(date(year, 1, 4), "USD") == Decimal("4.00")
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        for future in [executor.submit(_worker, i) for i in range(n_threads)]:
+            future.result()
+
+    assert sorted(year for year, _ in archive_server.requests) == list(years)
+
+
+def test_nbp_revalidation_overlaps_first_lookups_of_new_currencies(archive_server: _ArchiveServer) -> None:
+    """Revalidations copy the published table while readers convert its columns (a probabilistic stress test)."""
+    codes = [f"X{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(26 * 26)]
+    header = ";".join(["data", *(f"1{code}" for code in codes)])
+    days = [date(2024, 1, 2) + timedelta(days=i) for i in range(100)]
+    rows = [f"{day:%Y%m%d}" + "".join(f";{i % 9 + 1},00" for i in range(len(codes))) for day in days]
+    archive_server.archives[2024] = "\n".join([header, *rows]) + "\n"
+    # Every load revalidates the archive and finds a correction of the last day appended, which re-sorts the rows
+    # and drops the converted columns, so readers keep converting columns of each newly published table.
+    exchange = NbpExchange(ttl=0, archive_url=archive_server.url, clock=lambda: datetime(2024, 12, 1).timestamp())
+    exchange.load_year(2024, {"XAA"})
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-4)
+    done = threading.Event()
+
+    def _reader(offset: int) -> None:
+        while not done.is_set():
+            for i in range(offset, len(codes), 4):
+                assert exchange.get_rate_for(days[-1], codes[i]) == Decimal(i % 9 + 1)
+
+    def _revalidate() -> None:
+        try:
+            for _ in range(20):
+                archive_server.archives[2024] += f"{rows[-1]}\n"
+                exchange.load_year(2024, {"XAA"})
+        finally:
+            done.set()
+
+    try:
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(_reader, offset) for offset in range(4)]
+            futures.append(executor.submit(_revalidate))
+            for future in futures:
+                future.result()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert len(archive_server.requests) == 21
+
+
+def test_shared_exchange_provider_wraps_only_providers_that_are_not_thread_safe() -> None:
+    provider = NbpExchangeRatesProvider()
+    assert shared_exchange_provider(provider) is provider
+
+    class _Provider:
+        def prefetch(self, years: set[int], currencies: set[str]) -> None:
+            _ = years, currencies
+
+        def get_rate(self, d: date, currency: str, *, use_previous_day: bool = True) -> Decimal:
+            _ = d, currency, use_previous_day
+            return Decimal(1)
+
+    wrapped = shared_exchange_provider(_Provider())
+    assert isinstance(wrapped, SynchronizedExchangeRatesProvider)
+    assert shared_exchange_provider(wrapped) is wrapped
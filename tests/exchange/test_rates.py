@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 
-from pit8c.exchange.rates import fill_exchange_rates
+from pit8c.exchange.rates import fill_exchange_rates, plan_rate_archives
 from pit8c.models import ClosedPosition
 
 
@@ -10,6 +10,7 @@ class _DummyProvider:
         """Create a provider stub that records prefetch calls and serves fixed rates."""
 
         self.prefetch_calls: list[tuple[set[int], set[str]]] = []
+        self.rate_calls = 0
 
     def prefetch(self, years: set[int], currencies: set[str]) -> None:
         """Record requested years/currencies for later assertions."""
@@ -20,6 +21,7 @@ class _DummyProvider:
         """Return deterministic rates for requested currencies (previous-day flag ignored)."""
 
         _ = use_previous_day
+        self.rate_calls += 1
         return {"USD": Decimal("4.00"), "EUR": Decimal("4.50"), "PLN": Decimal(1)}[currency.upper()]
 
 
@@ -52,3 +54,45 @@ def test_fill_exchange_rates_includes_commission_currencies() -> None:
     assert cp.sell_exchange_rate == Decimal("4.00")
     assert cp.buy_commission_exchange_rate == Decimal("4.50")
     assert cp.sell_commission_exchange_rate == Decimal("4.00")
+
+
+def _position(buy_date: datetime, sell_date: datetime, sell_commission_currency: str = "") -> ClosedPosition:
+    return ClosedPosition(
+        isin="TEST123",
+        ticker="TST",
+        currency="USD",
+        buy_date=buy_date,
+        quantity=Decimal(1),
+        buy_amount=Decimal(100),
+        sell_date=sell_date,
+        sell_amount=Decimal(120),
+        sell_commission_currency=sell_commission_currency,
+    )
+
+
+def test_plan_rate_archives_plans_only_lookup_years() -> None:
+    """The previous year is planned only when the previous-day lookup date falls into it."""
+    mid_year = _position(datetime(2024, 3, 4), datetime(2024, 6, 3), sell_commission_currency="EUR")
+    assert plan_rate_archives([mid_year]) == {2024: {"USD", "EUR"}}
+
+    new_year = _position(datetime(2023, 1, 1, 10, 30), datetime(2024, 1, 2))
+    assert plan_rate_archives([new_year]) == {2022: {"USD"}, 2024: {"USD"}}
+
+    dummy = _DummyProvider()
+    fill_exchange_rates([mid_year, new_year], provider=dummy)
+    assert dummy.prefetch_calls == [({2022}, {"USD"}), ({2024}, {"USD", "EUR"})]
+
+
+def test_fill_exchange_rates_looks_up_each_date_and_currency_once() -> None:
+    """Positions sharing dates and commission currencies reuse rates instead of asking the provider again."""
+    dummy = _DummyProvider()
+    positions = [
+        _position(datetime(2024, 3, 1), datetime(2024, 6, 3)),
+        _position(datetime(2024, 3, 1), datetime(2024, 6, 3), sell_commission_currency="EUR"),
+    ]
+
+    fill_exchange_rates(positions, provider=dummy)
+
+    assert dummy.rate_calls == 3
+    assert positions[1].sell_commission_exchange_rate == Decimal("4.50")
+    assert positions[1].buy_commission_exchange_rate == positions[0].sell_exchange_rate == Decimal("4.00")
@@ -2,9 +2,17 @@ from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
 
+import openpyxl
 import pytest
 from pit8c.io.utils import serialize_decimal
-from pit8c.io.xlsx import read_trades_from_xlsx, write_closed_positions_to_xlsx
+from pit8c.io.xlsx import (
+    ClosedPositionsXlsxWriter,
+    SheetLocation,
+    find_sheet_by_headers,
+    iter_xlsx_rows,
+    read_trades_from_xlsx,
+    write_closed_positions_to_xlsx,
+)
 from pit8c.models import ClosedPosition
 
 
@@ -44,3 +52,90 @@ def test_write_and_read_xlsx(tmp_path: Path, closed_positions: list[ClosedPositi
         assert row["BuyAmount"] == str(cp.buy_amount)
         assert row["SellAmount"] == str(cp.sell_amount)
         assert row["ProfitPLN"] == serialize_decimal(cp.income_pln - cp.costs_pln)
+
+
+def test_find_sheet_by_headers_scans_only_header_rows(tmp_path: Path) -> None:
+    wb = openpyxl.Workbook()
+    wb.active.title = "Summary"
+    wb.active.append(["Total", 1])
+    late = wb.create_sheet("Late")
+    for _ in range(3):
+        late.append(["title"])
+    late.append(["ISIN", "Quantity"])
+    trades = wb.create_sheet("Trades")
+    trades.append(["Account statement"])
+    trades.append([" ISIN ", "Quantity", None, "Amount"])
+    trades.append(["X1", 2, None, 10])
+    path = tmp_path / "multi.xlsx"
+    wb.save(path)
+
+    assert find_sheet_by_headers(path, [{"ISIN", "Quantity"}], max_header_row=2) == SheetLocation("Trades", 2)
+    assert find_sheet_by_headers(path, [{"ISIN", "Quantity"}]) == SheetLocation("Late", 4)
+    assert find_sheet_by_headers(path, [{"ISIN", "Direction"}]) is None
+    assert list(iter_xlsx_rows(path, "Trades", header_row=2)) == [
+        (" ISIN ", "Quantity", None, "Amount"),
+        ("X1", 2, None, 10),
+    ]
+
+
+def _position(isin: str, currency: str, sell_date: datetime, income_pln: str, costs_pln: str) -> ClosedPosition:
+    return ClosedPosition(
+        isin=isin,
+        ticker=f"T{isin}",
+        currency=currency,
+        buy_date=datetime(2024, 1, 2),
+        quantity=Decimal(2),
+        buy_amount=Decimal(10),
+        sell_date=sell_date,
+        sell_amount=Decimal(12),
+        profit=Decimal(income_pln) - Decimal(costs_pln),
+        income_pln=Decimal(income_pln),
+        costs_pln=Decimal(costs_pln),
+    )
+
+
+def test_closed_positions_writer_shards_sheets_at_row_limit(tmp_path: Path) -> None:
+    profit = [_position("P1", "USD", datetime(2024, 3, i + 1), "5", "4") for i in range(5)]
+    loss = [_position("L1", "USD", datetime(2024, 3, 1), "4", "5")]
+    file = tmp_path / "sharded.xlsx"
+
+    with ClosedPositionsXlsxWriter(file, max_rows=3) as writer:
+        writer.write(profit[:3], loss)
+        writer.write(profit[3:], [])
+
+    wb = openpyxl.load_workbook(file)
+    assert wb.sheetnames == ["Profit", "Profit (2)", "Profit (3)", "Loss", "By ISIN", "By currency", "By month"]
+    parts = [list(wb[name].values) for name in ("Profit", "Profit (2)", "Profit (3)")]
+    assert all(len(rows) <= 3 and rows[0][0] == "ISIN" for rows in parts)
+    assert [row[8] for rows in parts for row in rows[1:]] == [f"2024-03-0{i + 1}" for i in range(5)]
+    assert list(wb["By ISIN"].values)[1:] == [
+        ("L1", "TL1", "USD", 1, "2", "-1", "4", "5", "-1"),
+        ("P1", "TP1", "USD", 5, "10", "5", "25", "20", "5"),
+    ]
+
+
+def test_closed_positions_writer_adds_summaries(tmp_path: Path) -> None:
+    file = tmp_path / "summaries.xlsx"
+    write_closed_positions_to_xlsx(
+        [
+            _position("US1", "USD", datetime(2024, 3, 5), "100.50", "80"),
+            _position("US1", "USD", datetime(2024, 4, 1), "50", "40.25"),
+            _position("IE1", "EUR", datetime(2024, 3, 20), "30", "10"),
+        ],
+        [_position("IE1", "EUR", datetime(2024, 4, 2), "5", "25")],
+        file,
+    )
+
+    wb = openpyxl.load_workbook(file)
+    assert list(wb["By ISIN"].values)[1:] == [
+        ("IE1", "TIE1", "EUR", 2, "4", "0.0", "35", "35", "0.0"),
+        ("US1", "TUS1", "USD", 2, "4", "30.25", "150.50", "120.25", "30.25"),
+    ]
+    assert list(wb["By currency"].values)[1:] == [
+        ("EUR", 2, "0.0", "35", "35", "0.0"),
+        ("USD", 2, "30.25", "150.50", "120.25", "30.25"),
+    ]
+    assert list(wb["By month"].values)[1:] == [
+        ("2024-03", 2, "130.50", "90", "40.50"),
+        ("2024-04", 2, "55", "65.25", "-10.25"),
+    ]
@@ -0,0 +1,172 @@
+import tracemalloc
+import zipfile
+from datetime import datetime, time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+import openpyxl
+import pytest
+from pit8c.brokers.freedom24 import Freedom24Adapter
+from pit8c.exceptions import Pit8cError
+from pit8c.io.xlsx import SheetLocation, XlsxReader, find_sheet_by_headers, read_trades_from_xlsx, rows_to_dicts
+from pit8c.io.xlsx_stream import XlsxStreamReader, find_sheet_by_headers_stream, iter_xlsx_rows_stream
+from pit8c.pipeline import parse_report
+
+_HEADERS = ["ISIN", "Ticker", "Direction", "Currency", "Trade date", "Quantity", "Amount", "Price", "Commission"]
+
+
+def _normalize(value: Any) -> Any:
+    """openpyxl returns floats where the streaming reader keeps the stored decimal text."""
+    return Decimal(repr(value)) if isinstance(value, float) else value
+
+
+def _write_trades_workbook(path: Path, extra_cells: bool = True) -> None:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Trades"
+    ws.append(_HEADERS)
+    ws.append(["US0000001", "AAA", "Buy", "USD", "2024-01-02 10:00:00", 10, 100.1, 10.01, "1.5USD"])
+    ws.append(["US0000001", "AAA", "Sell", "USD", datetime(2024, 3, 4, 15, 30, 5), 4, 0.3, 0.075, None])
+    ws.append([None] * len(_HEADERS))
+    ws.append(["US0000002", "BBB", "Buy", "EUR", datetime(2024, 5, 6), 3, 1e-7, -2.5, "0.1EUR"])
+    if extra_cells:
+        ws["J6"] = True
+        ws["B7"] = "=A2"
+        ws["C8"] = time(12, 30)
+        ws["D8"] = 1234567890123
+        ws["E8"] = "Zażółć"
+    wb.create_sheet("Notes").append(["note"])
+    wb.save(path)
+
+
+def test_stream_reader_matches_openpyxl(tmp_path: Path) -> None:
+    path = tmp_path / "trades.xlsx"
+    _write_trades_workbook(path)
+
+    expected = [{k: _normalize(v) for k, v in row.items()} for row in read_trades_from_xlsx(path)]
+    actual = rows_to_dicts(iter_xlsx_rows_stream(path))
+
+    assert actual == expected
+
+    assert actual[0]["Amount"] == Decimal("100.1")
+    assert actual[1]["Trade date"] == datetime(2024, 3, 4, 15, 30, 5)
+    assert actual[1]["Price"] == Decimal("0.075")
+    assert actual[6]["Direction"] == time(12, 30)
+    assert actual[6]["Currency"] == 1234567890123
+
+
+def test_stream_reader_sheets_and_discovery(tmp_path: Path) -> None:
+    path = tmp_path / "trades.xlsx"
+    _write_trades_workbook(path)
+
+    with XlsxStreamReader(path) as reader:
+        assert reader.sheet_names == ["Trades", "Notes"]
+        assert reader.active_sheet == "Trades"
+        assert list(reader.iter_rows("Notes")) == [("note",)]
+        with pytest.raises(Pit8cError, match="Sheet 'Missing' not found"):
+            list(reader.iter_rows("Missing"))
+
+    fingerprints = [{"ISIN", "Direction", "Amount"}]
+    assert find_sheet_by_headers_stream(path, fingerprints) == find_sheet_by_headers(path, fingerprints)
+    assert find_sheet_by_headers_stream(path, [{"note"}]) == SheetLocation("Notes", 1)
+    assert find_sheet_by_headers_stream(path, [{"ISIN", "Missing"}]) is None
+
+
+def test_stream_reader_rejects_non_xlsx(tmp_path: Path) -> None:
+    path = tmp_path / "broken.xlsx"
+    path.write_text("not a zip", encoding="utf-8")
+
+    with pytest.raises(Pit8cError, match="Cannot open"):
+        list(iter_xlsx_rows_stream(path))
+
+
+def test_parse_report_with_stream_reader_matches_openpyxl(tmp_path: Path) -> None:
+    path = tmp_path / "trades.xlsx"
+    _write_trades_workbook(path, extra_cells=False)
+    adapter = Freedom24Adapter()
+
+    expected = parse_report(adapter, path)
+    actual = parse_report(adapter, path, xlsx_reader=XlsxReader.stream)
+
+    assert actual == expected
+    assert [t.amount for t in actual] == [Decimal("100.1"), Decimal("0.3"), Decimal("1E-7")]
+
+
+def _write_raw_workbook(path: Path, sheet_xml: str, shared_strings: list[str], date1904: bool = False) -> None:
+    """Minimal workbook as written by Excel: shared strings, a custom date format and relative part targets."""
+    main = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    rel = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    pkg = 'xmlns="http://schemas.openxmlformats.org/package/2006/relationships"'
+    strings = "".join(f"<si>{s}</si>" for s in shared_strings)
+    parts = {
+        "xl/workbook.xml": (
+            f'<workbook {main} {rel}><workbookPr date1904="{int(date1904)}"/>'
+            '<bookViews><workbookView activeTab="1"/></bookViews><sheets>'
+            '<sheet name="Cover" sheetId="1" r:id="rId1"/><sheet name="Trades" sheetId="2" r:id="rId2"/>'
+            "</sheets></workbook>"
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            f"<Relationships {pkg}>"
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/>'
+            '<Relationship Id="rId2" Target="/xl/worksheets/sheet2.xml"/></Relationships>'
+        ),
+        "xl/styles.xml": (
+            f'<styleSheet {main}><numFmts><numFmt numFmtId="164" formatCode="dd/mm/yyyy\\ hh:mm"/>'
+            '<numFmt numFmtId="165" formatCode="#,##0.00\\ &quot;zł&quot;"/></numFmts>'
+            '<cellXfs><xf numFmtId="0"/><xf numFmtId="164"/><xf numFmtId="165"/><xf numFmtId="14"/></cellXfs>'
+            "</styleSheet>"
+        ),
+        "xl/sharedStrings.xml": f"<sst {main}>{strings}</sst>",
+        "xl/worksheets/sheet1.xml": f"<worksheet {main}><sheetData/></worksheet>",
+        "xl/worksheets/sheet2.xml": f"<worksheet {main}><sheetData>{sheet_xml}</sheetData></worksheet>",
+    }
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in parts.items():
+            archive.writestr(name, content)
+
+
+def test_stream_reader_resolves_shared_strings_and_styles(tmp_path: Path) -> None:
+    path = tmp_path / "excel.xlsx"
+    _write_raw_workbook(
+        path,
+        '<row r="2"><c r="A2" t="s"><v>0</v></c><c r="C2" t="s"><v>1</v></c></row>'
+        '<row r="3"><c r="A3" s="1"><v>45355.5</v></c><c r="B3" s="2"><v>0.1</v></c>'
+        '<c r="C3" s="3"><v>45418</v></c></row>'
+        '<row r="5"><c r="B5" t="e"><v>#N/A</v></c></row>',
+        ["<t>ISIN</t>", '<r><t>Trade </t></r><r><t xml:space="preserve">date</t></r><rPh><t>x</t></rPh>'],
+    )
+
+    with XlsxStreamReader(path) as reader:
+        assert reader.active_sheet == "Trades"
+        assert list(reader.iter_rows(header_row=2)) == [
+            ("ISIN", None, "Trade date"),
+            (datetime(2024, 3, 4, 12), Decimal("0.1"), datetime(2024, 5, 6)),
+            (None, None, None),
+            (None, "#N/A", None),
+        ]
+        assert list(reader.iter_rows("Cover")) == []
+
+    _write_raw_workbook(path, '<row r="1"><c r="A1" s="3"><v>1</v></c></row>', [], date1904=True)
+    assert list(iter_xlsx_rows_stream(path, "Trades")) == [(datetime(1904, 1, 2),)]
+
+
+def test_stream_reader_memory_does_not_grow_with_rows(tmp_path: Path) -> None:
+    """Processed rows are detached from the parsed tree, so reading 10x more rows does not need 10x more memory."""
+
+    def _peak_bytes(n_rows: int) -> int:
+        path = tmp_path / f"rows_{n_rows}.xlsx"
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Trades")
+        for i in range(n_rows):
+            ws.append([i, 1.5, i % 7])
+        wb.save(path)
+        with XlsxStreamReader(path) as reader:
+            tracemalloc.start()
+            try:
+                assert sum(1 for _ in reader.iter_rows("Trades")) == n_rows
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    assert _peak_bytes(10_000) < 2 * _peak_bytes(1_000)
@@ -1,10 +1,15 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 
 import pytest
 from pit8c.exceptions import Pit8cError
 from pit8c.models import ClosedPosition, DirectionEnum, Trade
-from pit8c.positions.trades_matcher import match_trades_fifo
+from pit8c.positions.trades_matcher import (
+    match_trade_streams_fifo,
+    match_trades_fifo,
+    sort_trades_chronologically,
+    verify_fifo_order,
+)
 
 
 @pytest.mark.parametrize(
@@ -134,6 +139,39 @@ def test_fifo_multiple_partial_closures_preserve_buy_amounts_and_commissions() -
     assert sum((cp.buy_commission for cp in closed_positions), Decimal(0)) == Decimal(10)
 
 
+def test_fifo_uses_remainders_of_both_sides_closed_by_equal_quantities() -> None:
+    """Equal quantities close both sides whole, even when they are different Decimal objects (2.0 vs 2)."""
+    buy_amount = Decimal("1.00000000000000000000000000001")  # more digits than the context precision
+    trades = [
+        Trade(
+            isin="TEST123",
+            trade_num=1,
+            ticker="TST",
+            currency="USD",
+            direction=DirectionEnum.buy,
+            date=datetime(2024, 1, 1),
+            quantity=Decimal(2),
+            amount=buy_amount,
+            commission_value=Decimal(1),
+        ),
+        Trade(
+            isin="TEST123",
+            trade_num=2,
+            ticker="TST",
+            currency="USD",
+            direction=DirectionEnum.sell,
+            date=datetime(2024, 1, 2),
+            quantity=Decimal("2.0"),
+            amount=buy_amount,
+            commission_value=Decimal(1),
+        ),
+    ]
+
+    [closed] = match_trades_fifo(trades)
+    assert closed.buy_amount == buy_amount
+    assert closed.sell_amount == buy_amount
+
+
 def test_fifo_rejects_sell_without_buys() -> None:
     trades = [
         Trade(
@@ -215,3 +253,93 @@ def test_fifo_propagates_commission_currencies() -> None:
     closed_positions = match_trades_fifo(trades)
     assert closed_positions[0].buy_commission_currency == "USD"
     assert closed_positions[0].sell_commission_currency == "EUR"
+
+
+def _trade(isin: str, direction: DirectionEnum, day: datetime, quantity: int, amount: int, *, trade_num: int) -> Trade:
+    return Trade(
+        isin=isin,
+        trade_num=trade_num,
+        ticker=isin,
+        currency="USD",
+        direction=direction,
+        date=day,
+        quantity=Decimal(quantity),
+        amount=Decimal(amount),
+        commission_value=Decimal(1),
+    )
+
+
+def test_sort_trades_chronologically_keeps_sorted_lists() -> None:
+    """Already chronological reports are only verified, unsorted ones are sorted (buys first on ties)."""
+    buy = _trade("A", DirectionEnum.buy, datetime(2024, 1, 1), 1, 10, trade_num=2)
+    sell = _trade("A", DirectionEnum.sell, datetime(2024, 1, 1), 1, 12, trade_num=1)
+
+    in_order = [buy, sell]
+    assert sort_trades_chronologically(in_order) is in_order
+    assert sort_trades_chronologically([sell, buy]) == [buy, sell]
+
+
+def test_match_trade_streams_matches_global_sort() -> None:
+    """K-way merging per-report streams yields the same closures as matching the concatenated history."""
+    report_2024 = [
+        _trade("A", DirectionEnum.buy, datetime(2024, 1, 1), 10, 100, trade_num=1),
+        _trade("B", DirectionEnum.buy, datetime(2024, 2, 1), 5, 500, trade_num=2),
+        _trade("A", DirectionEnum.sell, datetime(2024, 3, 1), 4, 60, trade_num=3),
+        _trade("A", DirectionEnum.buy, datetime(2024, 4, 1), 3, 45, trade_num=4),
+    ]
+    report_2025 = [
+        _trade("B", DirectionEnum.sell, datetime(2025, 1, 5), 5, 600, trade_num=5),
+        _trade("A", DirectionEnum.sell, datetime(2025, 2, 1), 9, 180, trade_num=6),
+    ]
+
+    expected = match_trades_fifo(report_2024 + report_2025)
+    merged = list(match_trade_streams_fifo([report_2024, report_2025]))
+
+    def _key(cp: ClosedPosition) -> tuple[str, datetime, datetime]:
+        return cp.isin, cp.sell_date, cp.buy_date
+
+    assert sorted(merged, key=_key) == sorted(expected, key=_key)
+    assert [cp.sell_date for cp in merged] == sorted(cp.sell_date for cp in merged)
+
+
+def test_verify_fifo_order_passes_sorted_streams_and_rejects_unordered() -> None:
+    buy = _trade("A", DirectionEnum.buy, datetime(2024, 1, 1), 1, 10, trade_num=2)
+    sell = _trade("A", DirectionEnum.sell, datetime(2024, 1, 1), 1, 12, trade_num=1)
+
+    assert list(verify_fifo_order([buy, sell], source="report")) == [buy, sell]
+    stream = verify_fifo_order([sell, buy], source="'report.xlsx'")
+    assert next(stream) is sell
+    with pytest.raises(Pit8cError, match=r"Trades in 'report\.xlsx' are not in chronological order"):
+        next(stream)
+
+
+def test_fifo_many_small_lots_partially_consumed() -> None:
+    """Thousands of lots per ISIN, each split between two sells, are closed in FIFO order."""
+    buys = [
+        _trade("A", DirectionEnum.buy, datetime(2024, 1, 1) + timedelta(minutes=i), 1, 10, trade_num=i)
+        for i in range(3000)
+    ]
+    sells = [
+        _trade(
+            "A", DirectionEnum.sell, datetime(2024, 3, 1) + timedelta(minutes=i), 1, 30, trade_num=3000 + i
+        ).model_copy(update={"quantity": Decimal("1.5")})
+        for i in range(1999)
+    ]
+    trades = buys + sells
+
+    closed_positions = match_trades_fifo(trades)
+
+    assert len(closed_positions) == 3998
+    assert sum(cp.quantity for cp in closed_positions) == Decimal("2998.5")
+    assert sum(cp.buy_amount for cp in closed_positions) == Decimal(29985)
+
+    assert [(cp.buy_date.minute, cp.sell_date.minute, cp.quantity) for cp in closed_positions[:4]] == [
+        (0, 0, Decimal(1)),
+        (1, 0, Decimal("0.5")),
+        (1, 1, Decimal("0.5")),
+        (2, 1, Decimal(1)),
+    ]
+    assert closed_positions[1].buy_amount == Decimal(5)
+
+    with pytest.raises(Pit8cError, match=r"exceeds available buy lots by 0\.5"):
+        match_trades_fifo([*trades, _trade("A", DirectionEnum.sell, datetime(2024, 4, 1), 2, 10, trade_num=9999)])
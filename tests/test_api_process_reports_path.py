@@ -2,7 +2,8 @@ from decimal import Decimal
 from pathlib import Path
 
 import openpyxl
-from pit8c import Pit8c
+import pytest
+from pit8c import Pit8c, Pit8cError
 from pit8c.exchange.provider import ExchangeRatesProvider
 
 
@@ -86,3 +87,137 @@ def test_process_reports_path_writes_xlsx_artifact(tmp_path: Path) -> None:
     assert result.artifacts.closed_positions_xlsx_path.exists()
     assert result.artifacts.closed_positions_xlsx_path.parent == output_dir.resolve()
     assert result.artifacts.closed_positions_xlsx_path.name.endswith("_2024_closed_positions.xlsx")
+
+
+def test_process_reports_path_merge_sorted_reports_matches_default(tmp_path: Path) -> None:
+    """K-way merging per-report streams gives the same totals as the default global sort."""
+    report_path = tmp_path / "annual_report_2024.xlsx"
+    _write_freedom24_report(report_path)
+
+    default = Pit8c(broker="freedom24", exchange_provider=_DummyProvider(), write_pdf=False, write_xlsx=False)
+    merged = Pit8c(
+        broker="freedom24",
+        exchange_provider=_DummyProvider(),
+        write_pdf=False,
+        write_xlsx=False,
+        merge_sorted_reports=True,
+    )
+
+    expected = default.process_reports_path(reports_path=report_path, tax_year=2024)
+    result = merged.process_reports_path(reports_path=report_path, tax_year=2024)
+    assert result.totals == expected.totals
+    assert result.trades == expected.trades
+    assert result.closed_positions == expected.closed_positions
+
+
+def test_process_reports_path_discovers_trades_sheet(tmp_path: Path) -> None:
+    """Trades are found on a non-active sheet below title rows; other sheets are ignored."""
+    single_sheet_path = tmp_path / "single.xlsx"
+    _write_freedom24_report(single_sheet_path)
+    trade_rows = list(openpyxl.load_workbook(single_sheet_path).active.values)
+
+    wb = openpyxl.Workbook()
+    cash = wb.active
+    cash.title = "Cash"
+    cash.append(["Date", "Currency", "Amount", "Comment"])
+    cash.append(["2024-01-02", "USD", 1000, "Deposit"])
+    trades = wb.create_sheet("Trades")
+    trades.append(["Trades report 2024"])
+    trades.append([])
+    for row in trade_rows:
+        trades.append(row)
+    report_path = tmp_path / "multi_sheet.xlsx"
+    wb.save(report_path)
+
+    pit8c = Pit8c(broker="freedom24", exchange_provider=_DummyProvider(), write_pdf=False, write_xlsx=False)
+    expected = pit8c.process_reports_path(reports_path=single_sheet_path, tax_year=2024)
+    result = pit8c.process_reports_path(reports_path=report_path, tax_year=2024)
+    assert len(result.trades) == 2
+    assert result.totals == expected.totals
+
+    with pytest.raises(Pit8cError, match="Sheet 'Missing' not found"):
+        Pit8c(
+            broker="freedom24",
+            exchange_provider=_DummyProvider(),
+            write_pdf=False,
+            write_xlsx=False,
+            sheet_name="Missing",
+        ).process_reports_path(reports_path=report_path, tax_year=2024)
+
+
+def test_process_reports_path_stream_reader_matches_openpyxl(tmp_path: Path) -> None:
+    """The direct XML reader gives the same trades and totals as openpyxl."""
+    report_path = tmp_path / "annual_report_2024.xlsx"
+    _write_freedom24_report(report_path)
+
+    default = Pit8c(broker="freedom24", exchange_provider=_DummyProvider(), write_pdf=False, write_xlsx=False)
+    streamed = Pit8c(
+        broker="freedom24",
+        exchange_provider=_DummyProvider(),
+        write_pdf=False,
+        write_xlsx=False,
+        xlsx_reader="stream",
+    )
+
+    expected = default.process_reports_path(reports_path=report_path, tax_year=2024)
+    result = streamed.process_reports_path(reports_path=report_path, tax_year=2024)
+    assert result.totals == expected.totals
+    assert result.trades == expected.trades
+
+    with pytest.raises(Pit8cError, match="Unsupported XLSX reader 'xlrd'"):
+        Pit8c(broker="freedom24", xlsx_reader="xlrd")
+
+
+@pytest.mark.parametrize("xlsx_reader", ["openpyxl", "stream"])
+def test_process_reports_path_streaming_matches_default(tmp_path: Path, xlsx_reader: str) -> None:
+    """Streaming reports gives the same totals and closed positions XLSX while keeping no positions in the result."""
+    reports_dir = tmp_path / "reports"
+    reports_dir.mkdir()
+    _write_freedom24_report(reports_dir / "annual_report_2024.xlsx")
+
+    options = {"broker": "freedom24", "exchange_provider": _DummyProvider(), "write_pdf": False}
+    expected = Pit8c(output_dir=tmp_path / "default", **options).process_reports_path(reports_dir, tax_year=2024)
+    result = Pit8c(
+        output_dir=tmp_path / "streaming", streaming=True, xlsx_reader=xlsx_reader, **options
+    ).process_reports_path(reports_dir, tax_year=2024)
+
+    assert result.totals == expected.totals
+    assert result.input_reports == expected.input_reports
+    assert result.trades == result.closed_positions == []
+    expected_rows = list(openpyxl.load_workbook(expected.artifacts.closed_positions_xlsx_path)["Profit"].values)
+    rows = list(openpyxl.load_workbook(result.artifacts.closed_positions_xlsx_path)["Profit"].values)
+    assert rows == expected_rows
+    assert len(rows) == 2
+
+
+def test_process_reports_path_streaming_rejects_unordered_report(tmp_path: Path) -> None:
+    report_path = tmp_path / "annual_report_2024.xlsx"
+    _write_freedom24_report(report_path)
+    header, buy, sell = openpyxl.load_workbook(report_path).active.values
+    later_buy = list(buy)
+    later_buy[header.index("Settlement date")] = "2024-03-01"
+    wb = openpyxl.Workbook()
+    for row in (header, later_buy, buy, sell):
+        wb.active.append(row)
+    wb.save(report_path)
+
+    pit8c = Pit8c(
+        broker="freedom24", exchange_provider=_DummyProvider(), write_pdf=False, write_xlsx=False, streaming=True
+    )
+    with pytest.raises(Pit8cError, match="not in chronological order"):
+        pit8c.process_reports_path(reports_path=report_path, tax_year=2024)
+
+
+def test_process_reports_path_fast_trade_validation_matches_strict(tmp_path: Path) -> None:
+    """Trades built without validation give the same trades and totals as validated ones."""
+    report_path = tmp_path / "annual_report_2024.xlsx"
+    _write_freedom24_report(report_path)
+
+    options = {"broker": "freedom24", "exchange_provider": _DummyProvider(), "write_pdf": False, "write_xlsx": False}
+    expected = Pit8c(**options).process_reports_path(reports_path=report_path, tax_year=2024)
+    result = Pit8c(trade_validation="fast", **options).process_reports_path(reports_path=report_path, tax_year=2024)
+    assert result.totals == expected.totals
+    assert result.trades == expected.trades
+
+    with pytest.raises(Pit8cError, match="Unsupported trade validation 'lenient'"):
+        Pit8c(broker="freedom24", trade_validation="lenient")
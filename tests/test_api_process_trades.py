@@ -1,8 +1,10 @@
 from datetime import datetime
 from decimal import Decimal
+from typing import ClassVar
 
+import pytest
 from pit8c import DirectionEnum, Pit8c, Trade
-from pit8c.exchange.provider import ExchangeRatesProvider
+from pit8c.exchange.provider import ExchangeRatesProvider, NbpExchangeRatesProvider
 
 
 class _DummyProvider:
@@ -55,3 +57,96 @@ def test_process_trades_computes_totals_without_writing() -> None:
     assert result.artifacts.pit8c_pdf_path is None
     assert result.artifacts.closed_positions_xlsx_path is None
     assert result.artifacts.pit8c_text is not None
+
+
+def test_process_trades_reports_fetched_rate_archives(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Result metrics list the NBP archives downloaded for the run (no previous year for mid-year trades)."""
+    requested: list[str] = []
+
+    class _Response:
+        status_code = 200
+        headers: ClassVar[dict[str, str]] = {}
+        text = "data;1USD\n20240102;4,00\n20240201;4,00"
+
+        def raise_for_status(self) -> None:
+            """Mimic a successful response."""
+
+    def _get(url: str, timeout: int, headers: dict[str, str]) -> _Response:
+        """Record requested URLs and serve the same archive for every year."""
+        _ = timeout
+        _ = headers
+        requested.append(url)
+        return _Response()
+
+    monkeypatch.setattr("requests.get", _get)
+
+    pit8c = Pit8c(exchange_provider=NbpExchangeRatesProvider(), write_pdf=False, write_xlsx=False)
+    trades = [
+        Trade(
+            isin="TEST123",
+            ticker="TST",
+            currency="USD",
+            direction=direction,
+            date=datetime(2024, month, 5),
+            quantity=Decimal(1),
+            amount=Decimal(100),
+            commission_value=Decimal(0),
+        )
+        for direction, month in ((DirectionEnum.buy, 1), (DirectionEnum.sell, 2))
+    ]
+
+    result = pit8c.process_trades(trades, tax_year=2024)
+    assert result.metrics.fetched_rate_archives == ((2024, "USD"),)
+    assert [url.rsplit("_", 1)[-1] for url in requested] == ["2024.csv"]
+
+
+def _trade_history() -> list[Trade]:
+    """Buys and partial sells of a few ISINs spanning two years, so many positions close in both of them."""
+
+    trades = []
+    for i in range(40):
+        isin = f"ISIN{i % 3}"
+        month = 1 + i % 12
+        year = 2023 if i < 20 else 2024
+        trades.append(
+            Trade(
+                isin=isin,
+                ticker=isin,
+                currency="USD",
+                direction=DirectionEnum.buy,
+                date=datetime(year, month, 1),
+                quantity=Decimal(3),
+                amount=Decimal("30.03") + i,
+                commission_value=Decimal("0.11"),
+                trade_num=2 * i,
+            )
+        )
+        trades.append(
+            Trade(
+                isin=isin,
+                ticker=isin,
+                currency="USD",
+                direction=DirectionEnum.sell,
+                date=datetime(year, month, 2),
+                quantity=Decimal(2),
+                amount=Decimal("25.07") + 2 * i,
+                commission_value=Decimal("0.13"),
+                trade_num=2 * i + 1,
+            )
+        )
+    return trades
+
+
+def test_process_trades_streaming_gives_same_totals(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Streaming in small chunks gives the default totals without retaining trades or positions."""
+    monkeypatch.setattr("pit8c.api.STREAM_CHUNK_SIZE", 7)
+    trades = _trade_history()
+    options = {"exchange_provider": _DummyProvider(), "write_pdf": False, "write_xlsx": False}
+
+    expected = Pit8c(**options).process_trades(trades, tax_year=2024)
+    result = Pit8c(streaming=True, **options).process_trades(trades, tax_year=2024)
+
+    assert len(expected.closed_positions) > 7
+    assert result.totals == expected.totals
+    assert result.artifacts.pit8c_text == expected.artifacts.pit8c_text
+    assert result.trades == result.closed_positions == result.profit_positions == result.loss_positions == []
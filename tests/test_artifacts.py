@@ -0,0 +1,162 @@
+import threading
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import openpyxl
+import pytest
+from pit8c import DirectionEnum, Pit8c, Trade
+from pit8c.artifacts import ArtifactData, ClosedPositionsXlsxArtifactWriter, write_artifacts
+from pit8c.exceptions import Pit8cError
+from pit8c.result import Pit8cTotals
+
+
+class _DummyProvider:
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Ignore prefetch requests and serve deterministic rates."""
+
+        _ = years
+        _ = currencies
+
+    def get_rate(self, _d: object, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return a constant USD rate for tests (previous-day flag ignored)."""
+
+        _ = use_previous_day
+        return Decimal("4.00")
+
+
+class _CsvWriter:
+    def __init__(self, name: str, barrier: threading.Barrier | None = None, fail: bool = False) -> None:
+        """Writer of a one-line CSV, optionally meeting other writers at `barrier` or failing after writing."""
+
+        self.name = name
+        self._barrier = barrier
+        self._fail = fail
+
+    def filename(self, output_base: str) -> str:
+        """Return `<output_base>_<name>.csv`."""
+
+        return f"{output_base}_{self.name}.csv"
+
+    def write(self, data: ArtifactData, file: Path) -> None:
+        """Write the profit total (and fail afterwards when configured)."""
+
+        if self._barrier is not None:
+            self._barrier.wait()
+        file.write_text(f"profit\n{data.totals.profit_pln}\n", encoding="utf-8")
+        if self._fail:
+            raise OSError("disk full")
+
+
+def _trades() -> list[Trade]:
+    return [
+        Trade(
+            isin="TEST123",
+            ticker="TST",
+            currency="USD",
+            direction=direction,
+            date=day,
+            quantity=Decimal(1),
+            amount=Decimal(amount),
+            commission_value=Decimal(0),
+        )
+        for direction, day, amount in [
+            (DirectionEnum.buy, datetime(2024, 1, 10), "100"),
+            (DirectionEnum.sell, datetime(2024, 2, 1), "120"),
+        ]
+    ]
+
+
+def _data() -> ArtifactData:
+    totals = Pit8cTotals(income_pln=Decimal("480.00"), costs_pln=Decimal("400.00"), profit_pln=Decimal("80.00"))
+    return ArtifactData(tax_year=2024, totals=totals, closed_positions=[], profit_positions=[], loss_positions=[])
+
+
+def test_artifact_writers_run_concurrently_with_builtin_outputs(tmp_path: Path) -> None:
+    # Both extra writers must be running at the same time to pass the barrier.
+    barrier = threading.Barrier(2, timeout=5)
+    pit8c = Pit8c(
+        exchange_provider=_DummyProvider(),
+        write_pdf=False,
+        output_dir=tmp_path,
+        artifact_writers=[_CsvWriter("a", barrier), _CsvWriter("b", barrier)],
+    )
+
+    result = pit8c.process_trades(_trades(), tax_year=2024)
+
+    assert result.artifacts.closed_positions_xlsx_path == tmp_path.resolve() / "pit8c_2024_closed_positions.xlsx"
+    assert result.artifacts.extra_files == {
+        "a": tmp_path.resolve() / "pit8c_2024_a.csv",
+        "b": tmp_path.resolve() / "pit8c_2024_b.csv",
+    }
+    assert result.artifacts.extra_files["a"].read_text(encoding="utf-8") == "profit\n80.00\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "pit8c_2024_a.csv",
+        "pit8c_2024_b.csv",
+        "pit8c_2024_closed_positions.xlsx",
+    ]
+
+
+def test_failed_artifact_writer_leaves_no_partial_or_new_files(tmp_path: Path) -> None:
+    stale = tmp_path / "pit8c_2024_closed_positions.xlsx"
+    stale.write_bytes(b"previous run")
+    writers = [ClosedPositionsXlsxArtifactWriter(), _CsvWriter("a"), _CsvWriter("broken", fail=True)]
+
+    with pytest.raises(OSError, match="disk full"):
+        write_artifacts(writers, _data(), tmp_path, "pit8c_2024")
+
+    assert [p.name for p in tmp_path.iterdir()] == [stale.name]
+    assert stale.read_bytes() == b"previous run"
+
+    with pytest.raises(OSError, match="disk full"):
+        write_artifacts(writers, _data(), tmp_path, "pit8c_2024", max_workers=1)
+    assert [p.name for p in tmp_path.iterdir()] == [stale.name]
+
+
+def test_failed_rename_restores_previous_artifacts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("a", "b"):
+        (tmp_path / f"pit8c_2024_{name}.csv").write_text("previous run", encoding="utf-8")
+    replace = Path.replace
+    failures = [OSError("rename failed")]
+
+    def _replace(self: Path, target: Path) -> Path:
+        # The new "b" fails to move into place once "a" was already committed (restoring it later succeeds).
+        if failures and self.name.startswith(".pit8c_2024_b.") and Path(target).name == "pit8c_2024_b.csv":
+            raise failures.pop()
+        return replace(self, target)
+
+    monkeypatch.setattr(Path, "replace", _replace)
+    with pytest.raises(OSError, match="rename failed"):
+        write_artifacts([_CsvWriter("a"), _CsvWriter("b")], _data(), tmp_path, "pit8c_2024")
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["pit8c_2024_a.csv", "pit8c_2024_b.csv"]
+    assert {p.read_text(encoding="utf-8") for p in tmp_path.iterdir()} == {"previous run"}
+
+
+def test_streaming_run_writes_no_artifacts_when_xlsx_fails(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    save = openpyxl.Workbook.save
+
+    def _save(self: openpyxl.Workbook, filename: Path) -> None:
+        save(self, filename)
+        raise OSError("disk full")
+
+    monkeypatch.setattr("openpyxl.Workbook.save", _save)
+    pit8c = Pit8c(exchange_provider=_DummyProvider(), output_dir=tmp_path, streaming=True)
+
+    with pytest.raises(OSError, match="disk full"):
+        pit8c.process_trades(_trades(), tax_year=2024)
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.undo()
+    result = pit8c.process_trades(_trades(), tax_year=2024)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["pit8c_2024_closed_positions.xlsx", "pit8c_2024_pit_8c.pdf"]
+    assert result.artifacts.closed_positions_xlsx_path == tmp_path.resolve() / "pit8c_2024_closed_positions.xlsx"
+    assert result.artifacts.pit8c_pdf_path == tmp_path.resolve() / "pit8c_2024_pit_8c.pdf"
+
+
+def test_artifact_writer_names_must_be_unique(tmp_path: Path) -> None:
+    with pytest.raises(Pit8cError, match="Duplicate artifact writer name 'a'"):
+        write_artifacts([_CsvWriter("a"), _CsvWriter("a")], _data(), tmp_path, "pit8c_2024")
+
+    with pytest.raises(Pit8cError, match="not supported in streaming mode"):
+        Pit8c(streaming=True, artifact_writers=[_CsvWriter("a")])
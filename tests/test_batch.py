@@ -0,0 +1,145 @@
+import csv
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import openpyxl
+import pytest
+from pit8c.batch import BatchOutcome, load_manifest, run_batch, write_batch_summary
+from pit8c.exceptions import Pit8cError
+
+
+class _DummyProvider:
+    def __init__(self) -> None:
+        """Create a provider stub that counts prefetch calls and serves a constant rate."""
+
+        self.prefetch_calls = 0
+
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Count prefetch requests."""
+
+        _ = years
+        _ = currencies
+        self.prefetch_calls += 1
+
+    def get_rate(self, _d: object, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return a constant rate for tests (previous-day flag ignored)."""
+
+        _ = use_previous_day
+        return Decimal("4.00")
+
+
+def _write_report(path: Path, sell_amount: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["ISIN", "Ticker", "Direction", "Currency", "Settlement date", "Quantity", "Amount", "Commission"])
+    ws.append(["X123", "X", "Buy", "USD", "2024-01-10", 1, 100, "0USD"])
+    ws.append(["X123", "X", "Sell", "USD", "2024-06-01", 1, sell_amount, "0USD"])
+    wb.save(path)
+
+
+def test_batch_checkpoints_completed_accounts_and_resumes(tmp_path: Path) -> None:
+    _write_report(tmp_path / "a" / "annual.xlsx", 120)
+    _write_report(tmp_path / "b" / "annual.xlsx", 90)
+    manifest = tmp_path / "manifest.toml"
+    manifest.write_text(
+        """
+[[accounts]]
+id = "a"
+broker = "freedom24"
+reports_path = "a"
+year = 2024
+output_dir = "out/a"
+
+[[accounts]]
+id = "b"
+broker = "freedom24"
+reports_path = "b/annual.xlsx"
+year = 2024
+
+[[accounts]]
+id = "missing"
+broker = "freedom24"
+reports_path = "c"
+year = 2024
+""",
+        encoding="utf-8",
+    )
+    checkpoint = tmp_path / "manifest.checkpoint.jsonl"
+    entries = load_manifest(manifest)
+    assert entries[0].reports_path == tmp_path / "a"
+    assert entries[0].output_dir == tmp_path / "out" / "a"
+
+    provider = _DummyProvider()
+    seen: list[BatchOutcome] = []
+    outcomes = run_batch(entries, checkpoint_path=checkpoint, exchange_provider=provider, on_outcome=seen.append)
+
+    assert [(o.entry.id, o.status) for o in outcomes] == [("a", "ok"), ("b", "ok"), ("missing", "failed")]
+    assert sorted(o.entry.id for o in seen) == ["a", "b", "missing"]
+    assert outcomes[0].totals is not None
+    assert outcomes[0].totals.profit_pln == Decimal("80.00")
+    assert outcomes[1].totals is not None
+    assert outcomes[1].totals.profit_pln == Decimal("-40.00")
+    assert (tmp_path / "out" / "a" / "a_2024_pit_8c.pdf").exists()
+    assert provider.prefetch_calls == 2
+
+    # A crash while appending leaves a torn last line, which a rerun ignores.
+    with checkpoint.open("a", encoding="utf-8") as f:
+        f.write('{"entry": {"id": "missing"')
+
+    # The rerun only retries the failed account; completed ones come from the checkpoint.
+    _write_report(tmp_path / "c" / "annual.xlsx", 100)
+    outcomes = run_batch(load_manifest(manifest), checkpoint_path=checkpoint, exchange_provider=provider)
+
+    assert [(o.entry.id, o.status) for o in outcomes] == [("a", "resumed"), ("b", "resumed"), ("missing", "ok")]
+    assert outcomes[1].totals is not None
+    assert outcomes[1].totals.profit_pln == Decimal("-40.00")
+    assert provider.prefetch_calls == 3
+
+    # The record appended after the torn line starts a line of its own, so a third run retries nothing.
+    resumed = run_batch(load_manifest(manifest), checkpoint_path=checkpoint, exchange_provider=provider)
+    assert [o.status for o in resumed] == ["resumed", "resumed", "resumed"]
+    assert provider.prefetch_calls == 3
+
+    summary = tmp_path / "manifest.summary.csv"
+    write_batch_summary(outcomes, summary)
+    with summary.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["id"], r["status"], r["profit_pln"], r["error"]) for r in rows] == [
+        ("a", "resumed", "80.00", ""),
+        ("b", "resumed", "-40.00", ""),
+        ("missing", "ok", "0.00", ""),
+    ]
+
+
+def test_batch_summary_reports_errors(tmp_path: Path) -> None:
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(
+        json.dumps({"accounts": [{"broker": "unknown", "reports_path": "x", "year": 2024}]}), encoding="utf-8"
+    )
+    outcomes = run_batch(load_manifest(manifest), exchange_provider=_DummyProvider())
+
+    assert outcomes[0].entry.id == "x@2024"
+    summary = tmp_path / "summary.csv"
+    write_batch_summary(outcomes, summary)
+    with summary.open(encoding="utf-8", newline="") as f:
+        (row,) = csv.DictReader(f)
+    assert row["status"] == "failed"
+    assert row["income_pln"] == ""
+    assert "Unsupported broker 'unknown'" in row["error"]
+
+
+def test_load_manifest_rejects_invalid_manifests(tmp_path: Path) -> None:
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"accounts": [{"broker": "freedom24", "year": 2024}]}), encoding="utf-8")
+    with pytest.raises(Pit8cError, match="missing reports_path"):
+        load_manifest(manifest)
+
+    account = {"broker": "freedom24", "reports_path": "x", "year": 2024}
+    manifest.write_text(json.dumps({"accounts": [account, account]}), encoding="utf-8")
+    with pytest.raises(Pit8cError, match="Duplicate account id 'x@2024'"):
+        load_manifest(manifest)
+
+    with pytest.raises(Pit8cError, match="Unsupported manifest format"):
+        load_manifest(tmp_path / "manifest.yaml")
@@ -0,0 +1,205 @@
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from pit8c import DirectionEnum, Pit8c, ResultCache, Trade
+from pit8c.result import Pit8cTotals
+
+
+class _FingerprintedProvider:
+    def __init__(self, rate: str = "4.00") -> None:
+        """Serve one USD rate and fingerprint it, counting rate lookups."""
+
+        self.rate = Decimal(rate)
+        self.get_rate_calls = 0
+
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Ignore prefetch requests (rates are constant)."""
+
+        _ = years
+        _ = currencies
+
+    def get_rate(self, _d: date, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return the configured rate (previous-day flag ignored)."""
+
+        _ = use_previous_day
+        self.get_rate_calls += 1
+        return self.rate
+
+    def rate_data_fingerprint(self, years: set[int], currencies: set[str]) -> str | None:
+        """Identify the served rates by their value."""
+
+        return f"{sorted(years)}:{sorted(currencies)}:{self.rate}"
+
+
+class _FileReportGenerator:
+    def render_text(self, totals: Pit8cTotals) -> str:
+        """Render totals as one line."""
+
+        return f"profit {totals.profit_pln}"
+
+    def write_pdf(self, totals: Pit8cTotals, file: Path) -> None:
+        """Write the rendered text instead of a PDF."""
+
+        file.write_text(self.render_text(totals), encoding="utf-8")
+
+
+def _trades(sell_amount: str = "120") -> list[Trade]:
+    return [
+        Trade(
+            isin="TEST123",
+            ticker="TST",
+            currency="USD",
+            direction=DirectionEnum.buy,
+            date=datetime(2024, 1, 10),
+            quantity=Decimal(2),
+            amount=Decimal(200),
+            commission_value=Decimal(0),
+        ),
+        Trade(
+            isin="TEST123",
+            ticker="TST",
+            currency="USD",
+            direction=DirectionEnum.sell,
+            date=datetime(2024, 2, 1),
+            quantity=Decimal(1),
+            amount=Decimal(sell_amount),
+            commission_value=Decimal(1),
+            commission_currency="USD",
+        ),
+        Trade(
+            isin="TEST123",
+            ticker="TST",
+            currency="USD",
+            direction=DirectionEnum.sell,
+            date=datetime(2024, 3, 1),
+            quantity=Decimal(1),
+            amount=Decimal(90),
+            commission_value=Decimal(0),
+        ),
+    ]
+
+
+def test_result_cache_returns_stored_result_until_inputs_change(tmp_path: Path) -> None:
+    provider = _FingerprintedProvider()
+    cache = ResultCache(tmp_path / "cache")
+    pit8c = Pit8c(exchange_provider=provider, write_pdf=False, write_xlsx=False, result_cache=cache)
+
+    first = pit8c.process_trades(_trades(), tax_year=2024)
+    calls = provider.get_rate_calls
+    second = pit8c.process_trades(_trades(), tax_year=2024)
+
+    assert first.metrics.result_cache_hit is False
+    assert second.metrics.result_cache_hit is True
+    assert provider.get_rate_calls == calls
+    assert second.totals == first.totals
+    assert second.closed_positions == first.closed_positions
+    assert second.profit_positions == first.profit_positions
+    assert second.loss_positions == first.loss_positions
+    assert second.trades == first.trades
+    assert second.artifacts == first.artifacts
+
+    assert pit8c.process_trades(_trades(sell_amount="121"), tax_year=2024).metrics.result_cache_hit is False
+    assert pit8c.process_trades(_trades(), tax_year=2025).metrics.result_cache_hit is False
+    provider.rate = Decimal("4.10")
+    changed_rates = pit8c.process_trades(_trades(), tax_year=2024)
+    assert changed_rates.metrics.result_cache_hit is False
+    assert changed_rates.totals != first.totals
+
+    stats = cache.stats()
+    # Changed rates replace the entry of the first run (same inputs).
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (1, 4, 0, 3)
+    assert stats.size_bytes > 0
+
+
+def test_result_cache_misses_when_artifacts_change(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache")
+    pit8c = Pit8c(
+        exchange_provider=_FingerprintedProvider(),
+        report_generator=_FileReportGenerator(),
+        output_dir=tmp_path / "out",
+        write_xlsx=False,
+        result_cache=cache,
+    )
+
+    first = pit8c.process_trades(_trades(), tax_year=2024)
+    assert first.artifacts.pit8c_pdf_path is not None
+    assert pit8c.process_trades(_trades(), tax_year=2024).artifacts == first.artifacts
+
+    first.artifacts.pit8c_pdf_path.unlink()
+    rewritten = pit8c.process_trades(_trades(), tax_year=2024)
+    assert rewritten.metrics.result_cache_hit is False
+    assert rewritten.artifacts.pit8c_pdf_path is not None
+    assert rewritten.artifacts.pit8c_pdf_path.is_file()
+    assert pit8c.process_trades(_trades(), tax_year=2024).metrics.result_cache_hit is True
+
+
+def test_result_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache", max_entries=2)
+    pit8c = Pit8c(exchange_provider=_FingerprintedProvider(), write_pdf=False, write_xlsx=False, result_cache=cache)
+
+    pit8c.process_trades(_trades("100"), tax_year=2024)
+    pit8c.process_trades(_trades("101"), tax_year=2024)
+    assert pit8c.process_trades(_trades("100"), tax_year=2024).metrics.result_cache_hit is True
+    pit8c.process_trades(_trades("102"), tax_year=2024)
+
+    assert cache.stats().evictions == 1
+    assert cache.stats().entries == 2
+    assert pit8c.process_trades(_trades("100"), tax_year=2024).metrics.result_cache_hit is True
+    assert pit8c.process_trades(_trades("101"), tax_year=2024).metrics.result_cache_hit is False
+
+    cache.clear()
+    assert cache.stats().entries == 0
+
+
+def test_result_cache_is_skipped_without_rate_fingerprint(tmp_path: Path) -> None:
+    class _PlainProvider:
+        def prefetch(self, years: set[int], currencies: set[str]) -> None:
+            _ = years
+            _ = currencies
+
+        def get_rate(self, _d: date, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+            _ = use_previous_day
+            return Decimal("4.00")
+
+    cache = ResultCache(tmp_path / "cache")
+    pit8c = Pit8c(exchange_provider=_PlainProvider(), write_pdf=False, write_xlsx=False, result_cache=cache)
+
+    assert pit8c.process_trades(_trades(), tax_year=2024).metrics.result_cache_hit is None
+    assert cache.stats().entries == 0
+
+
+def test_result_cache_loads_only_archives_of_tax_year_closures(tmp_path: Path) -> None:
+    """Neither a miss nor a hit fingerprints archives that computing the result would not load."""
+
+    class _RecordingProvider(_FingerprintedProvider):
+        def __init__(self) -> None:
+            super().__init__()
+            self.loaded_years: set[int] = set()
+
+        def prefetch(self, years: set[int], currencies: set[str]) -> None:
+            _ = currencies
+            self.loaded_years |= years
+
+        def rate_data_fingerprint(self, years: set[int], currencies: set[str]) -> str | None:
+            self.loaded_years |= years
+            return super().rate_data_fingerprint(years, currencies)
+
+    # A position opened and closed in 2021 needs no rates for the 2024 PIT-8C.
+    closed_in_2021 = [
+        trade.model_copy(update={"isin": "OLD", "date": trade.date.replace(year=2021)}) for trade in _trades()[:2]
+    ]
+    trades = closed_in_2021 + _trades()
+    uncached = _RecordingProvider()
+    Pit8c(exchange_provider=uncached, write_pdf=False, write_xlsx=False).process_trades(trades, tax_year=2024)
+
+    provider = _RecordingProvider()
+    pit8c = Pit8c(
+        exchange_provider=provider, write_pdf=False, write_xlsx=False, result_cache=ResultCache(tmp_path / "cache")
+    )
+    assert pit8c.process_trades(trades, tax_year=2024).metrics.result_cache_hit is False
+    assert provider.loaded_years == uncached.loaded_years == {2024}
+
+    provider.loaded_years.clear()
+    assert pit8c.process_trades(trades, tax_year=2024).metrics.result_cache_hit is True
+    assert provider.loaded_years == {2024}
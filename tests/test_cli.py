@@ -7,3 +7,9 @@ runner = CliRunner()
 def test_cli_help() -> None:
     result = runner.invoke(app, ["--help"])
     assert result.exit_code == 0
+
+
+def test_cli_requires_options_without_subcommand() -> None:
+    result = runner.invoke(app, ["--year", "2024"])
+    assert result.exit_code == 2
+    assert "--broker" in result.output
@@ -0,0 +1,91 @@
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+from pit8c import DirectionEnum, Pit8c, Trade
+from pit8c.memory import TracemallocProfiler, tracing_memory
+from pit8c.metrics import collect_metrics
+from pit8c.tracing import span, use_tracer
+
+_MIB = 1024 * 1024
+
+
+class _DummyProvider:
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Ignore prefetch requests."""
+
+        _ = years
+        _ = currencies
+
+    def get_rate(self, _d: object, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return a constant rate."""
+
+        _ = use_previous_day
+        return Decimal(4)
+
+
+def test_profiler_attributes_nested_peaks_to_enclosing_stages() -> None:
+    with tracing_memory(), use_tracer(TracemallocProfiler()), collect_metrics() as metrics, span("outer"):
+        with span("temporary"):
+            buffer = bytearray(8 * _MIB)
+            del buffer
+        with span("retained"):
+            kept = bytearray(2 * _MIB)
+
+    assert not tracemalloc.is_tracing()
+    by_stage = {m.stage: m for m in metrics.snapshot().stage_memory}
+    assert list(by_stage) == ["temporary", "retained", "outer"]
+    assert by_stage["temporary"].peak_bytes >= 8 * _MIB
+    assert by_stage["temporary"].retained_bytes < _MIB
+    assert 2 * _MIB <= by_stage["retained"].retained_bytes < 3 * _MIB
+    assert by_stage["outer"].peak_bytes >= 8 * _MIB
+    assert by_stage["outer"].retained_bytes >= 2 * _MIB
+    assert len(kept) == 2 * _MIB
+
+
+def test_overlapping_tracing_blocks_stop_tracing_when_the_last_one_ends() -> None:
+    first, second = tracing_memory(), tracing_memory()
+    first.__enter__()
+    second.__enter__()
+    first.__exit__(None, None, None)
+    assert tracemalloc.is_tracing()
+    second.__exit__(None, None, None)
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        with tracing_memory():
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_pit8c_reports_stage_memory_when_enabled() -> None:
+    trades = [
+        Trade(
+            isin="TEST123",
+            ticker="TST",
+            currency="USD",
+            direction=direction,
+            date=datetime(2024, month, 5),
+            quantity=Decimal(1),
+            amount=Decimal(100),
+            commission_value=Decimal(0),
+        )
+        for direction, month in ((DirectionEnum.buy, 1), (DirectionEnum.sell, 2))
+    ]
+
+    default = Pit8c(exchange_provider=_DummyProvider(), write_pdf=False, write_xlsx=False)
+    assert default.process_trades(trades, tax_year=2024).metrics.stage_memory == ()
+
+    profiled = Pit8c(exchange_provider=_DummyProvider(), write_pdf=False, write_xlsx=False, profile_memory=True)
+    stages = [m.stage for m in profiled.process_trades(trades, tax_year=2024).metrics.stage_memory]
+    assert stages == [
+        "pit8c.match",
+        "pit8c.exchange_rates",
+        "pit8c.profit",
+        "pit8c.render_text",
+        "pit8c.process_trades",
+    ]
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,79 @@
+from decimal import Decimal
+from pathlib import Path
+
+import openpyxl
+import pytest
+from pit8c import CancellationToken, Pit8c, Pit8cCancelledError
+from pit8c.exchange.nbp import NbpExchange
+from pit8c.progress import run_control, track_progress
+
+
+class _DummyProvider:
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Ignore prefetch requests."""
+
+        _ = years
+        _ = currencies
+
+    def get_rate(self, _d: object, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return a constant rate for tests (previous-day flag ignored)."""
+
+        _ = use_previous_day
+        return Decimal("4.00")
+
+
+def _write_report(path: Path, year: int) -> None:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["ISIN", "Ticker", "Direction", "Currency", "Settlement date", "Quantity", "Amount", "Commission"])
+    ws.append(["X123", "X", "Buy", "USD", f"{year}-01-10", 1, 100, "0USD"])
+    ws.append(["X123", "X", "Sell", "USD", f"{year}-06-01", 1, 120, "0USD"])
+    wb.save(path)
+
+
+def test_process_reports_path_reports_progress_of_every_stage(tmp_path: Path) -> None:
+    _write_report(tmp_path / "2023.xlsx", 2023)
+    _write_report(tmp_path / "2024.xlsx", 2024)
+    events: list[tuple[str, int, int | None]] = []
+
+    pit8c = Pit8c(broker="freedom24", exchange_provider=_DummyProvider(), write_pdf=False, write_xlsx=False)
+    pit8c.process_reports_path(tmp_path, tax_year=2024, progress=lambda *event: events.append(event))
+
+    assert [e for e in events if e[0] == "read_reports"] == [("read_reports", done, 2) for done in range(3)]
+    assert [e for e in events if e[0] == "match"] == [("match", 0, 4), ("match", 4, 4)]
+    assert [e for e in events if e[0] == "exchange_rates"][-1] == ("exchange_rates", 1, 1)
+
+
+def test_cancelled_run_stops_at_the_next_checkpoint_without_writing_artifacts(tmp_path: Path) -> None:
+    reports_dir = tmp_path / "reports"
+    reports_dir.mkdir()
+    _write_report(reports_dir / "2023.xlsx", 2023)
+    _write_report(reports_dir / "2024.xlsx", 2024)
+    token = CancellationToken()
+
+    def _cancel_after_first_report(stage: str, done: int, total: int | None) -> None:
+        _ = total
+        if stage == "read_reports" and done == 1:
+            token.cancel()
+
+    pit8c = Pit8c(broker="freedom24", exchange_provider=_DummyProvider(), output_dir=tmp_path / "out")
+    with pytest.raises(Pit8cCancelledError):
+        pit8c.process_reports_path(reports_dir, tax_year=2024, progress=_cancel_after_first_report, cancel_token=token)
+    assert not (tmp_path / "out").exists() or not any((tmp_path / "out").iterdir())
+
+    with pytest.raises(Pit8cCancelledError):
+        pit8c.process_trades([], tax_year=2024, cancel_token=token)
+
+
+def test_cancellation_is_checked_while_matching_and_before_rate_downloads() -> None:
+    token = CancellationToken()
+    token.cancel()
+
+    with run_control(cancel_token=token):
+        with pytest.raises(Pit8cCancelledError):
+            list(track_progress(range(10), "match", interval=4))
+        with pytest.raises(Pit8cCancelledError):
+            NbpExchange(archive_url="http://127.0.0.1:9/{year}.csv").load_year(2024, {"USD"})
+
+    # Outside of a run checkpoints are no-ops.
+    assert list(track_progress(range(3), "match")) == [0, 1, 2]
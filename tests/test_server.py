@@ -0,0 +1,139 @@
+import http.client
+import json
+import threading
+from collections.abc import Iterator
+from decimal import Decimal
+from io import BytesIO
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+import openpyxl
+import pytest
+from pit8c.server import Pit8cHTTPServer, Pit8cService
+
+
+class _DummyProvider:
+    def __init__(self) -> None:
+        """Create a provider stub that counts prefetch calls and serves a constant rate."""
+
+        self.prefetch_calls = 0
+
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Count prefetch requests."""
+
+        _ = years
+        _ = currencies
+        self.prefetch_calls += 1
+
+    def get_rate(self, _d: object, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return a constant rate for tests (previous-day flag ignored)."""
+
+        _ = use_previous_day
+        return Decimal("4.00")
+
+
+@pytest.fixture
+def provider() -> _DummyProvider:
+    return _DummyProvider()
+
+
+@pytest.fixture
+def server_url(tmp_path: Path, provider: _DummyProvider) -> Iterator[str]:
+    service = Pit8cService(broker="freedom24", exchange_provider=provider, output_dir=tmp_path / "out")
+    server = Pit8cHTTPServer(("127.0.0.1", 0), service, max_workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def _post(url: str, body: bytes) -> tuple[int, dict]:
+    try:
+        with urlopen(Request(url, data=body, method="POST"), timeout=10) as response:  # noqa: S310
+            return response.status, json.loads(response.read())
+    except HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def _freedom24_report_bytes() -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["ISIN", "Ticker", "Direction", "Currency", "Settlement date", "Quantity", "Amount", "Commission"])
+    ws.append(["X123", "X", "Buy", "USD", "2024-01-10", 1, 100, "0USD"])
+    ws.append(["X123", "X", "Sell", "USD", "2024-06-01", 1, 120, "0USD"])
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def test_serve_processes_trade_json_and_report_uploads(server_url: str, provider: _DummyProvider) -> None:
+    """Both endpoints return totals, positions and artifacts while sharing one provider."""
+    trades = [
+        {
+            "isin": "X123",
+            "ticker": "X",
+            "currency": "USD",
+            "direction": "buy",
+            "date": "2024-01-10T00:00:00",
+            "quantity": "1",
+            "amount": "100",
+            "commission_value": "0",
+        },
+        {
+            "isin": "X123",
+            "ticker": "X",
+            "currency": "USD",
+            "direction": "sell",
+            "date": "2024-06-01T00:00:00",
+            "quantity": "1",
+            "amount": "120",
+            "commission_value": "0",
+        },
+    ]
+    status, payload = _post(f"{server_url}/trades", json.dumps({"tax_year": 2024, "trades": trades}).encode())
+    assert status == 200
+    assert payload["totals"] == {"income_pln": "480.00", "costs_pln": "400.00", "profit_pln": "80.00"}
+    assert len(payload["closed_positions"]) == 1
+    assert Path(payload["artifacts"]["closed_positions_xlsx_path"]).exists()
+
+    status, payload = _post(f"{server_url}/reports?year=2024&filename=annual.xlsx", _freedom24_report_bytes())
+    assert status == 200
+    assert payload["totals"]["profit_pln"] == "80.00"
+    assert Path(payload["artifacts"]["pit8c_pdf_path"]).name == "annual_2024_pit_8c.pdf"
+
+    assert provider.prefetch_calls == 2
+
+
+def test_serve_reports_client_errors(server_url: str) -> None:
+    """Invalid input is reported as 400 and unknown paths as 404."""
+    status, payload = _post(f"{server_url}/trades", b"not json")
+    assert status == 400
+    assert "JSON" in payload["error"]
+
+    status, _payload = _post(f"{server_url}/reports?year=2024&broker=unknown", b"x")
+    assert status == 400
+
+    status, _payload = _post(f"{server_url}/unknown", b"{}")
+    assert status == 404
+
+
+@pytest.mark.parametrize("content_length", ["-1", "abc", "+5", "1_0"])
+def test_serve_rejects_invalid_content_length(server_url: str, content_length: str) -> None:
+    """A negative or non-integer Content-Length is rejected before reading the body (which would wait for EOF)."""
+    url = urlsplit(server_url)
+    connection = http.client.HTTPConnection(url.hostname or "", url.port, timeout=10)
+    try:
+        connection.putrequest("POST", "/trades")
+        connection.putheader("Content-Length", content_length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400
+        assert json.loads(response.read()) == {"error": "Invalid Content-Length"}
+    finally:
+        connection.close()
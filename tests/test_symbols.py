@@ -0,0 +1,39 @@
+from pit8c.brokers.declarative import DeclarativeAdapter
+from pit8c.brokers.freedom24 import FREEDOM24_SPEC, Freedom24Adapter
+from pit8c.symbols import SymbolTable, symbol_interner, use_symbol_table
+
+_HEADERS = ("ISIN", "Ticker", "Direction", "Currency", "Trade date", "Quantity", "Amount", "Commission")
+
+
+def _rows() -> list[tuple[object, ...]]:
+    # Fresh string objects per cell, like readers produce them.
+    return [
+        ("".join(["US", "0001"]), "".join(["AB", "C"]), "Buy", "".join(["US", "D"]), "2024-01-02", 2, 10, "1USD"),
+        ("".join(["US", "0001"]), "".join(["AB", "C"]), "Sell", "".join(["US", "D"]), "2024-02-02", 2, 12, "1USD"),
+    ]
+
+
+def test_symbol_table_interns_identifiers_of_the_current_run() -> None:
+    table = SymbolTable()
+    first = "".join(["US", "0001"])
+    second = "".join(["US", "0001"])
+    assert first is not second
+
+    with use_symbol_table(table):
+        intern = symbol_interner()
+        assert intern(first) is first
+        assert intern(second) is first
+    assert len(table) == 1
+    assert symbol_interner()(second) is second
+
+
+def test_adapters_share_identifier_strings_within_a_run() -> None:
+    dict_rows = [dict(zip(_HEADERS, row, strict=True)) for row in _rows()]
+    with use_symbol_table():
+        trades = Freedom24Adapter().parse_trades(dict_rows)
+        trades += DeclarativeAdapter(FREEDOM24_SPEC).parse_rows(_HEADERS, _rows())
+
+    assert len(trades) == 4
+    for field in ("isin", "ticker", "currency", "commission_currency"):
+        assert len({id(getattr(trade, field)) for trade in trades}) == 1
+    assert trades[0].currency is trades[0].commission_currency
@@ -0,0 +1,173 @@
+import io
+import json
+from decimal import Decimal
+from pathlib import Path
+from typing import ClassVar
+
+import openpyxl
+import pytest
+from pit8c import Pit8c, pipeline
+from pit8c.exchange.nbp import NbpExchange
+from pit8c.tracing import JsonLinesSpanExporter, NoopTracer, Span, span, use_tracer
+
+
+class _RecordingTracer:
+    def __init__(self) -> None:
+        """Record started and finished spans."""
+
+        self.started: list[str] = []
+        self.finished: list[Span] = []
+
+    def on_start(self, span: Span) -> None:
+        """Record the span name."""
+
+        self.started.append(span.name)
+
+    def on_end(self, span: Span) -> None:
+        """Record the finished span."""
+
+        self.finished.append(span)
+
+
+class _DummyProvider:
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Ignore prefetch requests."""
+
+        _ = years
+        _ = currencies
+
+    def get_rate(self, _d: object, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return a constant rate."""
+
+        _ = use_previous_day
+        return Decimal(4)
+
+
+def test_spans_are_noop_without_tracer() -> None:
+    with span("anything", x=1) as s:
+        s.set_attribute("y", 2)
+    with use_tracer(NoopTracer()), span("anything") as s:
+        assert type(s).__name__ == "_NoopSpan"
+
+
+def test_spans_nest_and_record_attributes_and_errors() -> None:
+    tracer = _RecordingTracer()
+    with use_tracer(tracer):
+        with span("outer", a=1) as outer:
+            with span("inner") as inner:
+                inner.set_attribute("b", 2)
+            outer.set_attribute("c", 3)
+        with pytest.raises(ValueError, match="boom"), span("failing"):
+            raise ValueError("boom")
+
+    assert tracer.started == ["outer", "inner", "failing"]
+    inner_span, outer_span, failing_span = tracer.finished
+    assert inner_span.parent_id == outer_span.span_id
+    assert outer_span.parent_id is None
+    assert outer_span.attributes == {"a": 1, "c": 3}
+    assert inner_span.attributes == {"b": 2}
+    assert failing_span.error == "ValueError: boom"
+    assert all(s.duration is not None and s.duration >= 0 for s in tracer.finished)
+
+
+def test_tracer_failures_do_not_break_computation() -> None:
+    class _FailingTracer(_RecordingTracer):
+        def on_end(self, span: Span) -> None:
+            """Always fail."""
+
+            raise RuntimeError(span.name)
+
+    with use_tracer(_FailingTracer()), span("stage") as s:
+        s.set_attribute("ok", True)
+
+
+def test_json_lines_exporter_writes_one_object_per_span() -> None:
+    stream = io.StringIO()
+    with use_tracer(JsonLinesSpanExporter(stream)), span("outer", path=Path("x.xlsx")), span("inner"):
+        pass
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["name"] for r in records] == ["inner", "outer"]
+    assert records[0]["parent_id"] == records[1]["span_id"]
+    assert records[1]["attributes"] == {"path": "x.xlsx"}
+    assert records[1]["duration_ms"] >= 0
+
+
+def test_pit8c_emits_stage_file_and_artifact_spans(tmp_path: Path) -> None:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["ISIN", "Ticker", "Direction", "Currency", "Settlement date", "Quantity", "Amount", "Commission"])
+    ws.append(["X123", "X", "Buy", "USD", "2024-01-10", 1, 100, "0USD"])
+    ws.append(["X123", "X", "Sell", "USD", "2024-06-01", 1, 120, "0USD"])
+    report_path = tmp_path / "report.xlsx"
+    wb.save(report_path)
+
+    tracer = _RecordingTracer()
+    pit8c = Pit8c(broker="freedom24", exchange_provider=_DummyProvider(), write_pdf=False, tracer=tracer)
+    pit8c.process_reports_path(reports_path=report_path, tax_year=2024)
+
+    by_name = {s.name: s for s in tracer.finished}
+    assert list(by_name) == [
+        "pit8c.read_report",
+        "pit8c.load_reports",
+        "pit8c.match",
+        "pit8c.exchange_rates",
+        "pit8c.profit",
+        "pit8c.render_text",
+        "pit8c.write_xlsx",
+        "pit8c.process_reports_path",
+    ]
+    root = by_name["pit8c.process_reports_path"]
+    assert by_name["pit8c.read_report"].parent_id == by_name["pit8c.load_reports"].span_id
+    assert by_name["pit8c.match"].parent_id == root.span_id
+    assert by_name["pit8c.read_report"].attributes["trades"] == 2
+    assert by_name["pit8c.match"].attributes["closed_positions"] == 1
+
+
+def test_streaming_run_traces_report_reads(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pipeline, "READ_CHUNK_SIZE", 2)
+    for name, rows in (("a", 3), ("b", 1)):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(["ISIN", "Ticker", "Direction", "Currency", "Settlement date", "Quantity", "Amount", "Commission"])
+        for month in range(1, rows + 1):
+            ws.append([f"X{name}", "X", "Buy", "USD", f"2024-0{month}-10", 1, 100, "0USD"])
+        ws.append([f"X{name}", "X", "Sell", "USD", "2024-06-01", rows, 120, "0USD"])
+        wb.save(tmp_path / f"{name}.xlsx")
+
+    tracer = _RecordingTracer()
+    pit8c = Pit8c(broker="freedom24", exchange_provider=_DummyProvider(), streaming=True, tracer=tracer)
+    pit8c.process_reports_path(reports_path=tmp_path, tax_year=2024, output_dir=tmp_path / "out")
+
+    stream = next(s for s in tracer.finished if s.name == "pit8c.stream")
+    reads = [s for s in tracer.finished if s.name == "pit8c.read_report"]
+    assert all(s.parent_id == stream.span_id for s in reads)
+    assert [(Path(s.attributes["path"]).name, s.attributes["trades"]) for s in reads] == [
+        ("a.xlsx", 2),
+        ("b.xlsx", 2),
+        ("a.xlsx", 2),
+        ("a.xlsx", 0),
+        ("b.xlsx", 0),
+    ]
+
+
+def test_nbp_downloads_are_traced(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Response:
+        status_code = 200
+        headers: ClassVar[dict[str, str]] = {}
+        text = "data;1USD\n20240102;4,10"
+
+        def raise_for_status(self) -> None:
+            """Mimic a successful response."""
+
+    monkeypatch.setattr("requests.get", lambda _url, **_kwargs: _Response())
+
+    tracer = _RecordingTracer()
+    with use_tracer(tracer):
+        NbpExchange().load_year(2024, {"USD"})
+
+    download, parse, load_year = tracer.finished
+    assert [download.name, parse.name, load_year.name] == ["nbp.download", "nbp.parse", "nbp.load_year"]
+    assert load_year.attributes == {"year": 2024, "currencies": ["USD"]}
+    assert parse.attributes["currencies"] == ["USD"]
+    assert download.parent_id == load_year.span_id
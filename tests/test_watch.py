@@ -0,0 +1,115 @@
+import os
+from collections.abc import Iterable, Sequence
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+import openpyxl
+from pit8c.brokers.freedom24 import Freedom24Adapter
+from pit8c.models import Trade
+from pit8c.watch import IncrementalReportsProcessor
+
+
+class _DummyProvider:
+    def __init__(self) -> None:
+        """Create a provider stub that counts prefetch calls and serves a constant rate."""
+
+        self.prefetch_calls = 0
+
+    def prefetch(self, years: set[int], currencies: set[str]) -> None:
+        """Count prefetch requests."""
+
+        _ = years
+        _ = currencies
+        self.prefetch_calls += 1
+
+    def get_rate(self, _d: object, _currency: str, *, use_previous_day: bool = True) -> Decimal:
+        """Return a constant rate for tests (previous-day flag ignored)."""
+
+        _ = use_previous_day
+        return Decimal(1)
+
+
+class _CountingAdapter(Freedom24Adapter):
+    def __init__(self) -> None:
+        """Create a Freedom24 adapter that counts how many reports it parsed."""
+
+        super().__init__()
+        self.parse_calls = 0
+
+    def parse_rows(self, headers: Sequence[Any], rows: Iterable[Sequence[Any]]) -> list[Trade]:
+        """Delegate to Freedom24Adapter and count the call."""
+
+        self.parse_calls += 1
+        return super().parse_rows(headers, rows)
+
+
+def _write_freedom24_report(path: Path, rows: list[tuple[str, str, str, int, int]]) -> None:
+    """Write a minimal Freedom24-like report with (isin, direction, date, quantity, amount) rows."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["ISIN", "Ticker", "Direction", "Currency", "Settlement date", "Quantity", "Amount", "Commission"])
+    for isin, direction, date_str, quantity, amount in rows:
+        ws.append([isin, isin, direction, "USD", date_str, quantity, amount, "0USD"])
+    wb.save(path)
+
+    # Make sure the change is visible even on filesystems with coarse mtime resolution.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_refresh_reparses_only_changed_reports(tmp_path: Path) -> None:
+    """Only the edited report is re-parsed and totals reflect the edit."""
+    _write_freedom24_report(
+        tmp_path / "2024.xlsx", [("A1", "Buy", "2024-01-10", 10, 100), ("B1", "Buy", "2024-01-10", 1, 50)]
+    )
+    _write_freedom24_report(tmp_path / "2025.xlsx", [("A1", "Sell", "2025-03-01", 5, 80)])
+
+    adapter = _CountingAdapter()
+    processor = IncrementalReportsProcessor(
+        adapter=adapter, reports_path=tmp_path, tax_year=2025, exchange_provider=_DummyProvider()
+    )
+
+    first = processor.refresh()
+    assert first is not None
+    assert adapter.parse_calls == 2
+    assert first.totals.income_pln == Decimal("80.00")
+    assert first.totals.costs_pln == Decimal("50.00")
+
+    assert processor.refresh() is None
+    assert adapter.parse_calls == 2
+
+    _write_freedom24_report(
+        tmp_path / "2025.xlsx", [("A1", "Sell", "2025-03-01", 5, 80), ("B1", "Sell", "2025-04-01", 1, 40)]
+    )
+    second = processor.refresh()
+    assert second is not None
+    assert adapter.parse_calls == 3
+    assert second.changed_reports == [(tmp_path / "2025.xlsx").resolve()]
+    assert second.totals.income_pln == Decimal("120.00")
+    assert second.totals.costs_pln == Decimal("100.00")
+    assert second.totals.profit_pln == Decimal("20.00")
+
+
+def test_refresh_handles_removed_reports(tmp_path: Path) -> None:
+    """Positions coming from a removed report disappear from the totals."""
+    _write_freedom24_report(
+        tmp_path / "2025a.xlsx", [("A1", "Buy", "2025-01-10", 1, 100), ("A1", "Sell", "2025-02-10", 1, 110)]
+    )
+    _write_freedom24_report(
+        tmp_path / "2025b.xlsx", [("B1", "Buy", "2025-01-10", 1, 100), ("B1", "Sell", "2025-02-10", 1, 90)]
+    )
+
+    processor = IncrementalReportsProcessor(
+        adapter=Freedom24Adapter(), reports_path=tmp_path, tax_year=2025, exchange_provider=_DummyProvider()
+    )
+    first = processor.refresh()
+    assert first is not None
+    assert first.totals.profit_pln == Decimal("0.00")
+
+    (tmp_path / "2025b.xlsx").unlink()
+    second = processor.refresh()
+    assert second is not None
+    assert second.removed_reports == [(tmp_path / "2025b.xlsx").resolve()]
+    assert second.totals.profit_pln == Decimal("10.00")
+    assert [cp.isin for cp in processor.closed_positions] == ["A1"]